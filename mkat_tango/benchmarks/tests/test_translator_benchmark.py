@@ -0,0 +1,122 @@
+# test_translator_benchmark.py
+# -*- coding: utf8 -*-
+# vim:fileencoding=utf8 ai ts=4 sts=4 et sw=4
+# Copyright 2016 National Research Foundation (South African Radio Astronomy Observatory)
+# BSD license - see LICENSE for details
+
+from __future__ import absolute_import, division, print_function
+from future import standard_library
+
+standard_library.install_aliases()
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from mkat_tango.benchmarks import translator_benchmark
+
+
+class test_EventRecorder(unittest.TestCase):
+    def test_summary(self):
+        recorder = translator_benchmark.EventRecorder()
+        recorder.record(1.0, 1.5)
+        recorder.start()
+        recorder.record(10.0, 10.001)
+        recorder.record(11.0, 11.003, count=3)
+        # Sent after the measurement window
+        recorder.record(13.0, 13.5)
+        recorder.stop()
+        recorder.record(11.5, 11.6)
+        summary = recorder.summary(10.0, 12.0)
+        self.assertEqual(summary["events_received"], 4)
+        self.assertAlmostEqual(summary["events_per_second"], 2.0)
+        latency_ms = summary["latency_ms"]
+        self.assertAlmostEqual(latency_ms["p50"], 3.0, places=3)
+        self.assertAlmostEqual(latency_ms["max"], 3.0, places=3)
+        self.assertLessEqual(latency_ms["p99"], latency_ms["p999"])
+
+    def test_no_events(self):
+        summary = translator_benchmark.EventRecorder().summary(0.0, 1.0)
+        self.assertEqual(summary["events_received"], 0)
+        self.assertEqual(
+            summary["latency_ms"], dict(p50=None, p99=None, p999=None, max=None)
+        )
+
+
+class test_KatcpLoadDevice(unittest.TestCase):
+    def setUp(self):
+        self.katcp_device = translator_benchmark.KatcpLoadDevice("127.0.0.1", 0, 5)
+        self.katcp_device.start(timeout=5.0)
+        self.addCleanup(self.katcp_device.join, timeout=5.0)
+        self.addCleanup(self.katcp_device.stop)
+        self.recorder = translator_benchmark.EventRecorder()
+        host, port = self.katcp_device.bind_address
+        self.client = translator_benchmark.SensorStatusClient(host, port, self.recorder)
+        self.client.start(timeout=5.0)
+        self.addCleanup(self.client.join, timeout=5.0)
+        self.addCleanup(self.client.stop)
+        self.client.wait_protocol(timeout=5.0)
+
+    def test_rate_steps(self):
+        sensor_names = [
+            translator_benchmark.load_sensor_name(index) for index in range(5)
+        ]
+        self.client.sample_sensors(sensor_names)
+        steps = translator_benchmark.run_rate_steps(
+            lambda rate: setattr(self.katcp_device, "event_rate", rate),
+            lambda: self.katcp_device.updates_sent,
+            self.recorder,
+            [500.0, 100.0],
+            duration=0.5,
+            settle_time=0.2,
+        )
+        self.assertEqual([step["target_rate"] for step in steps], [100.0, 500.0])
+        for step in steps:
+            self.assertGreater(step["events_sent"], 0)
+            self.assertGreaterEqual(step["events_received"], step["events_sent"])
+            self.assertEqual(step["events_lost"], 0)
+            self.assertGreater(step["rss_bytes"], 0)
+            self.assertIsNotNone(step["latency_ms"]["p999"])
+        self.assertGreater(steps[1]["events_per_second"], steps[0]["events_per_second"])
+        # Values are the sequence numbers of the sensor updates
+        sensor_values = [
+            self.katcp_device.get_sensor(name).value() for name in sensor_names
+        ]
+        self.assertEqual(sum(sensor_values), self.katcp_device.updates_sent)
+
+
+class test_main(unittest.TestCase):
+    def test_json_output(self):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        output_filename = os.path.join(tempdir, "results.json")
+        results = dict(tango2katcp=dict(startup=[], throughput=[]))
+        with mock.patch.object(
+            translator_benchmark, "run_benchmarks", return_value=results
+        ) as run_benchmarks:
+            translator_benchmark.main(
+                [
+                    "--output",
+                    output_filename,
+                    "--direction",
+                    "tango2katcp",
+                    "--rates",
+                    "10,100",
+                    "--startup-attribute-counts",
+                    "100,1000,10000",
+                ]
+            )
+        run_benchmarks.assert_called_once_with(
+            directions=["tango2katcp"],
+            attribute_counts=[100, 1000],
+            rates=[10.0, 100.0],
+            startup_attribute_counts=[100, 1000, 10000],
+            duration=5.0,
+            settle_time=1.0,
+        )
+        with open(output_filename) as output:
+            self.assertEqual(json.load(output), results)
@@ -0,0 +1,729 @@
+#!/usr/bin/env python
+# translator_benchmark.py
+# -*- coding: utf8 -*-
+# vim:fileencoding=utf8 ai ts=4 sts=4 et sw=4
+# Copyright 2016 National Research Foundation (South African Radio Astronomy Observatory)
+# BSD license - see LICENSE for details
+
+"""
+End-to-end throughput, latency and startup benchmarks of the translators.
+
+Both translator directions are driven by local stand-ins for the real devices:
+
+tango2katcp
+    A :class:`LoadGenerator` device in a :class:`DeviceTestContext` is translated
+    by a :class:`TangoDevice2KatcpProxy`, and a KATCP client samples the
+    translated sensors.
+katcp2tango
+    An in-process :class:`KatcpLoadDevice` KATCP server is translated by a
+    :class:`TangoDeviceServerBase` device in a :class:`DeviceTestContext`, and a
+    Tango client subscribes to change events of the translated attributes.
+
+Events are timestamped with their send time, so the latency of an event is its
+receive time less its timestamp. Each scenario runs in a fresh process, since
+Tango only allows one device server per process, and the CPU and RSS reported
+are those of that process. They include the load source and the client along
+with the translator.
+"""
+from __future__ import absolute_import, division, print_function
+from future import standard_library
+
+standard_library.install_aliases()
+
+import json
+import logging
+import math
+import multiprocessing
+import platform
+import resource
+import socket
+import sys
+import threading
+import time
+
+from builtins import object, range, zip
+from contextlib import contextmanager
+
+import numpy as np
+import tango
+
+from katcp import BlockingClient, DeviceServer, Message, Sensor
+from tango.test_context import DeviceTestContext
+
+import mkat_tango
+
+from mkat_tango.simulators.load_generator import (
+    BATCH_PERIOD,
+    LoadGenerator,
+    generated_attribute_name,
+)
+from mkat_tango.translators.katcp_tango_proxy import (
+    TANGO2KATCP_TYPE_INFO,
+    TangoDevice2KatcpProxy,
+)
+from mkat_tango.translators.tango_katcp_proxy import TangoDeviceServerBase
+from mkat_tango.translators.utilities import tangoname2katcpname
+
+MODULE_LOGGER = logging.getLogger(__name__)
+
+DIRECTIONS = ("tango2katcp", "katcp2tango")
+LATENCY_PERCENTILES = (("p50", 50.0), ("p99", 99.0), ("p999", 99.9))
+# Most seconds to wait for a translator to set up all its sensors or attributes
+STARTUP_TIMEOUT = 600.0
+
+
+def process_usage():
+    """CPU time in seconds and resident set size in bytes of this process"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_time = usage.ru_utime + usage.ru_stime
+    try:
+        with open("/proc/self/statm") as statm:
+            rss = int(statm.read().split()[1]) * resource.getpagesize()
+    except (IOError, OSError):
+        # Peak rather than current RSS, in kilobytes on Linux
+        rss = usage.ru_maxrss * 1024
+    return cpu_time, rss
+
+
+def free_port():
+    """Unused TCP port number, needed for Tango events in a DeviceTestContext"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.bind(("", 0))
+        return sock.getsockname()[1]
+    finally:
+        sock.close()
+
+
+def wait_for(predicate, timeout, period=0.05):
+    """Poll `predicate` until it returns True, raising RuntimeError on timeout"""
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            raise RuntimeError("Timed out after {}s".format(timeout))
+        time.sleep(period)
+
+
+class EventRecorder(object):
+    """Send and receive times of the events received by a benchmark client
+
+    Thread safe, events can be recorded from any number of client threads.
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._recording = False
+        self._send_times = []
+        self._receive_times = []
+
+    def start(self):
+        """Forget the events recorded so far and start recording"""
+        with self._lock:
+            self._send_times = []
+            self._receive_times = []
+            self._recording = True
+
+    def stop(self):
+        with self._lock:
+            self._recording = False
+
+    def record(self, send_time, receive_time, count=1):
+        """Record `count` events sent at `send_time` and received at `receive_time`"""
+        with self._lock:
+            if self._recording:
+                self._send_times.extend([send_time] * count)
+                self._receive_times.extend([receive_time] * count)
+
+    def summary(self, start_time, end_time):
+        """Throughput and latency of the events sent from `start_time` to `end_time`
+
+        Return Value
+        ------------
+        summary : dict
+            The number of events received, the events received per second, and
+            latency percentiles and maximum in milliseconds, which are None if
+            no events were received.
+
+        """
+        with self._lock:
+            send_times = np.array(self._send_times, dtype=float)
+            receive_times = np.array(self._receive_times, dtype=float)
+        in_window = (send_times >= start_time) & (send_times <= end_time)
+        latencies = 1000.0 * (receive_times[in_window] - send_times[in_window])
+        num_events = int(in_window.sum())
+        latency_ms = dict.fromkeys([name for name, _ in LATENCY_PERCENTILES] + ["max"])
+        if num_events:
+            percentiles = np.percentile(
+                latencies, [percentile for _, percentile in LATENCY_PERCENTILES]
+            )
+            for (name, _), value in zip(LATENCY_PERCENTILES, percentiles):
+                latency_ms[name] = float(value)
+            latency_ms["max"] = float(latencies.max())
+        return dict(
+            events_received=num_events,
+            events_per_second=num_events / (end_time - start_time),
+            latency_ms=latency_ms,
+        )
+
+
+def run_rate_steps(set_rate, events_sent, recorder, rates, duration, settle_time):
+    """Measure throughput, latency and resource usage at increasing event rates
+
+    Parameters
+    ----------
+    set_rate : callable
+        Sets the aggregate event rate of the load source, in events per second.
+    events_sent : callable
+        Returns the number of events sent by the load source so far.
+    recorder : :class:`EventRecorder`
+        Records the events received by the benchmark client.
+    rates : list of float
+        Event rates to measure at, in turn.
+    duration : float
+        Seconds to send events for at each rate.
+    settle_time : float
+        Seconds to send events for before measuring, and to wait for events
+        still in flight afterwards.
+
+    Return Value
+    ------------
+    steps : list of dict
+        Results for each rate, see :meth:`EventRecorder.summary`, with the
+        events sent and lost, and the CPU percentage of a core used and the
+        resident set size in bytes of this process.
+
+    """
+    steps = []
+    for rate in sorted(rates):
+        set_rate(rate)
+        time.sleep(settle_time)
+        recorder.start()
+        cpu_before, _ = process_usage()
+        # Only count the events sent within the measurement window as sent
+        start_time = time.time()
+        sent_before = events_sent()
+        time.sleep(duration)
+        sent = events_sent() - sent_before
+        end_time = time.time()
+        cpu_after, rss = process_usage()
+        set_rate(0.0)
+        time.sleep(settle_time)
+        recorder.stop()
+        step = recorder.summary(start_time, end_time)
+        step.update(
+            target_rate=rate,
+            events_sent=sent,
+            events_lost=max(sent - step["events_received"], 0),
+            cpu_percent=100.0 * (cpu_after - cpu_before) / (end_time - start_time),
+            rss_bytes=rss,
+        )
+        MODULE_LOGGER.info(
+            "%s events/s: %.1f events/s received", rate, step["events_per_second"]
+        )
+        steps.append(step)
+    return steps
+
+
+# TANGO -> KATCP
+
+
+class SensorStatusClient(BlockingClient):
+    """KATCP client recording the #sensor-status informs it receives"""
+
+    def __init__(self, host, port, recorder, **kwargs):
+        self.recorder = recorder
+        super(SensorStatusClient, self).__init__(host, port, **kwargs)
+
+    def inform_sensor_status(self, msg):
+        """Record the events of a #sensor-status inform"""
+        receive_time = time.time()
+        # Arguments are the timestamp, the number of sensors, and the name,
+        # status and value of each sensor
+        self.recorder.record(float(msg.arguments[0]), receive_time, int(msg.arguments[1]))
+
+    def sample_sensors(self, sensor_names, timeout=5.0):
+        """Set the event sampling strategy of the given sensors"""
+        if self.protocol_flags.bulk_set_sensor_sampling:
+            sensor_names = [",".join(sensor_names)]
+        for sensor_name in sensor_names:
+            reply, _ = self.blocking_request(
+                Message.request("sensor-sampling", sensor_name, "event"), timeout=timeout
+            )
+            if not reply.reply_ok():
+                raise RuntimeError("Could not sample {}: {}".format(sensor_name, reply))
+
+
+def load_generator_attribute_names(num_attributes):
+    """Scalar attributes of a load generator with at least `num_attributes`"""
+    attributes_per_type = int(math.ceil(num_attributes / len(TANGO2KATCP_TYPE_INFO)))
+    return [
+        generated_attribute_name(data_type, False, index)
+        for data_type in sorted(TANGO2KATCP_TYPE_INFO, key=int)
+        for index in range(attributes_per_type)
+    ]
+
+
+@contextmanager
+def load_generator_device(num_attributes):
+    """Run a :class:`LoadGenerator` with at least `num_attributes` attributes
+
+    Yields the device proxy, the device address and the names of the generated
+    attributes.
+
+    """
+    attribute_names = load_generator_attribute_names(num_attributes)
+    properties = dict(
+        num_scalar_attributes=len(attribute_names) // len(TANGO2KATCP_TYPE_INFO),
+        num_spectrum_attributes=0,
+        initial_event_rate=0.0,
+    )
+    tango_context = DeviceTestContext(
+        LoadGenerator, properties=properties, host=socket.getfqdn(), port=free_port()
+    )
+    tango_context.start()
+    try:
+        yield tango_context.device, tango_context.get_device_access(), attribute_names
+    finally:
+        tango_context.stop()
+
+
+@contextmanager
+def tango2katcp_translator(device_address, timings=None):
+    """Run a :class:`TangoDevice2KatcpProxy` translating the device at `device_address`
+
+    The seconds taken by the device inspection and by the whole startup,
+    including the sensor and sampling setup, are set as the "inspection_time"
+    and "startup_time" of `timings` if given.
+
+    """
+    translator = TangoDevice2KatcpProxy.from_addresses(
+        ("127.0.0.1", 0), device_address
+    )
+    inspect = translator.inspecting_client.inspect
+
+    def timed_inspect(*args, **kwargs):
+        start_time = time.time()
+        try:
+            return inspect(*args, **kwargs)
+        finally:
+            if timings is not None:
+                timings["inspection_time"] = time.time() - start_time
+
+    translator.inspecting_client.inspect = timed_inspect
+    start_time = time.time()
+    translator.start(timeout=STARTUP_TIMEOUT)
+    if timings is not None:
+        timings["startup_time"] = time.time() - start_time
+    try:
+        yield translator
+    finally:
+        translator.stop()
+        translator.join(timeout=5.0)
+
+
+def tango2katcp_startup(num_attributes):
+    """Startup time of translating a load generator with `num_attributes`"""
+    with load_generator_device(num_attributes) as (_, device_address, attribute_names):
+        timings = {}
+        with tango2katcp_translator(device_address, timings):
+            _, rss = process_usage()
+        timings.update(attributes=len(attribute_names), rss_bytes=rss)
+        return timings
+
+
+def tango2katcp_throughput(num_attributes, rates, duration, settle_time):
+    """Throughput and latency of translating a load generator at increasing rates"""
+    with load_generator_device(num_attributes) as (
+        device_proxy,
+        device_address,
+        attribute_names,
+    ):
+        with tango2katcp_translator(device_address) as translator:
+            recorder = EventRecorder()
+            host, port = translator.katcp_server.bind_address
+            client = SensorStatusClient(host, port, recorder)
+            client.start(timeout=5.0)
+            try:
+                client.wait_protocol(timeout=5.0)
+                client.sample_sensors(
+                    [tangoname2katcpname(name) for name in attribute_names]
+                )
+                steps = run_rate_steps(
+                    lambda rate: device_proxy.write_attribute("event_rate", rate),
+                    lambda: device_proxy.read_attribute("events_pushed").value,
+                    recorder,
+                    rates,
+                    duration,
+                    settle_time,
+                )
+            finally:
+                client.stop()
+                client.join(timeout=5.0)
+    for step in steps:
+        step["attributes"] = len(attribute_names)
+    return steps
+
+
+# KATCP -> TANGO
+
+
+def load_sensor_name(index):
+    return "load.{}".format(index)
+
+
+class KatcpLoadDevice(DeviceServer):
+    """KATCP device updating float sensors round-robin at a configurable rate
+
+    Sensor values are per-sensor sequence numbers, and updates are timestamped
+    with their send time.
+
+    Parameters
+    ----------
+    host, port :
+        Address to listen on.
+    num_sensors : int
+        Number of sensors, named "load.0", "load.1", etc.
+
+    """
+
+    VERSION_INFO = ("mkat-tango-benchmark-api", 1, 0)
+    BUILD_INFO = ("mkat-tango-benchmark", 0, 1, "")
+
+    def __init__(self, host, port, num_sensors, **kwargs):
+        self.num_sensors = num_sensors
+        # Aggregate sensor updates per second over all the sensors
+        self.event_rate = 0.0
+        self.updates_sent = 0
+        self._next_index = 0
+        self._load_sensors = []
+        self._stopped = threading.Event()
+        self._thread = None
+        super(KatcpLoadDevice, self).__init__(host, port, **kwargs)
+
+    def setup_sensors(self):
+        for index in range(self.num_sensors):
+            sensor = Sensor.float(
+                load_sensor_name(index), "Benchmark load", "", default=0.0
+            )
+            self.add_sensor(sensor)
+            self._load_sensors.append(sensor)
+
+    def start(self, timeout=None):
+        super(KatcpLoadDevice, self).start(timeout=timeout)
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="KatcpLoadDevice")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stopped.set()
+        return super(KatcpLoadDevice, self).stop(timeout=timeout)
+
+    def _run(self):
+        last_batch_time = time.time()
+        updates_due = 0.0
+        while not self._stopped.wait(BATCH_PERIOD):
+            now = time.time()
+            # Catch up on at most a second of updates after a delay
+            updates_due = min(
+                updates_due + self.event_rate * (now - last_batch_time),
+                max(self.event_rate, 1.0),
+            )
+            last_batch_time = now
+            num_updates = int(updates_due)
+            updates_due -= num_updates
+            if num_updates:
+                self.ioloop.add_callback(self._update_sensors, num_updates)
+
+    def _update_sensors(self, num_updates):
+        sensors = self._load_sensors
+        for _ in range(num_updates):
+            sensor = sensors[self._next_index % len(sensors)]
+            self._next_index += 1
+            sensor.set_value(sensor.value() + 1, timestamp=time.time())
+            self.updates_sent += 1
+
+
+class BenchmarkTangoDeviceServer(TangoDeviceServerBase):
+    pass
+
+
+@contextmanager
+def katcp2tango_translator(num_sensors, timings=None):
+    """Run a KATCP load device and a Tango device translating it
+
+    Yields the KATCP load device, the Tango device proxy and the translator. The
+    seconds taken by the Tango device initialisation, which waits for the KATCP
+    device inspection, and by the whole startup, until all the attributes are
+    added and sampled, are set as the "inspection_time" and "startup_time" of
+    `timings` if given.
+
+    """
+    katcp_device = KatcpLoadDevice("127.0.0.1", 0, num_sensors)
+    katcp_device.start(timeout=5.0)
+    try:
+        katcp_host, katcp_port = katcp_device.bind_address
+        properties = dict(
+            katcp_address="{}:{}".format(katcp_host, katcp_port),
+            katcp_sync_timeout=STARTUP_TIMEOUT,
+        )
+        tango_context = DeviceTestContext(
+            BenchmarkTangoDeviceServer,
+            properties=properties,
+            host=socket.getfqdn(),
+            port=free_port(),
+        )
+        start_time = time.time()
+        tango_context.start()
+        try:
+            inspection_time = time.time() - start_time
+            device_proxy = tango_context.device
+            device = BenchmarkTangoDeviceServer.instances[device_proxy.name()]
+            translator = device.tango_katcp_proxy
+            readings = translator.sensor_observer.readings
+            wait_for(lambda: len(readings) >= num_sensors, STARTUP_TIMEOUT)
+            if timings is not None:
+                timings.update(
+                    inspection_time=inspection_time,
+                    startup_time=time.time() - start_time,
+                )
+            yield katcp_device, device_proxy, translator
+        finally:
+            tango_context.stop()
+    finally:
+        katcp_device.stop()
+        katcp_device.join(timeout=5.0)
+
+
+def katcp2tango_startup(num_attributes):
+    """Startup time of translating a KATCP device with `num_attributes` sensors"""
+    timings = {}
+    with katcp2tango_translator(num_attributes, timings):
+        _, rss = process_usage()
+    timings.update(attributes=num_attributes, rss_bytes=rss)
+    return timings
+
+
+def katcp2tango_throughput(num_attributes, rates, duration, settle_time):
+    """Throughput and latency of translating a KATCP device at increasing rates"""
+    with katcp2tango_translator(num_attributes) as (
+        katcp_device,
+        device_proxy,
+        translator,
+    ):
+        recorder = EventRecorder()
+
+        def event_callback(event):
+            if not event.err and event.attr_value is not None:
+                recorder.record(event.attr_value.time.totime(), time.time())
+
+        event_ids = [
+            device_proxy.subscribe_event(
+                translator.name_map.attribute_name(load_sensor_name(index)),
+                tango.EventType.CHANGE_EVENT,
+                event_callback,
+            )
+            for index in range(num_attributes)
+        ]
+        try:
+            steps = run_rate_steps(
+                lambda rate: setattr(katcp_device, "event_rate", rate),
+                lambda: katcp_device.updates_sent,
+                recorder,
+                rates,
+                duration,
+                settle_time,
+            )
+        finally:
+            for event_id in event_ids:
+                device_proxy.unsubscribe_event(event_id)
+    for step in steps:
+        step["attributes"] = num_attributes
+    return steps
+
+
+SCENARIOS = {
+    ("tango2katcp", "startup"): tango2katcp_startup,
+    ("tango2katcp", "throughput"): tango2katcp_throughput,
+    ("katcp2tango", "startup"): katcp2tango_startup,
+    ("katcp2tango", "throughput"): katcp2tango_throughput,
+}
+
+
+def _run_scenario(direction, kind, args):
+    return SCENARIOS[direction, kind](*args)
+
+
+def run_scenario(direction, kind, *args):
+    """Run a benchmark scenario of :const:`SCENARIOS` in a new process"""
+    MODULE_LOGGER.info("Running %s %s benchmark %s", direction, kind, args)
+    pool = multiprocessing.Pool(processes=1)
+    try:
+        return pool.apply(_run_scenario, (direction, kind, args))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def run_benchmarks(
+    directions=DIRECTIONS,
+    attribute_counts=(100, 1000),
+    rates=(100, 1000, 10000),
+    startup_attribute_counts=(100, 1000, 10000),
+    duration=5.0,
+    settle_time=1.0,
+):
+    """Run the benchmarks of the given translator directions
+
+    Parameters
+    ----------
+    directions : list of str
+        Translator directions of :const:`DIRECTIONS` to benchmark.
+    attribute_counts : list of int
+        Numbers of translated attributes to measure throughput and latency with.
+    rates : list of float
+        Aggregate event rates to measure throughput and latency at, in events per
+        second over all the attributes.
+    startup_attribute_counts : list of int
+        Numbers of translated attributes to measure the startup time with.
+    duration : float
+        Seconds to send events for at each rate.
+    settle_time : float
+        Seconds to send events for before measuring at each rate, and to wait
+        for events still in flight afterwards.
+
+    Return Value
+    ------------
+    results : dict
+        JSON serialisable results, with the package version, the benchmark
+        parameters, and "startup" and "throughput" results for each direction.
+        Load generator attribute counts are rounded up to a whole number of
+        attributes per data type.
+
+    """
+    results = dict(
+        version=mkat_tango.__version__,
+        python_version=platform.python_version(),
+        platform=platform.platform(),
+        time=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        parameters=dict(
+            attribute_counts=list(attribute_counts),
+            rates=list(rates),
+            startup_attribute_counts=list(startup_attribute_counts),
+            duration=duration,
+            settle_time=settle_time,
+        ),
+    )
+    for direction in directions:
+        startup = [
+            run_scenario(direction, "startup", num_attributes)
+            for num_attributes in startup_attribute_counts
+        ]
+        throughput = []
+        for num_attributes in attribute_counts:
+            throughput.extend(
+                run_scenario(
+                    direction,
+                    "throughput",
+                    num_attributes,
+                    list(rates),
+                    duration,
+                    settle_time,
+                )
+            )
+        results[direction] = dict(startup=startup, throughput=throughput)
+    return results
+
+
+def _int_list(text):
+    return [int(item) for item in text.split(",") if item]
+
+
+def _float_list(text):
+    return [float(item) for item in text.split(",") if item]
+
+
+def main(args=None):
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(
+        description="Benchmark the throughput, latency and startup time of the "
+        "Tango <-> KATCP translators"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Write the JSON results to this file instead of standard output",
+    )
+    parser.add_argument(
+        "--direction",
+        choices=DIRECTIONS,
+        action="append",
+        help="Translator direction to benchmark, may be given more than once. "
+        "Default: both",
+    )
+    parser.add_argument(
+        "--attribute-counts",
+        type=_int_list,
+        default=[100, 1000],
+        help="Comma separated numbers of attributes to measure throughput and "
+        "latency with. Default: 100,1000",
+    )
+    parser.add_argument(
+        "--rates",
+        type=_float_list,
+        default=[100.0, 1000.0, 10000.0],
+        help="Comma separated aggregate event rates in events/s. "
+        "Default: 100,1000,10000",
+    )
+    parser.add_argument(
+        "--startup-attribute-counts",
+        type=_int_list,
+        default=[100, 1000, 10000],
+        help="Comma separated numbers of attributes to measure the startup time "
+        "with. Default: 100,1000,10000",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=5.0,
+        help="Seconds to measure for at each rate. Default: %(default)s",
+    )
+    parser.add_argument(
+        "--settle-time",
+        type=float,
+        default=1.0,
+        help="Seconds to run before measuring at each rate, and to wait for "
+        "events in flight afterwards. Default: %(default)s",
+    )
+    parser.add_argument(
+        "-l",
+        "--loglevel",
+        default="WARNING",
+        help="Level for logging as per Python loglevel names. Default: %(default)s",
+    )
+    opts = parser.parse_args(args=args)
+    logging.basicConfig(
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        level=getattr(logging, opts.loglevel.upper()),
+    )
+
+    results = run_benchmarks(
+        directions=opts.direction or DIRECTIONS,
+        attribute_counts=opts.attribute_counts,
+        rates=opts.rates,
+        startup_attribute_counts=opts.startup_attribute_counts,
+        duration=opts.duration,
+        settle_time=opts.settle_time,
+    )
+    if opts.output:
+        with open(opts.output, "w") as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,19 +15,290 @@ standard_library.install_aliases()
 
 import logging
 import threading
-import time
 import weakref
 
-from functools import partial
+from builtins import object
 
-from past.builtins import cmp
+import numpy as np
+import tango
 
 from tango import AttrQuality, DevState
 from tango.server import Device, attribute, command, server_run
 
+from mkat_tango.simulators.clock import get_sim_clock
+
 # Module logger reporting events that occur during normal operation of device
 LOGGER = logging.getLogger(__name__)
 
+AZIMUTH, ELEVATION = 0, 1
+AXIS_ATTRIBUTES = ("actual_azimuth", "actual_elevation")
+
+
+class MotionScheduler(object):
+    """Steps the axes of all the antenna positioners of a process together
+
+    The positions, requested positions and drive rates of the azimuth and
+    elevation axes are held in NumPy arrays with a row per positioner, and all
+    the moving axes are stepped in one vectorised update per tick. The change
+    events of the stepped axes are pushed in one batch after each update.
+
+    Parameters
+    ----------
+    update_period : float
+        Simulation time between updates in seconds, may be changed while running.
+    clock : :class:`mkat_tango.simulators.clock.SimClock` or None
+        Clock to take the simulation time from, the shared clock by default.
+    arrival_threshold : float
+        An axis stops moving once within this many degrees of its requested
+        position.
+    capacity : int
+        Number of positioners to allocate space for, grown as needed.
+
+    """
+
+    def __init__(
+        self, update_period=1.0, clock=None, arrival_threshold=1e-2, capacity=16
+    ):
+        self.update_period = update_period
+        self.clock = get_sim_clock() if clock is None else clock
+        self.arrival_threshold = arrival_threshold
+        self.last_update_time = self.clock.time()
+        # Set while the scheduler thread is running
+        self.running = threading.Event()
+        self._positioners = []
+        self.actual = np.zeros((capacity, 2))
+        self.actual_time = np.zeros((capacity, 2))
+        self.requested = np.zeros((capacity, 2))
+        self.requested_time = np.zeros((capacity, 2))
+        self.drive_rate = np.zeros((capacity, 2))
+        self.moving = np.zeros((capacity, 2), dtype=bool)
+        # Positioners with a requested mode of "stop"
+        self.stopped = np.ones(capacity, dtype=bool)
+        # Positioners that were last given an actual mode of "point"
+        self.pointing = np.zeros(capacity, dtype=bool)
+        self._lock = threading.RLock()
+        self._thread = None
+
+    @property
+    def num_positioners(self):
+        return len(self._positioners)
+
+    def add_positioner(self, positioner, azimuth, elevation):
+        """Add a positioner at rest at the given position, returning its row index
+
+        Only a weak reference to `positioner` is kept. It must have `act_mode` and
+        :meth:`push_change_event` like :class:`AntennaPositioner`.
+
+        """
+        with self._lock:
+            slot = len(self._positioners)
+            if slot == len(self.actual):
+                self._grow(2 * len(self.actual))
+            self.actual[slot] = self.requested[slot] = (azimuth, elevation)
+            self.actual_time[slot] = self.requested_time[slot] = 0
+            self.drive_rate[slot] = 0.0
+            self.moving[slot] = False
+            self.stopped[slot] = True
+            self.pointing[slot] = False
+            self._positioners.append(weakref.ref(positioner))
+            return slot
+
+    def _grow(self, capacity):
+        for name in (
+            "actual",
+            "actual_time",
+            "requested",
+            "requested_time",
+            "drive_rate",
+            "moving",
+            "stopped",
+            "pointing",
+        ):
+            array = getattr(self, name)
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[: len(array)] = array
+            setattr(self, name, grown)
+
+    def axis_quantity(self, slot, axis, key):
+        """Quantity of an axis of a positioner, see :class:`AxisQuantities`"""
+        with self._lock:
+            if key == "actual":
+                return (
+                    float(self.actual[slot, axis]),
+                    float(self.actual_time[slot, axis]),
+                    AttrQuality.ATTR_VALID,
+                )
+            if key == "requested":
+                return (
+                    float(self.requested[slot, axis]),
+                    float(self.requested_time[slot, axis]),
+                    AttrQuality.ATTR_VALID,
+                )
+            if key == "drive_rate":
+                return float(self.drive_rate[slot, axis])
+            if key == "moving":
+                return bool(self.moving[slot, axis])
+            if key == "running":
+                return self.running
+        raise KeyError(key)
+
+    def set_axis_quantity(self, slot, axis, key, value):
+        """Set a quantity of an axis of a positioner, see :class:`AxisQuantities`"""
+        with self._lock:
+            if key == "actual":
+                self.actual[slot, axis], self.actual_time[slot, axis] = value[:2]
+            elif key == "requested":
+                self.requested[slot, axis], self.requested_time[slot, axis] = value[:2]
+            elif key == "drive_rate":
+                self.drive_rate[slot, axis] = value
+            elif key == "moving":
+                self.moving[slot, axis] = value
+            else:
+                raise KeyError(key)
+
+    def set_stopped(self, slot, stopped):
+        """Record whether a positioner has a requested mode of "stop" or not"""
+        with self._lock:
+            self.stopped[slot] = stopped
+
+    def step(self, t=None):
+        """Step all the moving axes to time `t` and push their change events
+
+        Axes move towards their requested positions at their drive rates, unless
+        the requested mode of their positioner is "stop" and they are not moving.
+
+        """
+        t = self.clock.time() if t is None else t
+        events = []
+        modes = []
+        with self._lock:
+            num_positioners = len(self._positioners)
+            dt = t - self.last_update_time
+            self.last_update_time = t
+            actual = self.actual[:num_positioners]
+            requested = self.requested[:num_positioners]
+            moving = self.moving[:num_positioners]
+            stepping = ~(self.stopped[:num_positioners, None] & ~moving)
+
+            delta = requested - actual
+            max_slew = self.drive_rate[:num_positioners] * dt
+            arriving = np.abs(delta) <= max_slew
+            new_actual = np.where(arriving, requested, actual + np.sign(delta) * max_slew)
+            changed = stepping & (new_actual != actual)
+            actual[stepping] = new_actual[stepping]
+            self.actual_time[:num_positioners][stepping] = t
+            arrived = np.abs(requested - actual) <= self.arrival_threshold
+            moving[stepping] = ~arrived[stepping]
+
+            pointing = moving.any(axis=1)
+            mode_changed = pointing != self.pointing[:num_positioners]
+            self.pointing[:num_positioners] = pointing
+            for slot, axis in zip(*np.nonzero(changed)):
+                events.append((slot, AXIS_ATTRIBUTES[axis], float(actual[slot, axis])))
+            for slot in np.nonzero(mode_changed)[0]:
+                modes.append((slot, "point" if pointing[slot] else "stop"))
+            positioners = self._positioners
+
+        for slot, mode in modes:
+            positioner = positioners[slot]()
+            if positioner is not None:
+                positioner.act_mode = mode, t, AttrQuality.ATTR_VALID
+        for slot, attr_name, value in events:
+            positioner = positioners[slot]()
+            if positioner is None:
+                continue
+            try:
+                positioner.push_change_event(attr_name, value, t, AttrQuality.ATTR_VALID)
+            except Exception:
+                LOGGER.debug("Error pushing %s change event", attr_name, exc_info=True)
+        if events:
+            LOGGER.debug("Stepped %d positioner axes at %s", len(events), t)
+
+    def start(self):
+        """Start stepping every `update_period` in a daemon thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.last_update_time = self.clock.time()
+        self.running.set()
+        self._thread = threading.Thread(target=self._run, name="MotionScheduler")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self.running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        with tango.EnsureOmniThread():
+            next_update_time = self.last_update_time + self.update_period
+            while self.running.is_set():
+                # Wake up regularly to notice stop(), also when the clock is paused
+                if not self.clock.wait_until(next_update_time, timeout=1.0):
+                    continue
+                if not self.running.is_set():
+                    break
+                try:
+                    self.step()
+                except Exception:
+                    LOGGER.exception("Exception in update loop")
+                next_update_time = self.last_update_time + self.update_period
+
+
+class AxisQuantities(object):
+    """Dict-like view of the state of one axis of a positioner in a MotionScheduler
+
+    Has the keys "actual" and "requested", with (value, timestamp, quality) tuple
+    values of which the quality is always ATTR_VALID, "drive_rate", "moving" and
+    "running", the :class:`threading.Event` set while the scheduler is running.
+
+    """
+
+    KEYS = ("actual", "requested", "drive_rate", "moving", "running")
+
+    def __init__(self, scheduler, slot, axis):
+        self._scheduler = scheduler
+        self._slot = slot
+        self._axis = axis
+
+    def __getitem__(self, key):
+        return self._scheduler.axis_quantity(self._slot, self._axis, key)
+
+    def __setitem__(self, key, value):
+        self._scheduler.set_axis_quantity(self._slot, self._axis, key, value)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def keys(self):
+        return list(self.KEYS)
+
+
+_motion_scheduler = None
+_motion_scheduler_lock = threading.Lock()
+
+
+def get_motion_scheduler(update_period=1.0):
+    """The running :class:`MotionScheduler` shared by the positioners of a process
+
+    The scheduler is created with `update_period` on the first call. Change its
+    `update_period` attribute to change the rate afterwards.
+
+    """
+    global _motion_scheduler
+    with _motion_scheduler_lock:
+        if _motion_scheduler is None:
+            _motion_scheduler = MotionScheduler(update_period)
+            _motion_scheduler.start()
+        return _motion_scheduler
+
 
 class AntennaPositioner(Device):
     """Antenna Positioner device server with simulated attributes"""
@@ -41,20 +312,13 @@ class AntennaPositioner(Device):
 
     def __init__(self, *args, **kwargs):
         """Initialize attribute values and change events for update"""
-        valid = AttrQuality.ATTR_VALID
-        self.azimuth_quantities = dict(
-            actual=(0.0, 0, valid),
-            requested=(0.0, 0, valid),
-            drive_rate=0.0,
-            moving=False,
-            running=threading.Event(),
+        self.motion_scheduler = get_motion_scheduler(self.UPDATE_PERIOD)
+        self.motion_slot = self.motion_scheduler.add_positioner(self, 0.0, 90.0)
+        self.azimuth_quantities = AxisQuantities(
+            self.motion_scheduler, self.motion_slot, AZIMUTH
         )
-        self.elevation_quantities = dict(
-            actual=(90.0, 0, valid),
-            requested=(90.0, 0, valid),
-            drive_rate=0.0,
-            moving=False,
-            running=threading.Event(),
+        self.elevation_quantities = AxisQuantities(
+            self.motion_scheduler, self.motion_slot, ELEVATION
         )
         super(AntennaPositioner, self).__init__(*args, **kwargs)
         self.set_change_event("actual_azimuth", True)
@@ -68,19 +332,15 @@ class AntennaPositioner(Device):
         self.set_state(DevState.ON)
         self.req_mode = "stop", 0, AttrQuality.ATTR_VALID
         self.act_mode = "stop", 0, AttrQuality.ATTR_VALID
-        self.azimuth_update = partial(
-            self.update_position, "actual_azimuth", self.azimuth_quantities
-        )
-        self.elevation_update = partial(
-            self.update_position, "actual_elevation", self.elevation_quantities
-        )
 
-        self.az_thread = threading.Thread(target=self.azimuth_update)
-        self.el_thread = threading.Thread(target=self.elevation_update)
-        self.az_thread.setDaemon(True)
-        self.el_thread.setDaemon(True)
-        self.az_thread.start()
-        self.el_thread.start()
+    @property
+    def req_mode(self):
+        return self._req_mode
+
+    @req_mode.setter
+    def req_mode(self, mode):
+        self._req_mode = mode
+        self.motion_scheduler.set_stopped(self.motion_slot, mode[0] == "stop")
 
     # ATTRIBUTES
 
@@ -91,7 +351,7 @@ class AntennaPositioner(Device):
     @requested_mode.write
     def requested_mode(self, new_mode, valid=AttrQuality.ATTR_VALID):
         if self.req_mode[0] != new_mode:
-            self.req_mode = new_mode, time.time(), valid
+            self.req_mode = new_mode, self.motion_scheduler.clock.time(), valid
 
     @attribute(label="Actual operational mode of the AP", dtype=str)
     def actual_mode(self):
@@ -108,7 +368,8 @@ class AntennaPositioner(Device):
         return self.azimuth_quantities["requested"]
 
     @requested_azimuth.write
-    def requested_azimuth(self, azimuth, timestamp=time.time):
+    def requested_azimuth(self, azimuth, timestamp=None):
+        timestamp = timestamp or self.motion_scheduler.clock.time
         valid = AttrQuality.ATTR_VALID
         self.azimuth_quantities["requested"] = (azimuth, timestamp(), valid)
 
@@ -138,7 +399,8 @@ class AntennaPositioner(Device):
         return self.elevation_quantities["requested"]
 
     @requested_elevation.write
-    def requested_elevation(self, elevation, timestamp=time.time):
+    def requested_elevation(self, elevation, timestamp=None):
+        timestamp = timestamp or self.motion_scheduler.clock.time
         valid = AttrQuality.ATTR_VALID
         self.elevation_quantities["requested"] = (elevation, timestamp(), valid)
 
@@ -201,77 +463,31 @@ class AntennaPositioner(Device):
         """Takes two values return true if they are almost equal"""
         return abs(x - y) <= abs_threshold
 
-    def update_position(self, attr_name, sim_quantities):
-        """Updates the position of the el-az coordinates
-              using a simulation loop"""
-        running = sim_quantities["running"]
-        running.set()
-        time_func = time.time
-        last_update_time = time_func()
-
-        while running.is_set():
-            if self.req_mode[0] == "stop" and sim_quantities["moving"] is False:
-                self.act_mode = "stop", time_func(), AttrQuality.ATTR_VALID
-                time.sleep(self.UPDATE_PERIOD)
-                continue
-            else:
-                last_update_time = time_func()
-                time.sleep(self.UPDATE_PERIOD)
-                pass
-
-            sim_time = time_func()
-            self.act_mode = "point", time_func(), AttrQuality.ATTR_VALID
-            sim_quantities["moving"] = True
-            dt = sim_time - last_update_time
-            try:
-                slew_rate = sim_quantities["drive_rate"]
-                max_slew = slew_rate * dt
-                actual = sim_quantities["actual"][0]
-                requested = sim_quantities["requested"][0]
-                curr_delta = abs(actual - requested)
-                move_delta = min(max_slew, curr_delta)
-                new_position = actual + cmp(requested, actual) * move_delta
-                quality = AttrQuality.ATTR_VALID
-                sim_quantities["actual"] = (new_position, sim_time, quality)
-                last_update_time = sim_time
-                self.push_change_event(attr_name, new_position, sim_time, quality)
-                LOGGER.info(
-                    "Stepping at {} for {}, requested: {} & actual: {}".format(
-                        sim_time, attr_name, requested, new_position
-                    )
-                )
-            except Exception:
-                LOGGER.exception("Exception in update loop", exc_info=True)
-            if self.almost_equal(
-                sim_quantities["requested"][0], sim_quantities["actual"][0]
-            ):
-                if self.act_mode[0] == "point":
-                    sim_quantities["moving"] = False
-                    self._update_moving()
-
-    def _update_moving(self):
-        """Checkes the motion flag of both el-az coordinates if false
-               and then sets the AP mode to stop"""
-        if (
-            self.azimuth_quantities["moving"] is False
-            and self.elevation_quantities["moving"] is False
-        ):
-            self.act_mode = "stop", time.time(), AttrQuality.ATTR_VALID
+    @command(dtype_in=float, doc_in="Simulation seconds to advance the clock by")
+    def AdvanceClock(self, seconds):
+        """Advance the simulation clock, stepping the positioners at once"""
+        self.motion_scheduler.clock.advance(seconds)
+
+    @command(dtype_in=float, doc_in="Simulation seconds per wall-clock second")
+    def SetClockSpeedUp(self, speed_up):
+        """Set the speed-up factor of the simulation clock"""
+        self.motion_scheduler.clock.speed_up = speed_up
 
     @command
     def Slew(self):
         """Set the simulator operation mode to slew to desired coordinates."""
-        self.req_mode = "slew", time.time(), AttrQuality.ATTR_VALID
+        self.req_mode = "slew", self.motion_scheduler.clock.time(), AttrQuality.ATTR_VALID
 
     @command
     def Stop(self):
         """Stop the Antenna Positioner instantly"""
-        self.act_mode = self.req_mode = ("stop", time.time(), AttrQuality.ATTR_VALID)
+        timestamp = self.motion_scheduler.clock.time()
+        self.act_mode = self.req_mode = ("stop", timestamp, AttrQuality.ATTR_VALID)
 
     @command
     def Stow(self):
         """Stow/Park the AP to its intitial state of operation"""
-        time_func = time.time
+        time_func = self.motion_scheduler.clock.time
         valid = AttrQuality.ATTR_VALID
         self.azimuth_quantities["drive_rate"] = self.AZIM_DRIVE_MAX_RATE
         self.elevation_quantities["drive_rate"] = self.ELEV_DRIVE_MAX_RATE
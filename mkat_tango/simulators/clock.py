@@ -0,0 +1,148 @@
+# clock.py
+# -*- coding: utf8 -*-
+# vim:fileencoding=utf8 ai ts=4 sts=4 et sw=4
+# Copyright 2016 National Research Foundation (South African Radio Astronomy Observatory)
+# BSD license - see LICENSE for details
+
+"""
+Simulation clock for the simulators.
+
+The simulators take their time from a :class:`SimClock` instead of the wall
+clock, so that scenarios can run faster than real time, or be stepped through
+by advancing the clock manually, with the same simulated physics.
+"""
+from __future__ import absolute_import, division, print_function
+from future import standard_library
+
+standard_library.install_aliases()
+
+import logging
+import os
+import threading
+import time
+
+from builtins import object
+
+MODULE_LOGGER = logging.getLogger(__name__)
+
+# Environment variable with the speed-up factor of the shared simulation clock
+SPEED_UP_ENV = "MKAT_TANGO_SIM_CLOCK_SPEED_UP"
+
+
+class SimClock(object):
+    """Simulation time running at a multiple of wall-clock time
+
+    Parameters
+    ----------
+    speed_up : float
+        Simulated seconds per wall-clock second. The clock only moves when
+        advanced manually if 0.
+    start_time : float or None
+        Simulation time to start at, defaults to the current wall-clock time.
+    wall_time_func : callable
+        Function returning the current wall-clock time, e.g. :func:`time.time`.
+
+    """
+
+    def __init__(self, speed_up=1.0, start_time=None, wall_time_func=time.time):
+        if speed_up < 0:
+            raise ValueError("Negative clock speed-up {}".format(speed_up))
+        self._wall_time_func = wall_time_func
+        self._condition = threading.Condition()
+        self._speed_up = float(speed_up)
+        self._wall_anchor = wall_time_func()
+        self._sim_anchor = self._wall_anchor if start_time is None else start_time
+
+    def time(self):
+        """Current simulation time in seconds"""
+        with self._condition:
+            return self._now()
+
+    __call__ = time
+
+    def _now(self):
+        elapsed = self._wall_time_func() - self._wall_anchor
+        return self._sim_anchor + elapsed * self._speed_up
+
+    @property
+    def speed_up(self):
+        return self._speed_up
+
+    @speed_up.setter
+    def speed_up(self, speed_up):
+        if speed_up < 0:
+            raise ValueError("Negative clock speed-up {}".format(speed_up))
+        with self._condition:
+            self._sim_anchor = self._now()
+            self._wall_anchor = self._wall_time_func()
+            self._speed_up = float(speed_up)
+            self._condition.notify_all()
+        MODULE_LOGGER.info("Simulation clock speed-up set to %s", speed_up)
+
+    def advance(self, seconds):
+        """Move the simulation time forward by `seconds` at once"""
+        if seconds < 0:
+            raise ValueError("Cannot move the clock back by {}s".format(-seconds))
+        with self._condition:
+            self._sim_anchor += seconds
+            self._condition.notify_all()
+        MODULE_LOGGER.info("Simulation clock advanced by %ss", seconds)
+
+    def wait_until(self, sim_time, timeout=None):
+        """Block until the simulation time reaches `sim_time`
+
+        Parameters
+        ----------
+        sim_time : float
+            Simulation time to wait for.
+        timeout : float or None
+            Give up after this many wall-clock seconds.
+
+        Return Value
+        ------------
+        reached : bool
+            True if `sim_time` was reached, False on timeout.
+
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while True:
+                remaining = sim_time - self._now()
+                if remaining <= 0:
+                    return True
+                wait = remaining / self._speed_up if self._speed_up > 0 else None
+                if deadline is not None:
+                    wall_remaining = deadline - time.time()
+                    if wall_remaining <= 0:
+                        return False
+                    wait = wall_remaining if wait is None else min(wait, wall_remaining)
+                self._condition.wait(wait)
+
+    def sleep(self, seconds):
+        """Block for `seconds` of simulation time"""
+        self.wait_until(self.time() + seconds)
+
+
+_sim_clock = None
+_sim_clock_lock = threading.Lock()
+
+
+def get_sim_clock():
+    """The :class:`SimClock` shared by the simulators of this process
+
+    Created on first use, with the speed-up factor from the
+    MKAT_TANGO_SIM_CLOCK_SPEED_UP environment variable if set.
+
+    """
+    global _sim_clock
+    with _sim_clock_lock:
+        if _sim_clock is None:
+            _sim_clock = SimClock(float(os.environ.get(SPEED_UP_ENV, 1.0)))
+        return _sim_clock
+
+
+def set_sim_clock(clock):
+    """Replace the shared clock, e.g. before starting simulators in tests"""
+    global _sim_clock
+    with _sim_clock_lock:
+        _sim_clock = clock
@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+# load_generator.py
+# -*- coding: utf8 -*-
+# vim:fileencoding=utf8 ai ts=4 sts=4 et sw=4
+# Copyright 2016 National Research Foundation (South African Radio Astronomy Observatory)
+# BSD license - see LICENSE for details
+
+"""
+Synthetic load generator Tango device for stress testing the translators.
+
+The device has scalar and spectrum attributes of every data type translated to
+KATCP, and pushes change events for them at a configurable aggregate rate. Each
+attribute value embeds a per-attribute sequence number, and each event carries
+its send time as timestamp, so that receivers can measure event loss and
+latency.
+"""
+from __future__ import absolute_import, division, print_function
+from future import standard_library
+
+standard_library.install_aliases()
+
+import json
+import logging
+import random
+import threading
+import time
+import weakref
+
+from builtins import object, range
+from collections import OrderedDict
+from functools import partial
+
+import numpy as np
+import tango
+
+from tango import Attr, AttrQuality, AttrWriteType, DevFailed, DevState, SpectrumAttr
+from tango import UserDefaultAttrProp
+from tango import (
+    DevFloat,
+    DevDouble,
+    DevUChar,
+    DevShort,
+    DevUShort,
+    DevLong,
+    DevULong,
+    DevLong64,
+    DevULong64,
+    DevBoolean,
+    DevString,
+    DevEnum,
+)
+from tango.server import Device, attribute, device_property, server_run
+
+from mkat_tango.translators.katcp_tango_proxy import (
+    TANGO2KATCP_TYPE_INFO,
+    TANGO_CMDARGTYPE_NUM2NAME,
+)
+
+MODULE_LOGGER = logging.getLogger(__name__)
+
+# Time between batches of events, in seconds
+BATCH_PERIOD = 0.01
+ENUM_LABELS = ("ZERO", "ONE", "TWO", "THREE")
+STATE_VALUES = (DevState.ON, DevState.STANDBY, DevState.ALARM, DevState.FAULT)
+# Tango has no spectrum attributes of these types
+SCALAR_ONLY_TYPES = frozenset([DevEnum, tango.CmdArgType.DevState])
+TANGO_TYPE_DTYPES = {
+    DevFloat: np.float32,
+    DevDouble: np.float64,
+    DevUChar: np.uint8,
+    DevShort: np.int16,
+    DevUShort: np.uint16,
+    DevLong: np.int32,
+    DevULong: np.uint32,
+    DevLong64: np.int64,
+    DevULong64: np.uint64,
+    DevBoolean: np.bool_,
+}
+# Sequence numbers are embedded modulo these values for the small types
+SEQUENCE_NUMBER_MODULI = {
+    # The integers a float32 represents exactly
+    DevFloat: 1 << 24,
+    DevUChar: 1 << 8,
+    DevShort: 1 << 15,
+    DevUShort: 1 << 16,
+    DevLong: 1 << 31,
+    DevULong: 1 << 32,
+    DevBoolean: 2,
+    DevEnum: len(ENUM_LABELS),
+    tango.CmdArgType.DevState: len(STATE_VALUES),
+}
+FLIPPED_QUALITIES = (
+    AttrQuality.ATTR_WARNING,
+    AttrQuality.ATTR_ALARM,
+    AttrQuality.ATTR_INVALID,
+)
+# Scalar DevDouble attribute that comes and goes to change the device interface
+INTERFACE_CHANGE_ATTRIBUTE = "interface_change_double"
+
+
+def generated_attribute_name(data_type, spectrum, index):
+    """Name of a generated attribute, e.g. "double_spectrum_0" """
+    type_name = TANGO_CMDARGTYPE_NUM2NAME[data_type]
+    return "{}_{}_{}".format(
+        type_name[len("Dev"):].lower(), "spectrum" if spectrum else "scalar", index
+    )
+
+
+def generated_value(data_type, spectrum_length, sequence_number, send_time):
+    """Attribute value embedding a sequence number
+
+    Parameters
+    ----------
+    data_type : :class:`tango.CmdArgType`
+    spectrum_length : int or None
+        Number of spectrum elements, or None for a scalar attribute.
+    sequence_number : int
+    send_time : float
+        Embedded in string values next to the sequence number.
+
+    Return Value
+    ------------
+    value :
+        Numbers, enum indexes and states encode the sequence number, modulo
+        :const:`SEQUENCE_NUMBER_MODULI` for small types. Strings are JSON objects
+        with "seq" and "sent" keys. Spectra count up from the sequence number.
+
+    """
+    if data_type == DevString:
+        value = json.dumps({"seq": sequence_number, "sent": send_time})
+        return value if spectrum_length is None else [value] * spectrum_length
+    modulus = SEQUENCE_NUMBER_MODULI.get(data_type)
+    if spectrum_length is None:
+        number = sequence_number if modulus is None else sequence_number % modulus
+        if data_type == DevEnum:
+            return number
+        if data_type == tango.CmdArgType.DevState:
+            return STATE_VALUES[number]
+        return TANGO_TYPE_DTYPES[data_type](number).item()
+    numbers = np.arange(sequence_number, sequence_number + spectrum_length)
+    if modulus is not None:
+        numbers %= modulus
+    return numbers.astype(TANGO_TYPE_DTYPES[data_type])
+
+
+def embedded_sequence_number(data_type, value):
+    """Sequence number embedded by :func:`generated_value`, modulo the type's modulus"""
+    if data_type == DevString:
+        if isinstance(value, (list, tuple)):
+            value = value[0]
+        return json.loads(value)["seq"]
+    if data_type == tango.CmdArgType.DevState:
+        return STATE_VALUES.index(value)
+    if np.ndim(value):
+        value = value[0]
+    return int(value)
+
+
+class GeneratedAttribute(object):
+    """Latest value of a generated attribute"""
+
+    __slots__ = (
+        "name",
+        "data_type",
+        "spectrum_length",
+        "sequence_number",
+        "value",
+        "timestamp",
+        "quality",
+    )
+
+    def __init__(self, name, data_type, spectrum_length=None):
+        self.name = name
+        self.data_type = data_type
+        self.spectrum_length = spectrum_length
+        self.sequence_number = 0
+        self.timestamp = time.time()
+        self.value = generated_value(data_type, spectrum_length, 0, self.timestamp)
+        self.quality = AttrQuality.ATTR_VALID
+
+    def next_value(self, send_time, quality):
+        """Step to the next sequence number, sent at `send_time`"""
+        self.sequence_number += 1
+        self.value = generated_value(
+            self.data_type, self.spectrum_length, self.sequence_number, send_time
+        )
+        self.timestamp = send_time
+        self.quality = quality
+
+
+class LoadGenerator(Device):
+    """Simulator pushing change events of many attributes at a high rate"""
+
+    # Access instances for debugging
+    instances = weakref.WeakValueDictionary()
+
+    num_scalar_attributes = device_property(
+        dtype=int, default_value=1, doc="Number of scalar attributes per data type"
+    )
+    num_spectrum_attributes = device_property(
+        dtype=int, default_value=1, doc="Number of spectrum attributes per data type"
+    )
+    spectrum_length = device_property(
+        dtype=int, default_value=16, doc="Number of elements of spectrum attributes"
+    )
+    initial_event_rate = device_property(
+        dtype=float,
+        default_value=100.0,
+        doc="Change events per second over all the generated attributes",
+    )
+    quality_flip_probability = device_property(
+        dtype=float,
+        default_value=0.0,
+        doc="Probability of an event flipping the attribute quality between valid "
+        "and a random warning, alarm or invalid quality",
+    )
+    interface_change_period = device_property(
+        dtype=float,
+        default_value=0.0,
+        doc="Seconds between adding or removing an attribute, 0 to disable",
+    )
+
+    def init_device(self):
+        super(LoadGenerator, self).init_device()
+        self.instances[self.get_name()] = self
+        if not hasattr(self, "_generated"):
+            # Kept on re-initialisation by the Init command, since the dynamic
+            # attributes are only added when the device is created
+            self._lock = threading.Lock()
+            # Generated attribute names as keys, GeneratedAttribute as values
+            self._generated = OrderedDict()
+        self._next_index = 0
+        self._event_rate = max(self.initial_event_rate, 0.0)
+        self._events_pushed = 0
+        self._interface_changes = 0
+        self._random = random.Random()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="LoadGenerator")
+        self._thread.daemon = True
+        self._thread.start()
+        self.set_state(DevState.ON)
+
+    def delete_device(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def initialize_dynamic_attributes(self):
+        """Add the generated attributes of every translated data type"""
+        for data_type in sorted(TANGO2KATCP_TYPE_INFO, key=int):
+            for index in range(self.num_scalar_attributes):
+                self._add_generated_attribute(
+                    generated_attribute_name(data_type, False, index), data_type
+                )
+            if data_type in SCALAR_ONLY_TYPES:
+                continue
+            for index in range(self.num_spectrum_attributes):
+                self._add_generated_attribute(
+                    generated_attribute_name(data_type, True, index),
+                    data_type,
+                    self.spectrum_length,
+                )
+        MODULE_LOGGER.info("Added %d generated attributes", len(self._generated))
+
+    def _add_generated_attribute(self, name, data_type, spectrum_length=None):
+        if spectrum_length is None:
+            attr = Attr(name, data_type, AttrWriteType.READ)
+        else:
+            attr = SpectrumAttr(name, data_type, AttrWriteType.READ, spectrum_length)
+        if data_type == DevEnum:
+            attr_props = UserDefaultAttrProp()
+            attr_props.set_enum_labels(list(ENUM_LABELS))
+            attr.set_default_properties(attr_props)
+        # Push the events without any change detection
+        attr.set_change_event(True, False)
+        generated = GeneratedAttribute(name, data_type, spectrum_length)
+        self.add_attribute(attr, self.read_generated_attribute)
+        with self._lock:
+            self._generated[name] = generated
+
+    def _remove_generated_attribute(self, name):
+        with self._lock:
+            del self._generated[name]
+        self.remove_attribute(name)
+
+    def read_generated_attribute(self, attr):
+        generated = self._generated[attr.get_name()]
+        attr.set_value_date_quality(
+            generated.value, generated.timestamp, generated.quality
+        )
+
+    # ATTRIBUTES
+
+    @attribute(
+        dtype=float,
+        access=AttrWriteType.READ_WRITE,
+        unit="events/s",
+        doc="Change events per second over all the generated attributes, 0 to pause",
+    )
+    def event_rate(self):
+        return self._event_rate
+
+    @event_rate.write
+    def event_rate(self, rate):
+        self._event_rate = max(rate, 0.0)
+
+    @attribute(dtype=int, doc="Number of change events pushed since initialisation")
+    def events_pushed(self):
+        return self._events_pushed
+
+    @attribute(dtype=int, doc="Number of attributes added or removed while running")
+    def interface_changes(self):
+        return self._interface_changes
+
+    # EVENT GENERATION
+
+    def _run(self):
+        with tango.EnsureOmniThread():
+            last_batch_time = time.time()
+            next_interface_change = last_batch_time + self.interface_change_period
+            events_due = 0.0
+            while not self._stopped.wait(BATCH_PERIOD):
+                now = time.time()
+                # Catch up on at most a second of events after a delay
+                events_due = min(
+                    events_due + self._event_rate * (now - last_batch_time),
+                    max(self._event_rate, 1.0),
+                )
+                last_batch_time = now
+                num_events = int(events_due)
+                events_due -= num_events
+                try:
+                    if num_events:
+                        self._push_events(num_events)
+                    if self.interface_change_period > 0 and now >= next_interface_change:
+                        next_interface_change = now + self.interface_change_period
+                        self._change_interface()
+                except Exception:
+                    MODULE_LOGGER.exception("Error generating events")
+
+    def _push_events(self, num_events):
+        with self._lock:
+            generated_attributes = list(self._generated.values())
+        if not generated_attributes:
+            return
+        with tango.AutoTangoMonitor(self):
+            for _ in range(num_events):
+                generated = generated_attributes[
+                    self._next_index % len(generated_attributes)
+                ]
+                self._next_index += 1
+                quality = generated.quality
+                if self._random.random() < self.quality_flip_probability:
+                    if quality == AttrQuality.ATTR_VALID:
+                        quality = self._random.choice(FLIPPED_QUALITIES)
+                    else:
+                        quality = AttrQuality.ATTR_VALID
+                generated.next_value(time.time(), quality)
+                try:
+                    self.push_change_event(
+                        generated.name,
+                        generated.value,
+                        generated.timestamp,
+                        generated.quality,
+                    )
+                except DevFailed:
+                    # The attribute may have been removed by an interface change
+                    MODULE_LOGGER.debug(
+                        "Could not push event for %s", generated.name, exc_info=True
+                    )
+                else:
+                    self._events_pushed += 1
+
+    def _change_interface(self):
+        with tango.AutoTangoMonitor(self):
+            if INTERFACE_CHANGE_ATTRIBUTE in self._generated:
+                self._remove_generated_attribute(INTERFACE_CHANGE_ATTRIBUTE)
+            else:
+                self._add_generated_attribute(INTERFACE_CHANGE_ATTRIBUTE, DevDouble)
+        self._interface_changes += 1
+
+
+load_generator_main = partial(server_run, [LoadGenerator])
+
+if __name__ == "__main__":
+    load_generator_main()
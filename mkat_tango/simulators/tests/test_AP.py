@@ -16,9 +16,15 @@ import time
 import unittest
 
 import mock
+
+from builtins import object, range
+
+from tango import AttrQuality
 from tango.test_context import DeviceTestContext
 
 from mkat_tango.simulators import AntennaPositionerDS
+from mkat_tango.simulators.AntennaPositionerDS import AxisQuantities
+from mkat_tango.simulators.clock import SimClock
 
 
 class AntennaPositionerTestCase(unittest.TestCase):
@@ -77,6 +83,12 @@ class AntennaPositionerTestCase(unittest.TestCase):
             self.device_server_instance.elevation_quantities["running"].is_set(), True
         )
 
+    def test_shared_motion_scheduler(self):
+        """Testing that the device axes are stepped by the shared scheduler"""
+        scheduler = AntennaPositionerDS.get_motion_scheduler()
+        self.assertIs(self.device_server_instance.motion_scheduler, scheduler)
+        self.assertTrue(scheduler.running.is_set())
+
     def _write_coordinate_attributes(self, desired_az, desired_el):
         """Method for setting desired values to writable coordinate attributes"""
         self.assertNotEqual(self.az_state["requested"][0], desired_az)
@@ -137,6 +149,27 @@ class AntennaPositionerTestCase(unittest.TestCase):
         self._read_coordinate_attributes(desired_az, desired_el)
         self.assertEqual(self.tango_dp.actual_mode, "stop")
 
+    def test_slew_with_advanced_clock(self):
+        """Testing that advancing the clock completes a slew at once"""
+        actual_az = self.tango_dp.actual_azimuth
+        actual_el = self.tango_dp.actual_elevation
+        self._write_velocity_attributes(0.25, 0.25)
+        self._write_coordinate_attributes(actual_az + 10.0, actual_el - 10.0)
+        self.tango_dp.slew()
+        self.tango_dp.AdvanceClock(60.0)
+        self.assertEqual(self._wait_finish(1), True)
+        self._read_coordinate_attributes(actual_az + 10.0, actual_el - 10.0)
+
+    def test_timestamps_from_sim_clock(self):
+        """Testing that the requests are timestamped with the simulation time"""
+        self.tango_dp.AdvanceClock(3600.0)
+        self.tango_dp.requested_azimuth = self.tango_dp.actual_azimuth
+        self.tango_dp.Stop()
+        wall_time = time.time()
+        for attr_name in ["requested_azimuth", "requested_mode"]:
+            timestamp = self.tango_dp.read_attribute(attr_name).time.totime()
+            self.assertGreater(timestamp, wall_time + 3000.0, attr_name)
+
     def test_stop_simulation(self):
         """Testing if the stop command halt the AP movement"""
         actual_az = self.tango_dp.actual_azimuth
@@ -158,3 +191,73 @@ class AntennaPositionerTestCase(unittest.TestCase):
         self.assertEqual(self._wait_finish(3), True)
         self._read_coordinate_attributes(0.0, 90.0)
         self.assertEqual(self.tango_dp.actual_mode, "stop")
+
+
+class MockPositioner(object):
+    def __init__(self):
+        self.act_mode = "stop", 0, AttrQuality.ATTR_VALID
+        self.events = []
+
+    def push_change_event(self, attr_name, value, timestamp, quality):
+        self.events.append((attr_name, value, timestamp))
+
+
+class MotionSchedulerTestCase(unittest.TestCase):
+    """Test case for the motion scheduler shared by the positioners"""
+
+    def setUp(self):
+        self.scheduler = AntennaPositionerDS.MotionScheduler(
+            clock=SimClock(speed_up=0, start_time=0.0), capacity=2
+        )
+        self.positioners = [MockPositioner() for _ in range(3)]
+        self.slots = [
+            self.scheduler.add_positioner(positioner, 0.0, 90.0)
+            for positioner in self.positioners
+        ]
+        self.az_state = AntennaPositionerDS.AxisQuantities(
+            self.scheduler, 1, AntennaPositionerDS.AZIMUTH
+        )
+        self.el_state = AntennaPositionerDS.AxisQuantities(
+            self.scheduler, 1, AntennaPositionerDS.ELEVATION
+        )
+        self.az_state["drive_rate"] = 1.0
+        self.el_state["drive_rate"] = 0.5
+        self.az_state["requested"] = (-2.0, 0.0, AttrQuality.ATTR_VALID)
+        self.el_state["requested"] = (89.0, 0.0, AttrQuality.ATTR_VALID)
+
+    def test_add_positioner(self):
+        self.assertEqual(self.slots, [0, 1, 2])
+        self.assertEqual(self.scheduler.num_positioners, 3)
+        self.assertEqual(self.el_state["actual"][0], 90.0)
+        self.assertEqual(sorted(self.az_state), sorted(AxisQuantities.KEYS))
+
+    def test_no_motion_when_stopped(self):
+        self.scheduler.step(1.0)
+        self.assertEqual(self.az_state["actual"][0], 0.0)
+        self.assertEqual(self.positioners[1].events, [])
+
+    def test_step(self):
+        self.scheduler.set_stopped(1, False)
+        self.scheduler.step(1.0)
+        self.assertEqual(self.az_state["actual"][:2], (-1.0, 1.0))
+        self.assertEqual(self.el_state["actual"][:2], (89.5, 1.0))
+        self.assertTrue(self.az_state["moving"])
+        self.assertEqual(self.positioners[1].act_mode[0], "point")
+        self.scheduler.step(2.0)
+        self.assertEqual(self.az_state["actual"][0], -2.0)
+        self.assertEqual(self.el_state["actual"][0], 89.0)
+        self.assertFalse(self.az_state["moving"])
+        self.assertEqual(self.positioners[1].act_mode[0], "stop")
+        # One change event per stepped axis and tick, none for the other positioners
+        self.assertEqual(
+            self.positioners[1].events,
+            [
+                ("actual_azimuth", -1.0, 1.0),
+                ("actual_elevation", 89.5, 1.0),
+                ("actual_azimuth", -2.0, 2.0),
+                ("actual_elevation", 89.0, 2.0),
+            ],
+        )
+        self.assertEqual(self.positioners[0].events, [])
+        self.scheduler.step(3.0)
+        self.assertEqual(len(self.positioners[1].events), 4)
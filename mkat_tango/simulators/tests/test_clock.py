@@ -0,0 +1,69 @@
+# test_clock.py
+# -*- coding: utf8 -*-
+# vim:fileencoding=utf8 ai ts=4 sts=4 et sw=4
+# Copyright 2016 National Research Foundation (South African Radio Astronomy Observatory)
+# BSD license - see LICENSE for details
+
+from __future__ import absolute_import, division, print_function
+from future import standard_library
+
+standard_library.install_aliases()
+
+import threading
+import unittest
+
+from builtins import object
+
+from mkat_tango.simulators import clock
+
+
+class WallClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class test_SimClock(unittest.TestCase):
+    def setUp(self):
+        self.wall_clock = WallClock()
+        self.clock = clock.SimClock(
+            speed_up=10, start_time=0.0, wall_time_func=self.wall_clock
+        )
+
+    def test_speed_up(self):
+        self.assertEqual(self.clock.time(), 0.0)
+        self.wall_clock.now += 2
+        self.assertEqual(self.clock.time(), 20.0)
+        self.clock.speed_up = 0.5
+        self.wall_clock.now += 2
+        self.assertEqual(self.clock(), 21.0)
+        with self.assertRaises(ValueError):
+            self.clock.speed_up = -1
+
+    def test_advance(self):
+        self.clock.advance(3600)
+        self.assertEqual(self.clock.time(), 3600.0)
+        self.wall_clock.now += 1
+        self.assertEqual(self.clock.time(), 3610.0)
+        with self.assertRaises(ValueError):
+            self.clock.advance(-1)
+
+    def test_wait_until(self):
+        self.clock.speed_up = 0
+        self.assertTrue(self.clock.wait_until(0.0))
+        self.assertFalse(self.clock.wait_until(1.0, timeout=0.01))
+        reached = []
+        waiter = threading.Thread(target=lambda: reached.append(self.clock.wait_until(5)))
+        waiter.start()
+        self.clock.advance(5)
+        waiter.join(timeout=5)
+        self.assertEqual(reached, [True])
+
+    def test_shared_clock(self):
+        shared_clock = clock.get_sim_clock()
+        self.addCleanup(clock.set_sim_clock, shared_clock)
+        self.assertIs(clock.get_sim_clock(), shared_clock)
+        clock.set_sim_clock(self.clock)
+        self.assertIs(clock.get_sim_clock(), self.clock)
@@ -0,0 +1,188 @@
+# test_load_generator.py
+# -*- coding: utf8 -*-
+# vim:fileencoding=utf8 ai ts=4 sts=4 et sw=4
+# Copyright 2016 National Research Foundation (South African Radio Astronomy Observatory)
+# BSD license - see LICENSE for details
+
+from __future__ import absolute_import, division, print_function
+from future import standard_library
+
+standard_library.install_aliases()
+
+import logging
+import threading
+import time
+import unittest
+
+import tango
+
+from tango import AttrQuality
+from tango.test_context import DeviceTestContext
+
+from mkat_tango.simulators import load_generator
+from mkat_tango.translators.katcp_tango_proxy import TANGO2KATCP_TYPE_INFO
+
+LOGGER = logging.getLogger(__name__)
+
+
+class test_GeneratedValues(unittest.TestCase):
+    def test_embedded_sequence_numbers(self):
+        for data_type in TANGO2KATCP_TYPE_INFO:
+            modulus = load_generator.SEQUENCE_NUMBER_MODULI.get(data_type, 1 << 62)
+            spectrum_lengths = [None]
+            if data_type not in load_generator.SCALAR_ONLY_TYPES:
+                spectrum_lengths.append(4)
+            for spectrum_length in spectrum_lengths:
+                value = load_generator.generated_value(
+                    data_type, spectrum_length, 1000, 1.5
+                )
+                self.assertEqual(
+                    load_generator.embedded_sequence_number(data_type, value),
+                    1000 % modulus,
+                )
+
+    def test_float_values_exact(self):
+        sequence_number = (1 << 24) + 3
+        value = load_generator.generated_value(tango.DevFloat, None, sequence_number, 0)
+        self.assertEqual(
+            load_generator.embedded_sequence_number(tango.DevFloat, value), 3
+        )
+
+    def test_string_values(self):
+        value = load_generator.generated_value(tango.DevString, None, 7, 123.5)
+        self.assertEqual(value, '{"seq": 7, "sent": 123.5}')
+
+    def test_attribute_names(self):
+        self.assertEqual(
+            load_generator.generated_attribute_name(tango.DevDouble, True, 2),
+            "double_spectrum_2",
+        )
+        self.assertEqual(
+            load_generator.generated_attribute_name(tango.DevULong64, False, 0),
+            "ulong64_scalar_0",
+        )
+
+
+class test_LoadGenerator(unittest.TestCase):
+    properties = dict(
+        num_scalar_attributes=2,
+        num_spectrum_attributes=1,
+        spectrum_length=8,
+        initial_event_rate=0.0,
+        quality_flip_probability=0.0,
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tango_context = DeviceTestContext(
+            load_generator.LoadGenerator, properties=cls.properties
+        )
+        cls.tango_context.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tango_context.stop()
+
+    def setUp(self):
+        super(test_LoadGenerator, self).setUp()
+        self.tango_dp = self.tango_context.device
+        self.addCleanup(setattr, self.tango_dp, "event_rate", 0.0)
+
+    def test_attribute_list(self):
+        expected_attributes = set(
+            ["State", "Status", "event_rate", "events_pushed", "interface_changes"]
+        )
+        for data_type in TANGO2KATCP_TYPE_INFO:
+            for index in range(2):
+                expected_attributes.add(
+                    load_generator.generated_attribute_name(data_type, False, index)
+                )
+            if data_type not in load_generator.SCALAR_ONLY_TYPES:
+                expected_attributes.add(
+                    load_generator.generated_attribute_name(data_type, True, 0)
+                )
+        self.assertEqual(set(self.tango_dp.get_attribute_list()), expected_attributes)
+        self.assertEqual(len(self.tango_dp.read_attribute("double_spectrum_0").value), 8)
+
+    def test_reinitialisation(self):
+        attributes = set(self.tango_dp.get_attribute_list())
+        self.tango_dp.Init()
+        self.assertEqual(set(self.tango_dp.get_attribute_list()), attributes)
+        # The generated attributes can still be read
+        self.tango_dp.read_attribute("double_scalar_0")
+
+    def test_change_events(self):
+        received = []
+        all_received = threading.Event()
+
+        def event_callback(event):
+            if event.err or event.attr_value is None:
+                return
+            received.append((event.attr_value, time.time()))
+            if len(received) >= 5:
+                all_received.set()
+
+        event_id = self.tango_dp.subscribe_event(
+            "double_scalar_0", tango.EventType.CHANGE_EVENT, event_callback
+        )
+        self.addCleanup(self.tango_dp.unsubscribe_event, event_id)
+        # Skip the event sent on subscription
+        del received[:]
+        events_pushed = self.tango_dp.events_pushed
+        self.tango_dp.event_rate = 500.0
+        self.assertTrue(all_received.wait(10))
+        self.assertGreater(self.tango_dp.events_pushed, events_pushed)
+
+        sequence_numbers = [
+            load_generator.embedded_sequence_number(tango.DevDouble, value.value)
+            for value, _ in received
+        ]
+        self.assertEqual(
+            sequence_numbers,
+            list(range(sequence_numbers[0], sequence_numbers[0] + len(received))),
+        )
+        for value, received_time in received:
+            self.assertEqual(value.quality, AttrQuality.ATTR_VALID)
+            self.assertLessEqual(value.time.totime(), received_time)
+
+
+class test_LoadGeneratorInterfaceChanges(unittest.TestCase):
+    properties = dict(
+        num_scalar_attributes=1,
+        num_spectrum_attributes=0,
+        initial_event_rate=100.0,
+        quality_flip_probability=1.0,
+        interface_change_period=0.1,
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tango_context = DeviceTestContext(
+            load_generator.LoadGenerator, properties=cls.properties
+        )
+        cls.tango_context.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tango_context.stop()
+
+    def test_interface_changes(self):
+        tango_dp = self.tango_context.device
+        attribute_lists = set()
+        deadline = time.time() + 5
+        while len(attribute_lists) < 2 and time.time() < deadline:
+            attributes = tango_dp.get_attribute_list()
+            attribute_lists.add(load_generator.INTERFACE_CHANGE_ATTRIBUTE in attributes)
+            time.sleep(0.02)
+        self.assertEqual(attribute_lists, set([True, False]))
+        self.assertGreater(tango_dp.interface_changes, 0)
+
+    def test_quality_flips(self):
+        tango_dp = self.tango_context.device
+        qualities = set()
+        deadline = time.time() + 5
+        while len(qualities) < 2 and time.time() < deadline:
+            qualities.add(tango_dp.read_attribute("long_scalar_0").quality)
+            time.sleep(0.01)
+        self.assertIn(AttrQuality.ATTR_VALID, qualities)
+        self.assertGreater(len(qualities), 1)
@@ -10,14 +10,18 @@ from future import standard_library
 standard_library.install_aliases()
 
 import time
+import threading
 import logging
 import mock
 import unittest
 
-from builtins import object
+from builtins import object, range
 from random import gauss
 
+import numpy as np
+
 from tango.test_context import DeviceTestContext
+from mkat_tango.simulators.clock import SimClock
 from mkat_tango.testutils import disable_attributes_polling
 
 # DUT
@@ -193,3 +197,138 @@ class test_Weather(unittest.TestCase):
             )
             dt = updated_attr["time"] - initial_attr["time"]
             self.assertGreaterEqual(dt, update_period)
+
+
+class test_WeatherModel(unittest.TestCase):
+    def test_advance_to(self):
+        clock = SimClock(speed_up=0, start_time=1000.0)
+        model = weather.WeatherModel(
+            "test/weather/model", min_update_period=1.0, time_func=clock.time
+        )
+        temperature = model.sim_quantities["temperature"]
+        with mock.patch.object(
+            temperature, "next_val", side_effect=temperature.next_val
+        ) as next_val:
+            clock.advance(3.5)
+            model.advance_to(clock.time())
+        # The last half period is shorter than min_update_period
+        self.assertEqual(
+            [call[0][0] for call in next_val.call_args_list], [1001.0, 1002.0, 1003.0]
+        )
+        self.assertEqual(model.quantity_state["temperature"][1], 1003.0)
+        # The model keeps the clock as its time function
+        self.assertEqual(model.time_func, clock.time)
+
+
+class test_WeatherFleetModel(unittest.TestCase):
+    def setUp(self):
+        self.clock = SimClock(speed_up=0, start_time=1000.0)
+        self.fleet = weather.WeatherFleetModel(clock=self.clock, seed=1, capacity=2)
+        self.stations = [self.fleet.add_station("station{}".format(i)) for i in range(5)]
+
+    def test_add_station(self):
+        self.assertEqual(self.stations, list(range(5)))
+        self.assertEqual(self.fleet.num_stations, 5)
+        # The fleet grows, keeping the values of the existing stations
+        self.assertGreaterEqual(len(self.fleet.values), 5)
+        np.testing.assert_array_equal(
+            self.fleet.station_values(4), self.fleet.station_values(0)
+        )
+        self.assertEqual(self.fleet.add_station("station1"), 1)
+        self.assertEqual(self.fleet.num_stations, 5)
+
+    def test_step(self):
+        before = self.fleet.values[:5].copy()
+        station_values = self.fleet.station_values(2)
+        self.clock.advance(0.5)
+        self.fleet.step()
+        after = self.fleet.values[:5]
+        self.assertEqual(self.fleet.last_update_time, 1000.5)
+        max_slew = 0.5 * self.fleet.max_slew_rate
+        self.assertTrue(np.all(np.abs(after - before) <= max_slew * (1 + 1e-9)))
+        self.assertTrue(np.all(after >= self.fleet.min_bound))
+        self.assertTrue(np.all(after <= self.fleet.max_bound))
+        # Station views share the fleet arrays
+        np.testing.assert_array_equal(station_values, after[2])
+        # The stations vary independently
+        self.assertFalse(np.all(after[0] == after[1]))
+
+    def test_read(self):
+        self.clock.advance(1)
+        self.fleet.step()
+        column = self.fleet.varying_columns["temperature"]
+        self.assertEqual(
+            self.fleet.read(3, "temperature"), (self.fleet.values[3, column], 1001.0)
+        )
+        self.assertEqual(self.fleet.read(3, "input-comms-ok"), (True, 1001.0))
+        # Reading does not advance the model
+        self.clock.advance(1)
+        self.assertEqual(self.fleet.read(3, "temperature")[1], 1001.0)
+
+    def test_read_waits_for_step(self):
+        readings = []
+        with self.fleet._lock:
+            thread = threading.Thread(
+                target=lambda: readings.append(self.fleet.read(3, "temperature"))
+            )
+            thread.start()
+            thread.join(0.1)
+            # Not read while a step could be halfway
+            self.assertEqual(readings, [])
+        thread.join(1)
+        self.assertEqual(len(readings), 1)
+
+    def test_advance_to(self):
+        with mock.patch.object(self.fleet, "step", side_effect=self.fleet.step) as step:
+            self.fleet.advance_to(1003.5)
+        self.assertEqual(
+            [call[0][0] for call in step.call_args_list],
+            [1001.0, 1002.0, 1003.0, 1003.5],
+        )
+
+    def test_ticks_on_clock(self):
+        self.fleet.start()
+        self.addCleanup(self.fleet.stop)
+        self.clock.advance(2.5)
+        deadline = time.time() + 5
+        while self.fleet.last_update_time < 1002.5 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.fleet.last_update_time, 1002.5)
+
+
+class test_WeatherFleetStation(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tango_context = DeviceTestContext(weather.WeatherFleetStation)
+        cls.tango_context.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tango_context.stop()
+
+    def setUp(self):
+        super(test_WeatherFleetStation, self).setUp()
+        self.tango_dp = self.tango_context.device
+        self.instance = weather.WeatherFleetStation.instances[self.tango_dp.name()]
+
+        def cleanup_refs():
+            del self.instance
+
+        self.addCleanup(cleanup_refs)
+
+    def test_attribute_list(self):
+        attributes = set(self.tango_dp.get_attribute_list())
+        self.assertEqual(attributes, test_Weather.expected_attributes)
+
+    def test_read_from_fleet(self):
+        fleet = self.instance.fleet
+        disable_attributes_polling(
+            self, self.tango_dp, self.instance, ["temperature", "input-comms-ok"]
+        )
+        fleet.stop()
+        self.addCleanup(fleet.start)
+        value, update_time = fleet.read(self.instance.station, "temperature")
+        attr = self.tango_dp.read_attribute("temperature")
+        self.assertEqual(attr.value, value)
+        self.assertAlmostEqual(attr.time.totime(), update_time, places=5)
+        self.assertEqual(self.tango_dp.read_attribute("input-comms-ok").value, True)
@@ -15,20 +15,26 @@ from future import standard_library
 standard_library.install_aliases()
 
 import logging
+import threading
 import weakref
 
+from builtins import object
 from functools import partial
 
+import numpy as np
+
 from tango import Attr, AttrWriteType
 from tango import AttrQuality, DevState, DevLong
 from tango import DevString, DevDouble, DevBoolean
 from tango import UserDefaultAttrProp
-from tango.server import Device
+from tango.server import Device, command
 from tango_simlib import main
 from tango_simlib import model
 from tango_simlib import quantities
 from tango_simlib import sim_test_interface
 
+from mkat_tango.simulators.clock import get_sim_clock
+
 MODULE_LOGGER = logging.getLogger(__name__)
 
 MODULE_LOGGER.debug("Importing")
@@ -51,7 +57,8 @@ class Weather(Device):
         super(Weather, self).init_device()
         name = self.get_name()
         self.instances[name] = self
-        self.model = WeatherModel(name)
+        self.clock = get_sim_clock()
+        self.model = WeatherModel(name, time_func=self.clock.time)
         self.set_state(DevState.ON)
 
     def initialize_dynamic_attributes(self):
@@ -77,6 +84,17 @@ class Weather(Device):
     def always_executed_hook(self):
         self.model.update()
 
+    @command(dtype_in=float, doc_in="Simulation seconds to advance the clock by")
+    def AdvanceClock(self, seconds):
+        """Advance the simulation clock, stepping the model through the advance"""
+        self.clock.advance(seconds)
+        self.model.advance_to(self.clock.time())
+
+    @command(dtype_in=float, doc_in="Simulation seconds per wall-clock second")
+    def SetClockSpeedUp(self, speed_up):
+        """Set the speed-up factor of the simulation clock"""
+        self.clock.speed_up = speed_up
+
     def read_attributes(self, attr):
         """Method reading an attribute value
 
@@ -242,10 +260,295 @@ class WeatherModel(model.Model):
         )
         super(WeatherModel, self).setup_sim_quantities()
 
+    def advance_to(self, t):
+        """Update the quantities to time `t` in steps of `min_update_period`
+
+        Gives the same slew-limited random walk as updating all along, e.g. after
+        the clock was advanced by many update periods at once.
+
+        """
+        while (
+            not self.paused
+            and self.min_update_period > 0
+            and self.last_update_time + self.min_update_period < t
+        ):
+            step_time = self.last_update_time + self.min_update_period
+            self._update_at(step_time)
+            if self.last_update_time != step_time:
+                # Rounding made the step shorter than min_update_period
+                break
+        self._update_at(t)
+
+    def _update_at(self, sim_time):
+        time_func = self.time_func
+        self.time_func = lambda: sim_time
+        try:
+            self.update()
+        finally:
+            self.time_func = time_func
+
+
+class WeatherFleetModel(object):
+    """Weather quantities of a fleet of weather stations, advanced together
+
+    The quantities of all the stations are held in NumPy arrays with a row per
+    station, and advanced on a fixed tick rather than on every device request.
+    The slew-limited Gaussian random walk of
+    :class:`tango_simlib.quantities.GaussianSlewLimited` is done for all the
+    stations and quantities in one vectorised step.
+
+    Parameters
+    ----------
+    sim_quantities : dict or None
+        Quantities by name, as in :attr:`WeatherModel.sim_quantities`, giving the
+        parameters and start values shared by all the stations. The
+        :class:`GaussianSlewLimited` quantities vary, all other quantities keep
+        their start values. Defaults to the quantities of :class:`WeatherModel`.
+    tick_period : float
+        Simulation time between updates of the quantities, in seconds.
+    clock : :class:`mkat_tango.simulators.clock.SimClock` or None
+        Clock to take the simulation time from, the shared clock by default.
+    seed : int or None
+        Seed for the random number generator.
+    capacity : int
+        Number of stations to allocate space for, grown as needed.
+
+    """
+
+    def __init__(
+        self,
+        sim_quantities=None,
+        tick_period=1.0,
+        clock=None,
+        seed=None,
+        capacity=16,
+    ):
+        if sim_quantities is None:
+            sim_quantities = WeatherModel("weather-fleet-template").sim_quantities
+        self.tick_period = tick_period
+        self.clock = get_sim_clock() if clock is None else clock
+        self.last_update_time = self.clock.time()
+        # Quantity metadata by name, for setting up the device attributes
+        self.quantity_meta = {
+            name: dict(quantity.meta) for name, quantity in sim_quantities.items()
+        }
+        varying = sorted(
+            name
+            for name, quantity in sim_quantities.items()
+            if isinstance(quantity, quantities.GaussianSlewLimited)
+        )
+        constant = sorted(set(sim_quantities) - set(varying))
+        # Varying quantity names as keys, column indexes into `values` as values
+        self.varying_columns = {name: column for column, name in enumerate(varying)}
+        # Constant quantity names as keys, column indexes into `constants` as values
+        self.constant_columns = {name: column for column, name in enumerate(constant)}
+
+        def parameter(name):
+            return np.array(
+                [getattr(sim_quantities[quantity], name) for quantity in varying],
+                dtype=float,
+            )
+
+        self.mean = parameter("mean")
+        self.std_dev = parameter("std_dev")
+        self.max_slew_rate = parameter("max_slew_rate")
+        self.min_bound = parameter("min_bound")
+        self.max_bound = parameter("max_bound")
+        self._start_values = parameter("last_val")
+        self._start_constants = np.array(
+            [sim_quantities[quantity].last_val for quantity in constant], dtype=object
+        )
+        # Station names as keys, row indexes into the quantity arrays as values
+        self.stations = {}
+        self.values = np.empty((capacity, len(varying)))
+        self.constants = np.empty((capacity, len(constant)), dtype=object)
+        self._random = np.random.RandomState(seed)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._stopped.set()
+        self._thread = None
+
+    @property
+    def num_stations(self):
+        return len(self.stations)
+
+    def add_station(self, name):
+        """Add a station starting at the start values, returning its row index
+
+        A station that was already added keeps its row and current values.
+
+        """
+        with self._lock:
+            if name in self.stations:
+                return self.stations[name]
+            station = len(self.stations)
+            if station == len(self.values):
+                self._grow(2 * len(self.values))
+            self.values[station] = self._start_values
+            self.constants[station] = self._start_constants
+            self.stations[name] = station
+            return station
+
+    def _grow(self, capacity):
+        values = np.empty((capacity, self.values.shape[1]))
+        values[: len(self.values)] = self.values
+        constants = np.empty((capacity, self.constants.shape[1]), dtype=object)
+        constants[: len(self.constants)] = self.constants
+        # Replace rather than resize the arrays, since readers may hold row views
+        self.values, self.constants = values, constants
+
+    def station_values(self, station):
+        """View of the varying quantities of a station, in `varying_columns` order
+
+        The view follows the updates of the fleet until the fleet is grown.
+
+        """
+        with self._lock:
+            return self.values[station]
+
+    def read(self, station, name):
+        """Current value of quantity `name` of a station, and its update time"""
+        column = self.varying_columns.get(name)
+        with self._lock:
+            if column is not None:
+                value = float(self.values[station, column])
+            else:
+                value = self.constants[station, self.constant_columns[name]]
+            # Not torn by a step() in between, which updates both together
+            return value, self.last_update_time
+
+    def step(self, t=None):
+        """Advance the quantities of all the stations to time `t`"""
+        t = self.clock.time() if t is None else t
+        with self._lock:
+            dt = t - self.last_update_time
+            if dt <= 0:
+                return
+            values = self.values[: len(self.stations)]
+            targets = self._random.normal(self.mean, self.std_dev, size=values.shape)
+            max_slew = self.max_slew_rate * dt
+            values += np.clip(targets - values, -max_slew, max_slew)
+            np.clip(values, self.min_bound, self.max_bound, out=values)
+            self.last_update_time = t
+
+    def advance_to(self, t):
+        """Advance the quantities to time `t` in steps of at most `tick_period`
+
+        Gives the same random walk as ticking all along, e.g. after the clock was
+        advanced by many ticks at once.
+
+        """
+        while self.last_update_time + self.tick_period < t:
+            self.step(self.last_update_time + self.tick_period)
+        self.step(t)
+
+    def start(self):
+        """Start advancing the quantities every `tick_period` in a daemon thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="WeatherFleetModel ticker"
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            next_update_time = self.last_update_time + self.tick_period
+            # Wake up regularly to notice stop(), also when the clock is paused
+            if not self.clock.wait_until(next_update_time, timeout=1.0):
+                continue
+            if self._stopped.is_set():
+                break
+            try:
+                self.advance_to(self.clock.time())
+            except Exception:
+                MODULE_LOGGER.exception("Error advancing the weather fleet model")
+
+
+_weather_fleet_model = None
+_weather_fleet_model_lock = threading.Lock()
+
+
+def get_weather_fleet_model():
+    """The :class:`WeatherFleetModel` shared by the devices of this process"""
+    global _weather_fleet_model
+    with _weather_fleet_model_lock:
+        if _weather_fleet_model is None:
+            _weather_fleet_model = WeatherFleetModel()
+            _weather_fleet_model.start()
+        return _weather_fleet_model
+
+
+class WeatherFleetStation(Device):
+    """Weather station device reading from the shared :class:`WeatherFleetModel`
+
+    Has the same attributes as :class:`Weather`, but without a model per device
+    and without model updates on device requests. Intended for simulating
+    hundreds of weather stations in one device server.
+
+    """
+
+    instances = weakref.WeakValueDictionary()  # Access instances for debugging
+
+    def init_device(self):
+        super(WeatherFleetStation, self).init_device()
+        name = self.get_name()
+        self.instances[name] = self
+        self.fleet = get_weather_fleet_model()
+        self.station = self.fleet.add_station(name)
+        self.set_state(DevState.ON)
+
+    def initialize_dynamic_attributes(self):
+        """The device method that sets up attributes during run time"""
+        for attribute_name, meta in self.fleet.quantity_meta.items():
+            meta_data = dict(meta)
+            attr_props = UserDefaultAttrProp()
+            attr_dtype = PYTHON_TYPES_TO_TANGO_TYPE[meta_data.pop("dtype")]
+            attr = Attr(attribute_name, attr_dtype, AttrWriteType.READ)
+            for prop in meta_data.keys():
+                attr_prop = getattr(attr_props, "set_" + prop)
+                if attr_prop:
+                    attr_prop(str(meta_data[prop]))
+            attr.set_default_properties(attr_props)
+            self.add_attribute(attr, self.read_attributes)
+
+    def read_attributes(self, attr):
+        """Method reading an attribute value
+
+        Arguments
+        ==========
+
+        attr : tango.DevAttr
+            The attribute to read from.
+
+        """
+        value, update_time = self.fleet.read(self.station, attr.get_name())
+        attr.set_value_date_quality(value, update_time, AttrQuality.ATTR_VALID)
+
+    @command(dtype_in=float, doc_in="Simulation seconds to advance the clock by")
+    def AdvanceClock(self, seconds):
+        """Advance the simulation clock, stepping the fleet at once"""
+        self.fleet.clock.advance(seconds)
+
+    @command(dtype_in=float, doc_in="Simulation seconds per wall-clock second")
+    def SetClockSpeedUp(self, speed_up):
+        """Set the speed-up factor of the simulation clock"""
+        self.fleet.clock.speed_up = speed_up
+
 
 weather_main = partial(
     main.simulator_main, Weather, sim_test_interface.TangoTestDeviceServerBase
 )
 
+weather_fleet_main = partial(main.simulator_main, WeatherFleetStation, None)
+
 if __name__ == "__main__":
     weather_main()
@@ -0,0 +1,361 @@
+# inspection_cache.py
+# -*- coding: utf8 -*-
+# vim:fileencoding=utf8 ai ts=4 sts=4 et sw=4
+# Copyright 2016 National Research Foundation (South African Radio Astronomy Observatory)
+# BSD license - see LICENSE for details
+
+"""On-disk cache of inspected Tango device and KATCP device interfaces
+
+Inspecting a Tango device with many attributes takes a number of round trips to
+the device. The translators can instead start from the attribute and command
+descriptions cached by a previous run, and re-inspect the device in the
+background. Likewise the requests of a KATCP device can be translated into Tango
+commands without waiting for the KATCP device.
+
+"""
+from __future__ import absolute_import, division, print_function
+from future import standard_library
+
+standard_library.install_aliases()
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from builtins import object
+from urllib.parse import quote
+
+import tango
+
+log = logging.getLogger("mkat_tango.translators.inspection_cache")
+
+CACHE_FORMAT_VERSION = 1
+
+# Fields of tango.AttributeInfoEx, with the enum type of each enum field or None
+ATTRIBUTE_CONFIG_FIELDS = (
+    ("name", None),
+    ("data_type", tango.CmdArgType),
+    ("data_format", tango.AttrDataFormat),
+    ("writable", tango.AttrWriteType),
+    ("disp_level", tango.DispLevel),
+    ("max_dim_x", None),
+    ("max_dim_y", None),
+    ("description", None),
+    ("label", None),
+    ("unit", None),
+    ("standard_unit", None),
+    ("display_unit", None),
+    ("format", None),
+    ("min_value", None),
+    ("max_value", None),
+    ("min_alarm", None),
+    ("max_alarm", None),
+    ("writable_attr_name", None),
+    ("enum_labels", None),
+)
+# Fields of the event info members of tango.AttributeEventInfo
+EVENT_INFO_FIELDS = {
+    "ch_event": ("rel_change", "abs_change"),
+    "per_event": ("period",),
+    "arch_event": ("archive_rel_change", "archive_abs_change", "archive_period"),
+}
+# Fields of tango.CommandInfo, with the enum type of each enum field or None
+COMMAND_INFO_FIELDS = (
+    ("cmd_name", None),
+    ("cmd_tag", None),
+    ("in_type", tango.CmdArgType),
+    ("out_type", tango.CmdArgType),
+    ("in_type_desc", None),
+    ("out_type_desc", None),
+    ("disp_level", tango.DispLevel),
+)
+
+
+class InfoRecord(object):
+    """Plain stand-in for a Tango info structure restored from the cache"""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __repr__(self):
+        return "{}({})".format(
+            self.__class__.__name__,
+            ", ".join(
+                "{}={!r}".format(field, value)
+                for field, value in sorted(self.__dict__.items())
+            ),
+        )
+
+
+def _info_to_dict(info, fields):
+    record = {}
+    for field, enum_type in fields:
+        value = getattr(info, field, None)
+        if value is None:
+            continue
+        if enum_type is not None:
+            value = int(value)
+        elif not isinstance(value, (str, int, float, bool)):
+            # e.g. the StdStringVector of enum_labels
+            value = list(value)
+        record[field] = value
+    return record
+
+
+def _info_from_dict(record, fields):
+    info = InfoRecord()
+    for field, enum_type in fields:
+        value = record.get(field)
+        if value is not None and enum_type is not None:
+            value = enum_type.values[value]
+        setattr(info, field, value)
+    return info
+
+
+def attribute_config_to_dict(attribute_config):
+    """Convert a :class:`tango.AttributeInfoEx` into a JSON serialisable dict"""
+    record = _info_to_dict(attribute_config, ATTRIBUTE_CONFIG_FIELDS)
+    events = getattr(attribute_config, "events", None)
+    if events is not None:
+        record["events"] = {
+            event: {field: getattr(getattr(events, event), field) for field in fields}
+            for event, fields in EVENT_INFO_FIELDS.items()
+        }
+    return record
+
+
+def attribute_config_from_dict(record):
+    """Restore an attribute configuration from :func:`attribute_config_to_dict`
+
+    Return Value
+    ============
+    attribute_config : :class:`InfoRecord`
+        Object with the same attributes as the original
+        :class:`tango.AttributeInfoEx`, as far as used by the translators.
+
+    """
+    attribute_config = _info_from_dict(record, ATTRIBUTE_CONFIG_FIELDS)
+    events = record.get("events", {})
+    attribute_config.events = InfoRecord(
+        **{
+            event: InfoRecord(
+                **{
+                    field: events.get(event, {}).get(field, "Not specified")
+                    for field in fields
+                }
+            )
+            for event, fields in EVENT_INFO_FIELDS.items()
+        }
+    )
+    return attribute_config
+
+
+def command_info_to_dict(command_info):
+    """Convert a :class:`tango.CommandInfo` into a JSON serialisable dict"""
+    return _info_to_dict(command_info, COMMAND_INFO_FIELDS)
+
+
+def command_info_from_dict(record):
+    """Restore a command description from :func:`command_info_to_dict`"""
+    return _info_from_dict(record, COMMAND_INFO_FIELDS)
+
+
+def interface_fingerprint(attribute_names, command_names):
+    """Fingerprint of a device interface that is cheap to obtain from the device
+
+    Parameters
+    ==========
+    attribute_names : iterable of str
+        As returned by :meth:`tango.DeviceProxy.get_attribute_list`.
+    command_names : iterable of str
+        As returned by :meth:`tango.DeviceProxy.get_command_list`.
+
+    """
+    interface = json.dumps([sorted(attribute_names), sorted(command_names)])
+    return hashlib.sha1(interface.encode("utf-8")).hexdigest()
+
+
+class InspectionCache(object):
+    """Inspected Tango device interfaces cached as JSON files in a directory
+
+    There is a file per device, recording the interface fingerprint the
+    descriptions were cached for.
+
+    Parameters
+    ==========
+    cache_dir : str
+        Directory for the cache files, created if needed.
+
+    """
+
+    def __init__(self, cache_dir, logger=log):
+        self.cache_dir = cache_dir
+        self._logger = logger
+
+    def path(self, device_name):
+        """Cache file name for a Tango device"""
+        return os.path.join(self.cache_dir, quote(device_name, safe="") + ".json")
+
+    def load(self, device_name, fingerprint):
+        """Load the cached interface of a device
+
+        Parameters
+        ==========
+        device_name : str
+        fingerprint : str
+            Current :func:`interface_fingerprint` of the device.
+
+        Return Value
+        ============
+        interface : tuple (attributes : dict, commands : dict) or None
+            Attribute configurations and command descriptions by name, like
+            :meth:`TangoInspectingClient.inspect_attributes` and
+            :meth:`TangoInspectingClient.inspect_commands`, or None if nothing
+            is cached for the device with this fingerprint.
+
+        """
+        path = self.path(device_name)
+        try:
+            with open(path) as cache_file:
+                cached = json.load(cache_file)
+        except (IOError, OSError):
+            self._logger.debug("No cached interface for %s", device_name)
+            return None
+        except ValueError:
+            self._logger.warning("Ignoring corrupt inspection cache file %s", path)
+            return None
+        if (
+            cached.get("version") != CACHE_FORMAT_VERSION
+            or cached.get("fingerprint") != fingerprint
+        ):
+            self._logger.info("Cached interface for %s is out of date", device_name)
+            return None
+        attributes = {
+            name: attribute_config_from_dict(record)
+            for name, record in cached["attributes"].items()
+        }
+        commands = {
+            name: command_info_from_dict(record)
+            for name, record in cached["commands"].items()
+        }
+        return attributes, commands
+
+    def save(self, device_name, fingerprint, attributes, commands):
+        """Cache the interface of a device, replacing any previous entry
+
+        Parameters
+        ==========
+        device_name : str
+        fingerprint : str
+            :func:`interface_fingerprint` of the interface.
+        attributes : dict
+            Attribute names as keys, :class:`tango.AttributeInfoEx` as values.
+        commands : dict
+            Command names as keys, :class:`tango.CommandInfo` as values.
+
+        """
+        cached = {
+            "version": CACHE_FORMAT_VERSION,
+            "device_name": device_name,
+            "fingerprint": fingerprint,
+            "attributes": {
+                name: attribute_config_to_dict(config)
+                for name, config in attributes.items()
+            },
+            "commands": {
+                name: command_info_to_dict(info) for name, info in commands.items()
+            },
+        }
+        _write_cache_file(self.cache_dir, self.path(device_name), cached)
+
+
+class KatcpRequestCache(object):
+    """KATCP request names and docs cached as JSON files in a directory
+
+    There is a file per KATCP device address, recording the ?version-list of the
+    device the requests were cached for.
+
+    Parameters
+    ==========
+    cache_dir : str
+        Directory for the cache files, created if needed.
+
+    """
+
+    def __init__(self, cache_dir, logger=log):
+        self.cache_dir = cache_dir
+        self._logger = logger
+
+    def path(self, katcp_address):
+        """Cache file name for a KATCP device address"""
+        return os.path.join(
+            self.cache_dir, "katcp-" + quote(katcp_address, safe="") + ".json"
+        )
+
+    def load(self, katcp_address):
+        """Load the cached requests of a KATCP device
+
+        Parameters
+        ==========
+        katcp_address : str
+            Address of the KATCP device as <host>:<port>.
+
+        Return Value
+        ============
+        cached : tuple (version_list : list, requests : dict) or None
+            The ?version-list inform arguments of the device when the requests
+            were cached, and the request docs by request name. None if nothing
+            usable is cached for the address.
+
+        """
+        path = self.path(katcp_address)
+        try:
+            with open(path) as cache_file:
+                cached = json.load(cache_file)
+        except (IOError, OSError):
+            self._logger.debug("No cached requests for %s", katcp_address)
+            return None
+        except ValueError:
+            self._logger.warning("Ignoring corrupt request cache file %s", path)
+            return None
+        if cached.get("version") != CACHE_FORMAT_VERSION:
+            self._logger.info("Cached requests for %s are out of date", katcp_address)
+            return None
+        return cached["version_list"], cached["requests"]
+
+    def save(self, katcp_address, version_list, requests):
+        """Cache the requests of a KATCP device, replacing any previous entry
+
+        Parameters
+        ==========
+        katcp_address : str
+            Address of the KATCP device as <host>:<port>.
+        version_list : list of list of str
+            Arguments of the ?version-list informs of the device.
+        requests : dict
+            Request names as keys, request docs as values.
+
+        """
+        cached = {
+            "version": CACHE_FORMAT_VERSION,
+            "katcp_address": katcp_address,
+            "version_list": version_list,
+            "requests": requests,
+        }
+        _write_cache_file(self.cache_dir, self.path(katcp_address), cached)
+
+
+def _write_cache_file(cache_dir, path, cached):
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    # Write to a temporary file first so that readers never see partial files
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as cache_file:
+            json.dump(cached, cache_file)
+        os.rename(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
@@ -15,11 +15,14 @@ from future import standard_library
 
 standard_library.install_aliases()
 
+import base64
 import future
+import itertools
+import json
 import logging
+import random
 import textwrap
 import time
-import re
 import threading
 
 import numpy as np
@@ -27,12 +30,14 @@ import tornado
 import tango
 
 from builtins import object, range, zip
-from collections import namedtuple
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 
 from tornado.gen import Return, maybe_future
 from katcp import Sensor, kattypes, Message
 from katcp import server as katcp_server
+from katcp.ioloop_manager import IOLoopManager
 from katcp.server import BASE_REQUESTS
 from tango import DevState, AttrDataFormat, CmdArgType
 from tango import (
@@ -52,7 +57,14 @@ from tango import (
 )
 
 from mkat_tango.translators.utilities import tangoname2katcpname
-from mkat_tango.translators.tango_inspecting_client import TangoInspectingClient
+from mkat_tango.translators.inspection_cache import (
+    InspectionCache,
+    interface_fingerprint,
+)
+from mkat_tango.translators.tango_inspecting_client import (
+    TangoInspectingClient,
+    attribute_config_fingerprint,
+)
 
 log = logging.getLogger(__name__)
 
@@ -91,6 +103,24 @@ TANGO_INT_TYPES = {
     DevULong64,
 }
 TANGO_NUMERIC_TYPES = TANGO_FLOAT_TYPES | TANGO_INT_TYPES
+# Little-endian dtypes of the elements of "binary" encoded spectrum sensors
+TANGO_SPECTRUM_DTYPES = {
+    DevFloat: np.dtype("<f4"),
+    DevDouble: np.dtype("<f8"),
+    DevUChar: np.dtype("u1"),
+    DevShort: np.dtype("<i2"),
+    DevUShort: np.dtype("<u2"),
+    DevLong: np.dtype("<i4"),
+    DevULong: np.dtype("<u4"),
+    DevLong64: np.dtype("<i8"),
+    DevULong64: np.dtype("<u8"),
+    DevBoolean: np.dtype("?"),
+}
+# Ways of translating a SPECTRUM attribute: a sensor per element, or a single
+# STRING sensor with the whole spectrum as a JSON list or as base64 encoded bytes.
+SPECTRUM_MODES = ("elements", "string", "binary")
+# Suffixes of the optional summary sensors of numeric SPECTRUM attributes
+SPECTRUM_SUMMARY_SUFFIXES = ("min", "max", "mean")
 TANGO_CMDARGTYPE_NUM2NAME = {num: name for name, num in tango.CmdArgType.names.items()}
 
 
@@ -178,20 +208,44 @@ def tango_to_katcp_text(text):
         return text
 
 
-def tango_attr_descr2katcp_sensors(attr_descr):
-    """Convert a tango attribute description into an equivalent KATCP Sensor object(s)
+SensorTemplate = namedtuple(
+    "SensorTemplate", ("sensor_type", "description", "units", "params")
+)
+"""Sensor arguments shared by all the sensors of an attribute, except the name"""
+
+# Attribute config fingerprints as keys, SensorTemplate as values
+_SENSOR_TEMPLATE_CACHE = {}
+MAX_SENSOR_TEMPLATE_CACHE_SIZE = 10000
+
+
+def attribute_sensor_template(attr_descr):
+    """Sensor arguments for the sensors translating a Tango attribute
+
+    Templates are cached by attribute config fingerprint, so that they are only
+    built again when the attribute config changes.
 
     Parameters
     ==========
-
     attr_descr : tango.AttributeInfoEx data structure
 
     Return Value
     ============
-    list: A list of katcp.Sensor objects.
+    template : :class:`SensorTemplate`
 
     """
-    sensor_type = None
+    fingerprint = attribute_config_fingerprint(attr_descr)
+    try:
+        return _SENSOR_TEMPLATE_CACHE[fingerprint]
+    except KeyError:
+        pass
+    template = _build_sensor_template(attr_descr)
+    if len(_SENSOR_TEMPLATE_CACHE) >= MAX_SENSOR_TEMPLATE_CACHE_SIZE:
+        _SENSOR_TEMPLATE_CACHE.clear()
+    _SENSOR_TEMPLATE_CACHE[fingerprint] = template
+    return template
+
+
+def _build_sensor_template(attr_descr):
     sensor_params = None
 
     if (
@@ -209,57 +263,198 @@ def tango_attr_descr2katcp_sensors(attr_descr):
 
         raise NotImplementedError("Unhandled attribute type {!r}".format(data_type_name))
 
-    sensor_type = katcp_type_info.sensor_type
     attr_min_val = attr_descr.min_value
     attr_max_val = attr_descr.max_value
+    if attr_descr.data_type in TANGO_INT_TYPES:
+        if attr_min_val == "Not specified":
+            min_value = katcp_type_info.params[0]
+        else:
+            min_value = int(attr_min_val)
+        if attr_max_val == "Not specified":
+            max_value = katcp_type_info.params[1]
+        else:
+            max_value = int(attr_max_val)
+        sensor_params = (min_value, max_value)
+    elif attr_descr.data_type in TANGO_FLOAT_TYPES:
+        if attr_min_val == "Not specified":
+            min_value = katcp_type_info.params[0]
+        else:
+            min_value = float(attr_min_val)
+        if attr_max_val == "Not specified":
+            max_value = katcp_type_info.params[1]
+        else:
+            max_value = float(attr_max_val)
+        sensor_params = (min_value, max_value)
+    elif attr_descr.data_type == DevEnum:
+        sensor_params = tuple(attr_descr.enum_labels)
+    elif attr_descr.data_type == CmdArgType.DevState:
+        sensor_params = tuple(katcp_type_info.params)
+
+    return SensorTemplate(
+        katcp_type_info.sensor_type,
+        tango_to_katcp_text(attr_descr.description),
+        tango_to_katcp_text(attr_descr.unit),
+        sensor_params,
+    )
 
-    sensors = []
 
-    for index in range(attr_descr.max_dim_x):
-        if attr_descr.data_type in TANGO_INT_TYPES:
-            if attr_min_val == "Not specified":
-                min_value = katcp_type_info.params[0]
-            else:
-                min_value = int(attr_min_val)
-            if attr_max_val == "Not specified":
-                max_value = katcp_type_info.params[1]
-            else:
-                max_value = int(attr_max_val)
-            sensor_params = [min_value, max_value]
-        elif attr_descr.data_type in TANGO_FLOAT_TYPES:
-            if attr_min_val == "Not specified":
-                min_value = katcp_type_info.params[0]
-            else:
-                min_value = float(attr_min_val)
-            if attr_max_val == "Not specified":
-                max_value = katcp_type_info.params[1]
-            else:
-                max_value = float(attr_max_val)
-            sensor_params = [min_value, max_value]
-        elif attr_descr.data_type == DevEnum:
-            sensor_params = attr_descr.enum_labels
-        elif attr_descr.data_type == CmdArgType.DevState:
-            sensor_params = katcp_type_info.params
-
-        katcp_name = tangoname2katcpname(attr_descr.name)
-        if attr_descr.data_format == AttrDataFormat.SPECTRUM:
-            sensor_name = "{}.{}".format(katcp_name, index)
-        else:
-            sensor_name = katcp_name
+def _attribute_katcp_name(attr_descr, name_prefix):
+    katcp_name = tangoname2katcpname(attr_descr.name)
+    if name_prefix:
+        katcp_name = "{}.{}".format(name_prefix, katcp_name)
+    return katcp_name
+
 
+def _single_sensor_spectrum(attr_descr, spectrum_mode):
+    if spectrum_mode not in SPECTRUM_MODES:
+        raise ValueError("Unknown spectrum mode {!r}".format(spectrum_mode))
+    return (
+        attr_descr.data_format == AttrDataFormat.SPECTRUM
+        and spectrum_mode != "elements"
+    )
+
+
+def _has_spectrum_summary(attr_descr, spectrum_summary):
+    return (
+        spectrum_summary
+        and attr_descr.data_format == AttrDataFormat.SPECTRUM
+        and attr_descr.data_type in TANGO_NUMERIC_TYPES
+    )
+
+
+def attribute_sensor_names(
+    attr_descr, name_prefix=None, spectrum_mode="elements", spectrum_summary=False
+):
+    """Names of the KATCP sensors translating a Tango attribute
+
+    Takes the same parameters as :func:`tango_attr_descr2katcp_sensors`, and
+    :func:`tango_attr_descr2katcp_summary_sensors` if `spectrum_summary` is set,
+    without creating the sensors.
+
+    """
+    katcp_name = _attribute_katcp_name(attr_descr, name_prefix)
+    if attr_descr.data_format != AttrDataFormat.SPECTRUM or _single_sensor_spectrum(
+        attr_descr, spectrum_mode
+    ):
+        sensor_names = [katcp_name]
+    else:
+        sensor_names = [
+            "{}.{}".format(katcp_name, index) for index in range(attr_descr.max_dim_x)
+        ]
+    if _has_spectrum_summary(attr_descr, spectrum_summary):
+        sensor_names.extend(
+            "{}.{}".format(katcp_name, suffix) for suffix in SPECTRUM_SUMMARY_SUFFIXES
+        )
+    return sensor_names
+
+
+def tango_attr_descr2katcp_sensors(
+    attr_descr, name_prefix=None, spectrum_mode="elements"
+):
+    """Convert a tango attribute description into an equivalent KATCP Sensor object(s)
+
+    Parameters
+    ==========
+
+    attr_descr : tango.AttributeInfoEx data structure
+    name_prefix : str or None
+        Prefix the sensor names with `name_prefix` and a dot.
+    spectrum_mode : str, one of :const:`SPECTRUM_MODES`
+        Translate a SPECTRUM attribute into a sensor per element ("elements"), or
+        into a single STRING sensor with the spectrum encoded as a JSON list
+        ("string") or as base64 encoded little-endian array bytes ("binary").
+        Spectra without a binary encoding, e.g. of strings, are JSON encoded.
+
+    Return Value
+    ============
+    list: A list of katcp.Sensor objects.
+
+    """
+    template = attribute_sensor_template(attr_descr)
+    if _single_sensor_spectrum(attr_descr, spectrum_mode):
+        encoding = spectrum_encoding(attr_descr, spectrum_mode)
+        description = "{} ({} encoded spectrum)".format(template.description, encoding)
+        katcp_name = _attribute_katcp_name(attr_descr, name_prefix)
+        return [Sensor(Sensor.STRING, katcp_name, description, template.units)]
+
+    sensors = []
+    for sensor_name in attribute_sensor_names(attr_descr, name_prefix, spectrum_mode):
         sensors.append(
             Sensor(
-                sensor_type,
+                template.sensor_type,
                 sensor_name,
-                tango_to_katcp_text(attr_descr.description),
-                tango_to_katcp_text(attr_descr.unit),
-                sensor_params,
+                template.description,
+                template.units,
+                None if template.params is None else list(template.params),
             )
         )
 
     return sensors
 
 
+def tango_attr_descr2katcp_summary_sensors(attr_descr, name_prefix=None):
+    """Summary sensors with the minimum, maximum and mean of a SPECTRUM attribute
+
+    Parameters
+    ==========
+    attr_descr : tango.AttributeInfoEx data structure
+    name_prefix : str or None
+        Prefix the sensor names with `name_prefix` and a dot.
+
+    Return Value
+    ============
+    sensors : list of :class:`katcp.Sensor`
+        FLOAT sensors in :const:`SPECTRUM_SUMMARY_SUFFIXES` order, or an empty list
+        for attributes that are not numeric spectra.
+
+    """
+    if not _has_spectrum_summary(attr_descr, True):
+        return []
+    template = attribute_sensor_template(attr_descr)
+    katcp_name = _attribute_katcp_name(attr_descr, name_prefix)
+    return [
+        Sensor(
+            Sensor.FLOAT,
+            "{}.{}".format(katcp_name, suffix),
+            "{} of {}".format(suffix.capitalize(), template.description),
+            template.units,
+        )
+        for suffix in SPECTRUM_SUMMARY_SUFFIXES
+    ]
+
+
+def spectrum_encoding(attr_descr, spectrum_mode):
+    """Encoding of the single sensor of a SPECTRUM attribute: "json" or a dtype"""
+    if spectrum_mode == "binary" and attr_descr.data_type in TANGO_SPECTRUM_DTYPES:
+        return "base64 {}".format(TANGO_SPECTRUM_DTYPES[attr_descr.data_type].str)
+    return "json"
+
+
+def spectrum_encoder(attr_descr, spectrum_mode):
+    """Function encoding SPECTRUM attribute values as single sensor values
+
+    Return Value
+    ============
+    encoder : callable(value) -> str, or None
+        None if the attribute is not translated into a single sensor.
+
+    """
+    if not _single_sensor_spectrum(attr_descr, spectrum_mode):
+        return None
+    if spectrum_encoding(attr_descr, spectrum_mode) == "json":
+        return _encode_spectrum_json
+    return partial(_encode_spectrum_binary, TANGO_SPECTRUM_DTYPES[attr_descr.data_type])
+
+
+def _encode_spectrum_json(value):
+    return json.dumps(value.tolist() if hasattr(value, "tolist") else list(value))
+
+
+def _encode_spectrum_binary(dtype, value):
+    data = np.asarray(value, dtype=dtype).tobytes()
+    return base64.b64encode(data).decode("ascii")
+
+
 def tango_cmd_descr2katcp_request(tango_command_descr, tango_device_proxy):
     """Convert tango command description to equivalent KATCP reply handler
 
@@ -368,6 +563,10 @@ def tango_cmd_descr2katcp_request(tango_command_descr, tango_device_proxy):
     return kattypes.return_reply(*return_reply_args)(handler)
 
 
+# Tango types as keys, callables returning a new kattype object as values
+_KATTYPE_FACTORY_CACHE = {}
+
+
 def tango_type2kattype_object(tango_type):
     """Convert Tango type object to corresponding kattype type object
 
@@ -385,11 +584,24 @@ def tango_type2kattype_object(tango_type):
         DevUChar will return a kattypes.Int object with min=0 and max=255,
         matching the min/max values of the corresponing tango type.
 
+    Note
+    ====
+    The translation of each Tango type is cached, but a new kattype object is
+    returned on every call.
+
     """
-    kattype_kwargs = {}
     if tango_type == tango.DevVoid:
         return None
+    try:
+        kattype_factory = _KATTYPE_FACTORY_CACHE[tango_type]
+    except KeyError:
+        kattype_factory = _kattype_factory(tango_type)
+        _KATTYPE_FACTORY_CACHE[tango_type] = kattype_factory
+    return kattype_factory()
 
+
+def _kattype_factory(tango_type):
+    kattype_kwargs = {}
     if "Array" in str(tango_type):
         kattype_kwargs["multiple"] = True
         tango_type_ = str(tango_type).replace("Array", "").replace("Var", "")
@@ -408,8 +620,8 @@ def tango_type2kattype_object(tango_type):
         # TODO (NM, KM) 2016-05-30 can we get rid of this if statement by using
         # TANGO2KATCP_TYPE_INFO better?
         kattype_kwargs = [name for name in katcp_type_info.params]
-        return katcp_type_info.KatcpType(kattype_kwargs)
-    return katcp_type_info.KatcpType(**kattype_kwargs)
+        return partial(katcp_type_info.KatcpType, kattype_kwargs)
+    return partial(katcp_type_info.KatcpType, **kattype_kwargs)
 
 
 def is_tango_device_running(tango_device_proxy, logger=log):
@@ -440,11 +652,37 @@ def is_tango_device_running(tango_device_proxy, logger=log):
     return is_device_running
 
 
-def wait_for_device(tango_device_proxy, retry_time=2, logger=log):
+def exponential_backoff(initial_delay, max_delay, factor=2.0, jitter=0.5):
+    """Generate retry delays that grow exponentially up to a maximum, with jitter
+
+    Parameters
+    ----------
+    initial_delay : float
+        Delay before the first retry, in seconds.
+    max_delay : float
+        Upper limit of the delay, in seconds.
+    factor : float
+        Growth factor of the delay per retry.
+    jitter : float
+        Fraction by which each delay is randomly reduced, so that many clients
+        retrying at the same time spread out.
+
+    """
+    delay = initial_delay
+    while True:
+        yield random.uniform((1.0 - jitter) * delay, delay)
+        delay = min(delay * factor, max_delay)
+
+
+def wait_for_device(tango_device_proxy, retry_time=2, logger=log, max_retry_time=30):
     """Get the translator to wait until it has established a connection with the
         device server and/or for the device server to be up and running.
+
+        Retries with exponential backoff from `retry_time` up to `max_retry_time`
+        seconds.
     """
     is_device_connected = False
+    retry_delays = exponential_backoff(retry_time, max_retry_time)
     while not is_device_connected:
         try:
             tango_device_proxy.reconnect(True)
@@ -453,11 +691,137 @@ def wait_for_device(tango_device_proxy, retry_time=2, logger=log):
             conerr_desc = {arg.desc for arg in conerr.args}
             for reason, description in zip(conerr_reasons, conerr_desc):
                 logger.error("{} : {}".format(reason, description))
-            time.sleep(retry_time)
+            time.sleep(next(retry_delays))
         else:
             is_device_connected = True
 
 
+class AttributeSensors(
+    namedtuple(
+        "AttributeSensors", ("data_format", "sensors", "encoder", "summary_sensors")
+    )
+):
+    """The KATCP sensors translating a Tango attribute
+
+    data_format : :class:`tango.AttrDataFormat`
+        Data format of the attribute.
+    sensors : list of :class:`katcp.Sensor`
+        The sensor for a scalar attribute, or the element sensors in index order
+        for a spectrum attribute, or the single sensor for a spectrum attribute
+        translated into one sensor.
+    encoder : callable(value) -> str, or None
+        Encodes the spectrum for its single sensor, see :func:`spectrum_encoder`.
+    summary_sensors : list of :class:`katcp.Sensor`
+        Min, max and mean sensors of a spectrum attribute, if any.
+
+    """
+
+    __slots__ = ()
+
+    @property
+    def all_sensors(self):
+        return self.sensors + self.summary_sensors
+
+
+class SensorUpdateQueue(object):
+    """Bounded queue handing sensor updates from Tango event threads to the IOLoop
+
+    Tango event threads :meth:`put` updates into the queue, which is drained on
+    the IOLoop in a single batch per IOLoop iteration, so that the KATCP sensors
+    are only ever updated from the IOLoop thread.
+
+    Parameters
+    ----------
+    handler : callable(name, received_timestamp, timestamp, value, quality,
+                       event_type)
+        Called on the IOLoop for every update drained from the queue.
+    max_size : int
+        Maximum number of queued updates. The oldest updates are dropped when
+        the queue is full.
+    coalesce : bool
+        When the queue is full, replace the queued update of the same attribute,
+        if any, instead of dropping the oldest update.
+
+    """
+
+    def __init__(self, handler, max_size, coalesce=False, logger=log):
+        self.handler = handler
+        self.max_size = max_size
+        self.coalesce = coalesce
+        self.ioloop = None
+        self._logger = logger
+        self._lock = threading.Lock()
+        # Single-item lists holding the updates, so that coalescing can replace
+        # a queued update in place
+        self._queue = deque()
+        # Attribute names as keys, the latest queued slot as values, if coalescing
+        self._latest = {}
+        self._drain_scheduled = False
+        # Statistics, for reporting in the KATCP sensors
+        self.dropped = 0
+        self.coalesced = 0
+        self.last_latency = 0.0
+        self.batch_callback = None
+
+    def __len__(self):
+        return len(self._queue)
+
+    def set_ioloop(self, ioloop):
+        """Start draining the queue on `ioloop`"""
+        with self._lock:
+            self.ioloop = ioloop
+            if self._queue:
+                self._schedule_drain()
+
+    def put(self, name, received_timestamp, timestamp, value, quality, event_type):
+        """Queue an update, can be called from any thread"""
+        update = (name, received_timestamp, timestamp, value, quality, event_type)
+        with self._lock:
+            slot = self._latest.get(name) if self.coalesce else None
+            if slot is not None and len(self._queue) >= self.max_size:
+                slot[0] = update
+                self.coalesced += 1
+            else:
+                if len(self._queue) >= self.max_size:
+                    self._drop_oldest()
+                slot = [update]
+                self._queue.append(slot)
+                if self.coalesce:
+                    self._latest[name] = slot
+            if not self._drain_scheduled and self.ioloop is not None:
+                self._schedule_drain()
+
+    def _schedule_drain(self):
+        self._drain_scheduled = True
+        self.ioloop.add_callback(self.drain)
+
+    def _drop_oldest(self):
+        slot = self._queue.popleft()
+        self.dropped += 1
+        name = slot[0][0]
+        if self._latest.get(name) is slot:
+            del self._latest[name]
+
+    def drain(self):
+        """Apply all queued updates, must be called on the IOLoop"""
+        with self._lock:
+            batch = self._queue
+            self._queue = deque()
+            self._latest = {}
+            self._drain_scheduled = False
+        for (update,) in batch:
+            try:
+                self.handler(*update)
+            except Exception:
+                self._logger.exception("Error applying sensor update for %s", update[0])
+        if batch:
+            # Latency of the oldest update in the batch, from Tango event
+            # reception to KATCP sensor update.
+            self.last_latency = time.time() - batch[0][0][1]
+        if self.batch_callback is not None:
+            self.batch_callback()
+
+
 class TangoProxyDeviceServer(katcp_server.DeviceServer):
     def __init__(self, *args, **kwargs):
         # replace class-level dicts with instance-level dicts
@@ -489,13 +853,85 @@ class TangoProxyDeviceServer(katcp_server.DeviceServer):
 
 
 class TangoDevice2KatcpProxy(object):
-    def __init__(self, katcp_server, tango_inspecting_client, logger=log, polling=False):
+    def __init__(
+        self,
+        katcp_server,
+        tango_inspecting_client,
+        logger=log,
+        polling=False,
+        client_polling=False,
+        update_queue_size=None,
+        coalesce_updates=False,
+        name_prefix=None,
+        manage_server=True,
+        sampling_setup_workers=4,
+        sampling_setup_chunk_size=64,
+        inspection_cache=None,
+        connection_check_period=5.0,
+        reconnect_delay=1.0,
+        max_reconnect_delay=60.0,
+        spectrum_mode="elements",
+        spectrum_modes=None,
+        spectrum_summary=False,
+    ):
         self.katcp_server = katcp_server
         self.inspecting_client = tango_inspecting_client
         self._logger = logger
         self._polling = polling
+        self._client_polling = client_polling
+        # Prefix for the sensor and request names of this translator, allowing
+        # several translators to share a KATCP server
+        self._name_prefix = name_prefix
+        # Start and stop the KATCP server along with the translator
+        self._manage_server = manage_server
+        # Sensors reporting on the translator itself rather than the Tango device
+        self._translator_sensors = {}
+        # Attribute names as keys, AttributeSensors as values. Allows sensor
+        # updates without any sensor name formatting or lookups.
+        self._attribute_sensors = {}
+        # Translation of SPECTRUM attributes, see tango_attr_descr2katcp_sensors().
+        # The spectrum_modes override the spectrum_mode per attribute name.
+        spectrum_modes = dict(spectrum_modes or {})
+        for mode in [spectrum_mode] + list(spectrum_modes.values()):
+            if mode not in SPECTRUM_MODES:
+                raise ValueError("Unknown spectrum mode {!r}".format(mode))
+        self._spectrum_mode = spectrum_mode
+        self._spectrum_modes = {
+            attribute_name.lower(): mode
+            for attribute_name, mode in spectrum_modes.items()
+        }
+        self._spectrum_summary = spectrum_summary
+        if update_queue_size:
+            self._update_queue = SensorUpdateQueue(
+                self._update_sensor_values,
+                update_queue_size,
+                coalesce=coalesce_updates,
+                logger=logger,
+            )
+            self._update_queue.batch_callback = self._update_queue_sensors
+            self._add_update_queue_sensors()
+        else:
+            self._update_queue = None
+        # Set while there is no attribute sampling setup pending or in progress
         self._attribute_sampling_setup_allowed = threading.Event()
         self._attribute_sampling_setup_allowed.set()
+        # Attributes waiting for sampling setup by the persistent worker thread
+        self._sampling_setup_pending = set()
+        self._sampling_setup_condition = threading.Condition()
+        self._sampling_setup_thread = None
+        self._sampling_setup_stopping = False
+        self._sampling_setup_workers = sampling_setup_workers
+        self._sampling_setup_chunk_size = sampling_setup_chunk_size
+        self._sampling_setup_executor = None
+        # InspectionCache to start from instead of inspecting the device, if any
+        self._inspection_cache = inspection_cache
+        # Device connection supervision, see _supervise_connection()
+        self._connection_check_period = connection_check_period
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._supervisor_stopped = threading.Event()
+        # Runs the blocking Tango calls of the supervisor off the IOLoop
+        self._tango_executor = None
 
     def set_ioloop(self, ioloop=None):
         """Set the tornado IOLoop to use.
@@ -518,26 +954,233 @@ class TangoDevice2KatcpProxy(object):
         Starts the Tango client and the KATCP server with ioloop in another
         thread and subscibes to all Tango attributes for updates.
 
+        The KATCP server is started first, and keeps serving while the Tango
+        device is inspected and its translation set up by `_tango_executor`.
+        Unless called on an IOLoop, which it would block, start() waits until
+        that is done. If the Tango device is not reachable the translation of the
+        device is set up in the background once the device can be reached.
+
         For clean shutdown and thread cleanup, stop() needs to be called
 
+        """
+        self._supervisor_stopped.clear()
+        if self._manage_server:
+            self.katcp_server.start(timeout=timeout)
+        if self._update_queue is not None:
+            self._update_queue.set_ioloop(self.katcp_server.ioloop)
+        self._tango_executor = ThreadPoolExecutor(max_workers=1)
+        interface_setup = self._tango_executor.submit(self._start_translation)
+        self.katcp_server.ioloop.add_callback(
+            self._supervise_connection, interface_setup, self._tango_executor
+        )
+        if tornado.ioloop.IOLoop.current(instance=False) is None:
+            interface_setup.result()
+        self._logger.info(
+            "Completed startup of device handler for %s",
+            self.inspecting_client.tango_dp.name(),
+        )
+
+    def _start_translation(self):
+        """Set up the translation of the device if it is reachable
+
+        Return Value
+        ============
+        interface_ready : bool
+            True if the translation was set up.
+
         """
         with tango.EnsureOmniThread():
             tango_device_proxy = self.inspecting_client.tango_dp
             if not is_tango_device_running(tango_device_proxy, logger=self._logger):
-                wait_for_device(tango_device_proxy, logger=self._logger)
+                self._logger.warning(
+                    "Tango device %s not reachable, translating it once it is",
+                    tango_device_proxy.name(),
+                )
+                return False
             self._logger.info("Connection to %s established", tango_device_proxy.name())
+            if self._setup_device_interface() is not None:
+                thread = threading.Thread(target=self._reinspect_target)
+                thread.daemon = True
+                thread.start()
+            return True
+
+    def _setup_device_interface(self):
+        """Inspect the device and set up its sensors, requests and sampling
+
+        Return Value
+        ============
+        cached_interface : tuple or None
+            The cached interface the translator was set up from, if any.
+
+        """
+        cached_interface = self._load_cached_interface()
+        if cached_interface is not None:
+            self.inspecting_client.load_interface(*cached_interface)
+        else:
             self.inspecting_client.inspect()
-            self.inspecting_client.sample_event_callback = self.update_sensor_values
-            self.inspecting_client.interface_change_callback = (
-                self.update_request_sensor_list)
-            self.update_katcp_server_sensor_list(self.inspecting_client.device_attributes)
-            self._logger.info("Waiting for attribute sampling thread to finish")
-            self._attribute_sampling_setup_allowed.wait()
-            self._logger.info("Attribute sampling thread completed")
-            self.update_katcp_server_request_list(self.inspecting_client.device_commands)
-            self.katcp_server.start(timeout=timeout)
+            self._save_cached_interface()
+        self.inspecting_client.sample_event_callback = self.update_sensor_values
+        self.inspecting_client.interface_delta_callback = self.apply_interface_delta
+        self.update_katcp_server_sensor_list(self.inspecting_client.device_attributes)
+        self._logger.info("Waiting for attribute sampling thread to finish")
+        self._attribute_sampling_setup_allowed.wait()
+        self._logger.info("Attribute sampling thread completed")
+        self.update_katcp_server_request_list(self.inspecting_client.device_commands)
+        return cached_interface
+
+    @tornado.gen.coroutine
+    def _supervise_connection(self, interface_setup, tango_executor):
+        """Watch the connection to the Tango device, reconnecting with backoff
+
+        Runs on the KATCP server IOLoop, with the blocking Tango calls done in
+        `tango_executor`, so that the KATCP server keeps serving while the device
+        is unreachable. Sensors are marked unknown while the device is
+        unreachable. Once it is reachable again, the translation is set up if it
+        never was, or the interface is re-inspected and the attribute event
+        subscriptions that were lost are set up again.
+
+        Parameters
+        ==========
+        interface_setup : :class:`concurrent.futures.Future`
+            Result of :meth:`_start_translation`, supervision starts once done.
+        tango_executor : :class:`concurrent.futures.ThreadPoolExecutor`
+
+        """
+        device_name = self.inspecting_client.tango_dp.name()
+        try:
+            interface_ready = yield interface_setup
+        except Exception:
+            self._logger.exception("Error translating Tango device %s", device_name)
+            interface_ready = False
+        connected = interface_ready
+        retry_delays = None
+        while not self._supervisor_stopped.is_set():
+            try:
+                reachable = yield tango_executor.submit(self._ping_device)
+                if reachable and not connected:
+                    self._logger.info("Reconnected to Tango device %s", device_name)
+                    yield tango_executor.submit(self._reconnect, interface_ready)
+                    interface_ready = connected = True
+                elif not reachable and connected:
+                    self._logger.warning(
+                        "Lost connection to Tango device %s", device_name
+                    )
+                    self._mark_sensors_unknown()
+                    connected = False
+            except Exception:
+                if self._supervisor_stopped.is_set():
+                    # The executor was shut down by stop()
+                    break
+                self._logger.exception(
+                    "Error reconnecting to Tango device %s", device_name
+                )
+            if connected:
+                retry_delays = None
+                delay = self._connection_check_period
+            else:
+                if retry_delays is None:
+                    retry_delays = exponential_backoff(
+                        self._reconnect_delay, self._max_reconnect_delay
+                    )
+                delay = next(retry_delays)
+            yield tornado.gen.sleep(delay)
+
+    def _ping_device(self):
+        with tango.EnsureOmniThread():
+            return is_tango_device_running(
+                self.inspecting_client.tango_dp, logger=self._logger
+            )
+
+    def _reconnect(self, interface_ready):
+        with tango.EnsureOmniThread():
+            if not interface_ready:
+                if self._setup_device_interface() is not None:
+                    self._reinspect_target()
+                return
+            # The device may have been restarted with a different interface
+            self._reinspect_target()
+            lost_attributes = self._lost_attributes()
+            if lost_attributes:
+                self._logger.info(
+                    "Subscribing again to %d attributes", len(lost_attributes)
+                )
+                self.inspecting_client.unsubscribe_attributes(lost_attributes)
+                self._setup_attribute_sampling_via_thread(lost_attributes)
+
+    def _lost_attributes(self):
+        """Attributes of which the event subscriptions do not deliver readings
+
+        That is attributes whose last event was an error. The sensor statuses are
+        not taken into account, since the sensors of all attributes are marked
+        unknown while the device is unreachable, including those of which the
+        subscriptions survive a short outage. Attributes polled on the client side
+        recover by themselves.
+
+        """
+        return (
+            self.inspecting_client.stale_attributes
+            - self.inspecting_client.client_polled_attributes
+        )
+
+    def _mark_sensors_unknown(self):
+        """Mark the sensor readings unknown, unless they already indicate failure"""
+        timestamp = time.time()
+        for attribute_sensors in list(self._attribute_sensors.values()):
+            for sensor in attribute_sensors.all_sensors:
+                if sensor.status() != Sensor.FAILURE:
+                    sensor.set_value(sensor.value(), Sensor.UNKNOWN, timestamp)
+
+    def _load_cached_interface(self):
+        if self._inspection_cache is None:
+            return None
+        tango_device_proxy = self.inspecting_client.tango_dp
+        try:
+            fingerprint = interface_fingerprint(
+                tango_device_proxy.get_attribute_list(),
+                tango_device_proxy.get_command_list(),
+            )
+            cached_interface = self._inspection_cache.load(
+                tango_device_proxy.name(), fingerprint
+            )
+        except Exception:
+            self._logger.exception("Error loading the cached interface, inspecting")
+            return None
+        if cached_interface is not None:
             self._logger.info(
-                "Completed startup of device handler for %s", tango_device_proxy.name())
+                "Starting from the cached interface of %s", tango_device_proxy.name()
+            )
+        return cached_interface
+
+    def _save_cached_interface(self):
+        if self._inspection_cache is None:
+            return
+        attributes = self.inspecting_client.device_attributes
+        commands = self.inspecting_client.device_commands
+        try:
+            self._inspection_cache.save(
+                self.inspecting_client.tango_dp.name(),
+                interface_fingerprint(attributes, commands),
+                attributes,
+                commands,
+            )
+        except Exception:
+            self._logger.exception("Error saving the inspected interface to the cache")
+
+    def _reinspect_target(self):
+        """Check the cached interface the translator started from against the device"""
+        try:
+            with tango.EnsureOmniThread():
+                delta = self.inspecting_client.reinspect()
+                if any(delta):
+                    self._logger.info("Cached interface was out of date: %s", delta)
+                    self.apply_interface_delta(
+                        self.inspecting_client.tango_dp.name(), time.time(), delta
+                    )
+                else:
+                    # Replace the cached info with the inspected info anyway
+                    self._save_cached_interface()
+        except Exception:
+            self._logger.exception("Error re-inspecting Tango device")
 
     def stop(self, timeout=1.0):
         """Stop the translator
@@ -547,12 +1190,53 @@ class TangoDevice2KatcpProxy(object):
         be expected :(
 
         """
-        self.katcp_server.stop(timeout=timeout)
+        self._supervisor_stopped.set()
+        if self._tango_executor is not None:
+            self._tango_executor.shutdown(wait=False)
+            self._tango_executor = None
+        if self._manage_server:
+            self.katcp_server.stop(timeout=timeout)
+        with self._sampling_setup_condition:
+            self._sampling_setup_stopping = True
+            self._sampling_setup_pending.clear()
+            self._sampling_setup_condition.notify()
+            if self._sampling_setup_executor is not None:
+                self._sampling_setup_executor.shutdown(wait=False)
+                self._sampling_setup_executor = None
         self.inspecting_client.clear_attribute_sampling()
         # TODO NM 2016-05-17 Is it possible to stop a Tango DeviceProxy?
 
     def join(self, timeout=None):
-        self.katcp_server.join(timeout=timeout)
+        if self._manage_server:
+            self.katcp_server.join(timeout=timeout)
+
+    def katcp_sensor_name(self, name):
+        """KATCP sensor name used by this translator for the sensor `name`"""
+        if self._name_prefix:
+            return "{}.{}".format(self._name_prefix, name)
+        return name
+
+    def katcp_request_name(self, name):
+        """KATCP request name used by this translator for the request `name`"""
+        if self._name_prefix:
+            return "{}-{}".format(self._name_prefix, name)
+        return name
+
+    def _owned_sensor_names(self):
+        sensor_names = self.katcp_server.get_sensor_list()
+        if self._name_prefix:
+            prefix = self._name_prefix + "."
+            sensor_names = [name for name in sensor_names if name.startswith(prefix)]
+        return [name for name in sensor_names if name not in self._translator_sensors]
+
+    def _owned_command_names(self):
+        request_names = self.katcp_server.get_request_list()
+        if not self._name_prefix:
+            return request_names
+        prefix = self._name_prefix + "-"
+        return [
+            name[len(prefix):] for name in request_names if name.startswith(prefix)
+        ]
 
     def update_request_sensor_list(
         self, device_name, received_timestamp, attributes, commands
@@ -565,9 +1249,9 @@ class TangoDevice2KatcpProxy(object):
         """ Populate the dictionary of sensors in the KATCP device server
             instance with the corresponding TANGO device server attributes
         """
-        sensors = self.katcp_server.get_sensor_list()
-        tango2katcp_sensors = []
-        sensor_attribute_map = {}
+        sensors = set(self._owned_sensor_names())
+        kept_sensors = set()
+        attributes_to_add = []
 
         for attribute_name, attribute_config in attributes.items():
             if attribute_name == "AttributesNotAdded":
@@ -577,46 +1261,77 @@ class TangoDevice2KatcpProxy(object):
                 )
                 continue
 
-            sensor_name = tangoname2katcpname(attribute_name)
-            # This is to handle the mapping of the spectrum type attribute name with its
-            # decomposition into multiple sensor names. It will ensure that we add/remove
-            # the correct sensors from the KATCP server.
-            if attribute_config.data_format == AttrDataFormat.SPECTRUM:
-                sensors_ = []
-                for sensor in sensors:
-                    if sensor.startswith(sensor_name + "."):
-                        sensors_.append(sensor)
-
-                if len(sensors_) - attribute_config.max_dim_x == 0:
-                    tango2katcp_sensors.extend(sensors_)
-                else:
-                    tango2katcp_sensors.append(sensor_name)
-
-                sensor_attribute_map[sensor_name] = attribute_config
-                continue
-
-            tango2katcp_sensors.append(sensor_name)
-            sensor_attribute_map[sensor_name] = attribute_config
+            # A spectrum attribute may be decomposed into multiple sensors, keep
+            # the attribute only if all its sensors are already on the KATCP server.
+            sensor_names = attribute_sensor_names(
+                attribute_config,
+                name_prefix=self._name_prefix,
+                spectrum_mode=self.spectrum_mode(attribute_name),
+                spectrum_summary=self._spectrum_summary,
+            )
+            if sensors.issuperset(sensor_names):
+                kept_sensors.update(sensor_names)
+            else:
+                attributes_to_add.append(attribute_name)
 
-        sensors_to_remove = list(set(sensors) - set(tango2katcp_sensors))
-        sensors_to_add = list(set(tango2katcp_sensors) - set(sensors))
-        for sensor_name in sensors_to_remove:
+        for sensor_name in sensors - kept_sensors:
             self.katcp_server.remove_sensor(sensor_name)
+        for attribute_name in list(self._attribute_sensors):
+            if attribute_name not in attributes:
+                del self._attribute_sensors[attribute_name]
 
-        for sensor_name in sensors_to_add:
-            try:
-                sensors = tango_attr_descr2katcp_sensors(
-                    sensor_attribute_map[sensor_name]
-                )
-                for sensor in sensors:
-                    self.katcp_server.add_sensor(sensor)
-            except NotImplementedError as nierr:
-                # Temporarily for unhandled attribute types
-                self._logger.debug(str(nierr), exc_info=True)
+        for attribute_name in attributes_to_add:
+            self._add_attribute_sensors(attribute_name, attributes[attribute_name])
 
         new_attributes = sorted(
-            sensor_attribute_map[sensor].name for sensor in sensors_to_add
+            attributes[attribute_name].name for attribute_name in attributes_to_add
         )
+        self._setup_new_attributes(new_attributes)
+
+    def spectrum_mode(self, attribute_name):
+        """Spectrum mode of an attribute, one of :const:`SPECTRUM_MODES`"""
+        return self._spectrum_modes.get(attribute_name.lower(), self._spectrum_mode)
+
+    def _add_attribute_sensors(self, attribute_name, attribute_config):
+        """Add the KATCP sensors for an attribute, returning the added sensors"""
+        spectrum_mode = self.spectrum_mode(attribute_name)
+        try:
+            sensors = tango_attr_descr2katcp_sensors(
+                attribute_config,
+                name_prefix=self._name_prefix,
+                spectrum_mode=spectrum_mode,
+            )
+            summary_sensors = []
+            if self._spectrum_summary:
+                summary_sensors = tango_attr_descr2katcp_summary_sensors(
+                    attribute_config, name_prefix=self._name_prefix
+                )
+            for sensor in sensors + summary_sensors:
+                self.katcp_server.add_sensor(sensor)
+        except NotImplementedError as nierr:
+            # Temporarily for unhandled attribute types
+            self._logger.debug(str(nierr), exc_info=True)
+            return []
+        attribute_sensors = AttributeSensors(
+            attribute_config.data_format,
+            sensors,
+            spectrum_encoder(attribute_config, spectrum_mode),
+            summary_sensors,
+        )
+        self._attribute_sensors[attribute_name] = attribute_sensors
+        return attribute_sensors.all_sensors
+
+    def _remove_attribute_sensors(self, attribute_name):
+        """Remove the KATCP sensors of an attribute, returning the removed sensors"""
+        attribute_sensors = self._attribute_sensors.pop(attribute_name, None)
+        if attribute_sensors is None:
+            return []
+        removed_sensors = attribute_sensors.all_sensors
+        for sensor in removed_sensors:
+            self.katcp_server.remove_sensor(sensor.name)
+        return removed_sensors
+
+    def _setup_new_attributes(self, new_attributes):
         lower_case_attributes = [attr_name.lower() for attr_name in new_attributes]
         orig_attr_names_map = dict(zip(lower_case_attributes, new_attributes))
         self.inspecting_client.orig_attr_names_map.update(orig_attr_names_map)
@@ -624,54 +1339,176 @@ class TangoDevice2KatcpProxy(object):
             "Setting up attribute sampling for %s attributes.", len(new_attributes))
         self._setup_attribute_sampling_via_thread(new_attributes)
 
+    def apply_interface_delta(self, device_name, received_timestamp, delta):
+        """Apply a change in the Tango device interface to the KATCP server
+
+        Only the sensors and requests of the added, removed and changed attributes
+        and commands are touched. Each affected sensor and request is reported to
+        the KATCP clients with an ``#interface-changed sensor|request <name>
+        added|removed|modified`` inform.
+
+        Parameters
+        ----------
+        device_name: str
+        received_timestamp: float
+        delta : :class:`tango_inspecting_client.InterfaceDelta`
+
+        """
+        attributes = self.inspecting_client.device_attributes
+        commands = self.inspecting_client.device_commands
+        removed_sensors = set()
+        added_sensors = set()
+        for attribute_name in delta.removed_attributes + delta.changed_attributes:
+            for sensor in self._remove_attribute_sensors(attribute_name):
+                removed_sensors.add(sensor.name)
+        new_attributes = []
+        for attribute_name in delta.added_attributes + delta.changed_attributes:
+            if attribute_name == "AttributesNotAdded":
+                continue
+            sensors = self._add_attribute_sensors(
+                attribute_name, attributes[attribute_name]
+            )
+            added_sensors.update(sensor.name for sensor in sensors)
+            if attribute_name in delta.added_attributes:
+                new_attributes.append(attribute_name)
+        if new_attributes:
+            self._setup_new_attributes(new_attributes)
+
+        removed_requests = set()
+        added_requests = set()
+        for command_name in delta.removed_commands + delta.changed_commands:
+            request_name = self.katcp_request_name(command_name)
+            self.katcp_server.remove_request(request_name)
+            removed_requests.add(request_name)
+        for command_name in delta.added_commands + delta.changed_commands:
+            self._add_command_request(command_name, commands[command_name])
+            added_requests.add(self.katcp_request_name(command_name))
+
+        self._save_cached_interface()
+        for kind, removed, added in (
+            ("sensor", removed_sensors, added_sensors),
+            ("request", removed_requests, added_requests),
+        ):
+            for name, change in sorted(
+                [(name, "removed") for name in removed - added]
+                + [(name, "added") for name in added - removed]
+                + [(name, "modified") for name in added & removed]
+            ):
+                self.katcp_server.mass_inform(
+                    Message.inform("interface-changed", kind, name, change)
+                )
+
     def _setup_attribute_sampling_via_thread(self, new_attributes):
-        if self._attribute_sampling_setup_allowed.is_set():
+        """Queue attributes for sampling setup by the persistent worker thread
+
+        Attributes queued while a previous setup is in progress are merged into a
+        single pending set, which the worker picks up as soon as it is done.
+
+        """
+        with self._sampling_setup_condition:
+            self._sampling_setup_pending.update(new_attributes)
+            if not self._sampling_setup_pending:
+                return
             self._attribute_sampling_setup_allowed.clear()
-            t = threading.Thread(
-                target=self._setup_attribute_sampling_target, args=(new_attributes,)
-            )
-            t.daemon = True
-            t.start()
-        else:
-            self._logger.error(
-                "Cannot handle new interface change - "
-                "setting up sampling from previous change"
-            )
+            self._sampling_setup_stopping = False
+            if (
+                self._sampling_setup_thread is None
+                or not self._sampling_setup_thread.is_alive()
+            ):
+                self._sampling_setup_thread = threading.Thread(
+                    target=self._sampling_setup_worker
+                )
+                self._sampling_setup_thread.daemon = True
+                self._sampling_setup_thread.start()
+            self._sampling_setup_condition.notify()
+
+    def _sampling_setup_worker(self):
+        with tango.EnsureOmniThread():
+            while True:
+                with self._sampling_setup_condition:
+                    while (
+                        not self._sampling_setup_pending
+                        and not self._sampling_setup_stopping
+                    ):
+                        self._attribute_sampling_setup_allowed.set()
+                        self._sampling_setup_condition.wait()
+                    if self._sampling_setup_stopping:
+                        self._attribute_sampling_setup_allowed.set()
+                        return
+                    # Attributes may have been removed again while pending
+                    device_attributes = self.inspecting_client.device_attributes
+                    new_attributes = sorted(
+                        attr_name
+                        for attr_name in self._sampling_setup_pending
+                        if attr_name in device_attributes
+                    )
+                    self._sampling_setup_pending.clear()
+                self._setup_attribute_sampling_chunks(new_attributes)
+
+    def _setup_attribute_sampling_chunks(self, new_attributes):
+        chunk_size = self._sampling_setup_chunk_size or len(new_attributes) or 1
+        chunks = []
+        for start in range(0, len(new_attributes), chunk_size):
+            end = start + chunk_size
+            chunks.append(new_attributes[start:end])
+        if len(chunks) <= 1 or self._sampling_setup_workers <= 1:
+            for chunk in chunks:
+                self._setup_attribute_sampling_target(chunk)
+            return
+        with self._sampling_setup_condition:
+            if self._sampling_setup_stopping:
+                return
+            if self._sampling_setup_executor is None:
+                self._sampling_setup_executor = ThreadPoolExecutor(
+                    max_workers=self._sampling_setup_workers
+                )
+            chunk_setups = [
+                self._sampling_setup_executor.submit(
+                    self._setup_attribute_sampling_target, chunk
+                )
+                for chunk in chunks
+            ]
+        for chunk_setup in chunk_setups:
+            chunk_setup.result()
 
     def _setup_attribute_sampling_target(self, new_attributes):
         try:
             with tango.EnsureOmniThread():
                 self.inspecting_client.setup_attribute_sampling(
-                    new_attributes, server_polling_fallback=self._polling
+                    new_attributes,
+                    server_polling_fallback=self._polling,
+                    client_polling_fallback=self._client_polling,
                 )
         except Exception:
             self._logger.exception(
                 "Error setting up attribute sampling on Tango device"
-                " - %s attributes, polling %r" % (len(new_attributes), self._polling)
+                " - %s attributes, polling %r, client polling %r"
+                % (len(new_attributes), self._polling, self._client_polling)
             )
-        finally:
-            self._attribute_sampling_setup_allowed.set()
 
     def update_katcp_server_request_list(self, commands):
         """ Populate the request handlers in the KATCP device server
             instance with the corresponding TANGO device server commands
         """
-        requests = self.katcp_server.get_request_list()
+        requests = self._owned_command_names()
         requests_to_remove = list(set(requests) - set(commands))
         requests_to_add = list(set(commands) - set(requests))
 
         for request_name in requests_to_remove:
-            self.katcp_server.remove_request(request_name)
+            self.katcp_server.remove_request(self.katcp_request_name(request_name))
 
         for request_name in requests_to_add:
-            try:
-                req_handler = tango_cmd_descr2katcp_request(
-                    commands[request_name], self.inspecting_client.tango_dp
-                )
-            except NotImplementedError as exc:
-                req_handler = self._dummy_request_handler_factory(request_name, str(exc))
+            self._add_command_request(request_name, commands[request_name])
 
-            self.katcp_server.add_request(request_name, req_handler)
+    def _add_command_request(self, command_name, command_info):
+        try:
+            req_handler = tango_cmd_descr2katcp_request(
+                command_info, self.inspecting_client.tango_dp
+            )
+        except NotImplementedError as exc:
+            req_handler = self._dummy_request_handler_factory(command_name, str(exc))
+
+        self.katcp_server.add_request(self.katcp_request_name(command_name), req_handler)
 
     def _dummy_request_handler_factory(self, request_name, entrails):
         # Make a dummy request handler for tango commands that could not be
@@ -692,67 +1529,114 @@ class TangoDevice2KatcpProxy(object):
 
         return request_dummy
 
+    def _add_update_queue_sensors(self):
+        for sensor in (
+            Sensor.integer(
+                self.katcp_sensor_name("translator.update-queue-depth"),
+                "Number of sensor updates waiting to be applied",
+                "",
+                [0, self._update_queue.max_size],
+            ),
+            Sensor.integer(
+                self.katcp_sensor_name("translator.update-queue-dropped"),
+                "Total number of sensor updates dropped because the queue was full",
+                "",
+            ),
+            Sensor.integer(
+                self.katcp_sensor_name("translator.update-queue-coalesced"),
+                "Total number of queued sensor updates replaced by a newer update",
+                "",
+            ),
+            Sensor.float(
+                self.katcp_sensor_name("translator.update-latency"),
+                "Time from Tango event reception to KATCP sensor update of the "
+                "oldest update in the last batch",
+                "s",
+            ),
+        ):
+            self._translator_sensors[sensor.name] = sensor
+            self.katcp_server.add_sensor(sensor)
+
+    def _update_queue_sensors(self):
+        queue = self._update_queue
+        for name, value in (
+            ("translator.update-queue-depth", len(queue)),
+            ("translator.update-queue-dropped", queue.dropped),
+            ("translator.update-queue-coalesced", queue.coalesced),
+            ("translator.update-latency", queue.last_latency),
+        ):
+            self._translator_sensors[self.katcp_sensor_name(name)].set_value(value)
+
     def update_sensor_values(
         self, name, received_timestamp, timestamp, value, quality, event_type
     ):
         """Updates the KATCP sensor object's value accordingly with changes to
            its corresponding TANGO attribute's value.
 
+        Called from the Tango event threads. If the translator was created with
+        an `update_queue_size`, the update is queued and applied on the IOLoop,
+        otherwise it is applied directly.
+
         """
+        if self._update_queue is not None:
+            self._update_queue.put(
+                name, received_timestamp, timestamp, value, quality, event_type
+            )
+        else:
+            self._update_sensor_values(
+                name, received_timestamp, timestamp, value, quality, event_type
+            )
+
+    def _update_sensor_values(
+        self, name, received_timestamp, timestamp, value, quality, event_type
+    ):
         if name == "AttributesNotAdded":
             self._logger.debug("Sensor %s.* was never added on the KATCP server.", name)
             return
-        katcp_name = tangoname2katcpname(name)
-        # when we create KATCP sensors for spectrum attributes we add a dot before the
-        # index. There could be a case where a device server has attributes that start
-        # with the same text , e.g. azimuth and azimuthErrors. Use regex to be
-        # stricter i.e. katcp_name, dot, and then some digits
-        regex = r"{}\.\d+".format(katcp_name)
-        attr_dformat = self.inspecting_client.device_attributes[name].data_format
-        if attr_dformat == AttrDataFormat.SPECTRUM:
-            if quality == AttrQuality.ATTR_INVALID:
-                sensor_names = self.katcp_server.get_sensor_list()
-                for sensor_name in sensor_names:
-                    match = re.match(regex, sensor_name)
-                    if match:
-                        sensor = self.katcp_server.get_sensor(sensor_name)
-                        status = TANGO_ATTRIBUTE_QUALITY_TO_KATCP_SENSOR_STATUS[quality]
-                        sensor.set_value(
-                            sensor.value(), status=status, timestamp=timestamp
-                        )
-                return
+        try:
+            attribute_sensors = self._attribute_sensors[name]
+        except KeyError:
+            # AR 2016-05-19 TODO Need a robust way of dealing
+            # with not implemented sensors
+            self._logger.info("Sensor not implemented yet! No sensors for %s", name)
+            return
 
-            for index, value_ in enumerate(value):
-                try:
-                    sensor = self.katcp_server.get_sensor(
-                        "{}.{}".format(katcp_name, index)
-                    )
-                except ValueError as verr:
-                    # AR 2016-05-19 TODO Need a robust way of dealing
-                    # with not implemented sensors
-                    self._logger.info("Sensor not implemented yet!" + str(verr))
-                else:
-                    status = TANGO_ATTRIBUTE_QUALITY_TO_KATCP_SENSOR_STATUS[quality]
-                    sensor.set_value(value_, status=status, timestamp=timestamp)
+        status = TANGO_ATTRIBUTE_QUALITY_TO_KATCP_SENSOR_STATUS[quality]
+        if quality == AttrQuality.ATTR_INVALID:
+            for sensor in attribute_sensors.all_sensors:
+                sensor.set_value(sensor.value(), status=status, timestamp=timestamp)
+            return
+        if attribute_sensors.encoder is not None:
+            sensor = attribute_sensors.sensors[0]
+            sensor.set_value(
+                attribute_sensors.encoder(value), status=status, timestamp=timestamp
+            )
+        elif attribute_sensors.data_format == AttrDataFormat.SPECTRUM:
+            for sensor, value_ in zip(attribute_sensors.sensors, value):
+                sensor.set_value(value_, status=status, timestamp=timestamp)
         else:
-            try:
-                sensor = self.katcp_server.get_sensor(katcp_name)
-            except ValueError as verr:
-                # AR 2016-05-19 TODO Need a robust way of dealing
-                # with not implemented sensors
-                self._logger.info("Sensor not implemented yet!" + str(verr))
-            else:
-                status = TANGO_ATTRIBUTE_QUALITY_TO_KATCP_SENSOR_STATUS[quality]
-                if quality == AttrQuality.ATTR_INVALID:
-                    sensor.set_value(sensor.value(), status=status, timestamp=timestamp)
-                else:
-                    if sensor.type == "discrete":
-                        value = sensor.params[value]
-                    sensor.set_value(value, status=status, timestamp=timestamp)
+            sensor = attribute_sensors.sensors[0]
+            if sensor.type == "discrete":
+                value = sensor.params[value]
+            sensor.set_value(value, status=status, timestamp=timestamp)
+        if attribute_sensors.summary_sensors and len(value):
+            values = np.asarray(value, dtype=float)
+            summaries = (values.min(), values.max(), values.mean())
+            for sensor, summary in zip(attribute_sensors.summary_sensors, summaries):
+                sensor.set_value(float(summary), status=status, timestamp=timestamp)
 
     @classmethod
     def from_addresses(
-        cls, katcp_server_address, tango_device_address, logger=log, polling=False
+        cls,
+        katcp_server_address,
+        tango_device_address,
+        logger=log,
+        polling=False,
+        client_polling=False,
+        update_queue_size=None,
+        coalesce_updates=False,
+        inspection_cache=None,
+        **kwargs
     ):
         """Instantiate TangoDevice2KatcpProxy from network addresses
 
@@ -762,6 +1646,22 @@ class TangoDevice2KatcpProxy(object):
             Address where the KATCP server interface should listen
         tango_device_address : str
             Tango address for the device to be translated
+        polling : bool
+            Allow fallback to server polling for attribute sampling
+        client_polling : bool
+            Allow fallback to client-side polling for attribute sampling
+        update_queue_size : int or None
+            Queue sensor updates from the Tango event threads, applying them in
+            batches on the IOLoop. Sensor updates are applied directly from the
+            event threads if None.
+        coalesce_updates : bool
+            Only keep the latest queued update per attribute when the update
+            queue is full, rather than dropping the oldest updates.
+        inspection_cache : :class:`InspectionCache` or None
+            Start from the cached device interface if it is still current, checking
+            it against the device in the background, and cache inspected interfaces.
+        kwargs : keyword arguments
+            Passed on to :class:`TangoDevice2KatcpProxy`, e.g. `spectrum_mode`.
 
         """
         tango_device_proxy = cls.get_tango_device_proxy(tango_device_address)
@@ -769,11 +1669,22 @@ class TangoDevice2KatcpProxy(object):
         katcp_host, katcp_port = katcp_server_address
         katcp_server = TangoProxyDeviceServer(katcp_host, katcp_port)
         katcp_server.set_concurrency_options(thread_safe=False, handler_thread=False)
-        return cls(katcp_server, tango_inspecting_client, logger=logger, polling=polling)
+        return cls(
+            katcp_server,
+            tango_inspecting_client,
+            logger=logger,
+            polling=polling,
+            client_polling=client_polling,
+            update_queue_size=update_queue_size,
+            coalesce_updates=coalesce_updates,
+            inspection_cache=inspection_cache,
+            **kwargs
+        )
 
     @staticmethod
-    def get_tango_device_proxy(device_name, retry_time=2):
+    def get_tango_device_proxy(device_name, retry_time=2, max_retry_time=30):
         tango_dp = None
+        retry_delays = exponential_backoff(retry_time, max_retry_time)
         while not tango_dp:
             try:
                 tango_dp = tango.DeviceProxy(device_name)
@@ -782,15 +1693,272 @@ class TangoDevice2KatcpProxy(object):
                 dferr_desc = set([arg.desc for arg in dferr.args])
                 for reason, description in zip(dferr_reasons, dferr_desc):
                     log.error("{} : {}".format(reason, description))
-                time.sleep(retry_time)
+                time.sleep(next(retry_delays))
         return tango_dp
 
 
-def tango2katcp_main(args=None, start_ioloop=True):
-    from argparse import ArgumentParser
-    from mkat_tango.translators.utilities import address
+TranslatedDevice = namedtuple(
+    "TranslatedDevice", ("device_name", "katcp_port", "name_prefix")
+)
+"""Tango device to be translated by a :class:`TangoDevices2KatcpProxy`
 
-    parser = ArgumentParser(description="Launch Tango device -> KATCP translator")
+device_name : str
+    Tango address of the device.
+katcp_port : int or None
+    Port of the KATCP server dedicated to the device. Not used when the devices
+    share a KATCP server.
+name_prefix : str or None
+    Prefix for the KATCP sensor and request names of the device. Defaults to a
+    prefix derived from the device name when the devices share a KATCP server.
+
+"""
+
+
+def default_name_prefix(device_name):
+    """KATCP name prefix for a Tango device, e.g. 'sys-weather-1' for 'sys/weather/1'
+
+    The prefix is a valid KATCP request name, so that it can be used for both the
+    sensor ('<prefix>.<sensor>') and request ('<prefix>-<request>') names.
+
+    """
+    device_name = device_name.split("#")[0]
+    return "-".join(device_name.split("/")[-3:]).replace("_", "-")
+
+
+def read_translated_devices(filename):
+    """Read the Tango devices to be translated from a JSON file
+
+    The file contains a list of devices, each either a Tango device name or an
+    object with a "device_name" and optional "katcp_port" and "name_prefix" keys::
+
+        {"devices": ["sys/weather/1",
+                     {"device_name": "sys/ap/1", "katcp_port": 5010}]}
+
+    Return Value
+    ============
+    devices : list of :class:`TranslatedDevice`
+
+    """
+    with open(filename) as config_file:
+        config = json.load(config_file)
+    devices = []
+    for device in config["devices"]:
+        if isinstance(device, dict):
+            devices.append(
+                TranslatedDevice(
+                    device["device_name"],
+                    device.get("katcp_port"),
+                    device.get("name_prefix"),
+                )
+            )
+        else:
+            devices.append(TranslatedDevice(device, None, None))
+    return devices
+
+
+def query_translated_devices(pattern, database=None):
+    """Find the exported Tango devices with names matching a wildcard pattern
+
+    Parameters
+    ==========
+    pattern : str
+        Tango device name pattern, e.g. 'sys/weather/*'.
+    database : :class:`tango.Database` or None
+        The Tango database to query, the default database if None.
+
+    Return Value
+    ============
+    devices : list of :class:`TranslatedDevice`
+
+    """
+    database = database or tango.Database()
+    device_names = database.get_device_exported(pattern).value_string
+    return [TranslatedDevice(name, None, None) for name in sorted(device_names)]
+
+
+class TangoDevices2KatcpProxy(object):
+    """Host translators for several Tango devices in one process
+
+    All the translators, and their KATCP servers, share a single tornado IOLoop.
+    Each Tango device is either translated on its own KATCP server, or all the
+    devices share one KATCP server and are told apart by a sensor and request name
+    prefix. The Tango database connection and event dispatch threads are shared
+    by all the Tango device proxies in the process anyway.
+
+    Parameters
+    ==========
+    translators : list of :class:`TangoDevice2KatcpProxy`
+        The translators to host. Translators sharing a KATCP server should be
+        created with `manage_server=False`, leaving the host to manage the server.
+
+    """
+
+    def __init__(self, translators, logger=log):
+        self.translators = translators
+        self._logger = logger
+        self._ioloop_manager = IOLoopManager(managed_default=True, logger=logger)
+        self._ioloop_manager.setDaemon(True)
+        self.ioloop = None
+        self._katcp_servers = []
+        self._shared_katcp_servers = []
+        for translator in translators:
+            server = translator.katcp_server
+            if any(server is server_ for server_ in self._katcp_servers):
+                continue
+            self._katcp_servers.append(server)
+            if not translator._manage_server:
+                self._shared_katcp_servers.append(server)
+        self._start_threads = []
+
+    def set_ioloop(self, ioloop=None):
+        """Set the tornado IOLoop shared by the translators.
+
+        Defaults to IOLoop.current(). If set_ioloop() is never called the IOLoop is
+        started in a new thread, and will be stopped if self.stop() is called.
+
+        Notes
+        -----
+        Must be called before start() is called.
+
+        """
+        self._ioloop_manager.set_ioloop(ioloop, managed=False)
+
+    def start(self, timeout=None):
+        """Start the shared KATCP servers and then each of the translators
+
+        The translators are started in their own threads, so that a Tango device
+        that is not running does not hold up the translation of the others.
+
+        """
+        self.ioloop = self._ioloop_manager.get_ioloop()
+        self._ioloop_manager.start(timeout=timeout)
+        for server in self._katcp_servers:
+            server.set_ioloop(self.ioloop)
+        for server in self._shared_katcp_servers:
+            # No timeout, since start() may be called on the IOLoop itself
+            server.start()
+        for translator in self.translators:
+            thread = threading.Thread(
+                target=self._start_translator, args=(translator, timeout)
+            )
+            thread.daemon = True
+            thread.start()
+            self._start_threads.append(thread)
+
+    def _start_translator(self, translator, timeout):
+        device_name = translator.inspecting_client.tango_dp.name()
+        try:
+            translator.start(timeout=timeout)
+        except Exception:
+            self._logger.exception("Error starting translator for %s", device_name)
+
+    def stop(self, timeout=1.0):
+        """Stop the translators, their KATCP servers and the shared IOLoop"""
+        for translator in self.translators:
+            translator.stop(timeout=timeout)
+        for server in self._shared_katcp_servers:
+            server.stop(timeout=timeout)
+        return self._ioloop_manager.stop(timeout=timeout)
+
+    def join(self, timeout=None):
+        for translator in self.translators:
+            translator.join(timeout=timeout)
+        for server in self._shared_katcp_servers:
+            server.join(timeout=timeout)
+        self._ioloop_manager.join(timeout=timeout)
+
+    @classmethod
+    def from_devices(
+        cls, devices, katcp_host="", shared_katcp_port=None, logger=log, **kwargs
+    ):
+        """Instantiate TangoDevices2KatcpProxy for a list of Tango devices
+
+        Parameters
+        ==========
+        devices : list of :class:`TranslatedDevice`
+            The Tango devices to translate.
+        katcp_host : str
+            Hostname where the KATCP server interfaces should listen.
+        shared_katcp_port : int or None
+            Translate all the devices on a single KATCP server listening on this
+            port, with per-device name prefixes. Otherwise each device gets its own
+            KATCP server, listening on the device's `katcp_port`.
+        kwargs : keyword arguments
+            Passed on to :class:`TangoDevice2KatcpProxy`, e.g. `polling`.
+
+        Raises
+        ======
+        ValueError
+            If a device has no KATCP port, devices have the same KATCP port, or a
+            device proxy cannot be created, e.g. for a device that is not defined
+            in the Tango database. Devices that are defined but not running are
+            translated once they run.
+
+        """
+        if shared_katcp_port is None:
+            katcp_ports = [device.katcp_port for device in devices]
+            duplicate_ports = sorted(
+                set(
+                    port
+                    for port in katcp_ports
+                    if port is not None and katcp_ports.count(port) > 1
+                )
+            )
+            if duplicate_ports:
+                raise ValueError(
+                    "Devices share KATCP ports {}".format(
+                        ", ".join(str(port) for port in duplicate_ports)
+                    )
+                )
+        shared_server = None
+        if shared_katcp_port is not None:
+            shared_server = TangoProxyDeviceServer(katcp_host, shared_katcp_port)
+            shared_server.set_concurrency_options(
+                thread_safe=False, handler_thread=False
+            )
+
+        translators = []
+        for device in devices:
+            if shared_server is not None:
+                katcp_server = shared_server
+                name_prefix = device.name_prefix or default_name_prefix(
+                    device.device_name
+                )
+            elif device.katcp_port is None:
+                raise ValueError(
+                    "No KATCP port given for device {}".format(device.device_name)
+                )
+            else:
+                katcp_server = TangoProxyDeviceServer(katcp_host, device.katcp_port)
+                katcp_server.set_concurrency_options(
+                    thread_safe=False, handler_thread=False
+                )
+                name_prefix = device.name_prefix
+            # Not get_tango_device_proxy(), which retries forever and would hold up
+            # all the devices on a misspelled device name
+            try:
+                tango_device_proxy = tango.DeviceProxy(device.device_name)
+            except tango.DevFailed as exc:
+                raise ValueError(
+                    "Cannot create a proxy for Tango device {}: {}".format(
+                        device.device_name, "; ".join(arg.desc for arg in exc.args)
+                    )
+                )
+            translators.append(
+                TangoDevice2KatcpProxy(
+                    katcp_server,
+                    TangoInspectingClient(tango_device_proxy, logger=logger),
+                    logger=logger,
+                    name_prefix=name_prefix,
+                    manage_server=shared_server is None,
+                    **kwargs
+                )
+            )
+        return cls(translators, logger=logger)
+
+
+def _add_translator_arguments(parser):
+    """Add the command line options shared by the Tango -> KATCP translators"""
     parser.add_argument(
         "-l",
         "--loglevel",
@@ -799,26 +1967,90 @@ def tango2katcp_main(args=None, start_ioloop=True):
         '"NO" for no log config. Default: %(default)s',
     )
     parser.add_argument(
-        "--katcp-server-address",
-        type=address,
-        help="HOST:PORT for the device to listen on",
-        required=True,
+        "--polling",
+        type=bool,
+        help="Allow fallback to server polling for attribute sampling",
     )
     parser.add_argument(
-        "tango_device_address",
-        type=str,
-        help="Address of the tango device to connect to " "(in tango format)",
+        "--client-polling",
+        action="store_true",
+        help="Allow fallback to client-side polling for attribute sampling. Takes "
+        "preference over --polling, leaving the device server polling unchanged",
     )
     parser.add_argument(
-        "--polling",
-        type=bool,
-        help="Allow fallback to server polling for attribute sampling",
+        "--update-queue-size",
+        type=int,
+        help="Queue at most this many sensor updates from Tango event threads and "
+        "apply them in batches on the IOLoop. Updates are applied directly from the "
+        "event threads if not specified",
+    )
+    parser.add_argument(
+        "--coalesce-updates",
+        action="store_true",
+        help="Only keep the latest queued update per attribute when the update queue "
+        "is full, instead of dropping the oldest updates",
+    )
+    parser.add_argument(
+        "--inspection-cache-dir",
+        help="Cache inspected Tango device interfaces in this directory and start "
+        "from the cache when the device interface is unchanged",
+    )
+    parser.add_argument(
+        "--spectrum-mode",
+        choices=SPECTRUM_MODES,
+        default="elements",
+        help="Translate SPECTRUM attributes into a sensor per element, or into a "
+        "single sensor with the spectrum as a JSON list (string) or as base64 "
+        "encoded array bytes (binary). Default: %(default)s",
+    )
+    parser.add_argument(
+        "--spectrum-attribute-mode",
+        type=_spectrum_attribute_mode,
+        action="append",
+        default=[],
+        metavar="ATTRIBUTE=MODE",
+        help="Override --spectrum-mode for a single attribute. May be given more "
+        "than once",
+    )
+    parser.add_argument(
+        "--spectrum-summary",
+        action="store_true",
+        help="Add min, max and mean sensors for numeric SPECTRUM attributes",
+    )
+
+
+def _spectrum_attribute_mode(text):
+    from argparse import ArgumentTypeError
+
+    attribute_name, _, mode = text.partition("=")
+    if not attribute_name or mode not in SPECTRUM_MODES:
+        raise ArgumentTypeError(
+            "Expected ATTRIBUTE=MODE with MODE one of {}".format(
+                ", ".join(SPECTRUM_MODES)
+            )
+        )
+    return attribute_name, mode
+
+
+def _translator_kwargs(opts):
+    return dict(
+        polling=opts.polling,
+        client_polling=opts.client_polling,
+        update_queue_size=opts.update_queue_size,
+        coalesce_updates=opts.coalesce_updates,
+        inspection_cache=(
+            InspectionCache(opts.inspection_cache_dir)
+            if opts.inspection_cache_dir
+            else None
+        ),
+        spectrum_mode=opts.spectrum_mode,
+        spectrum_modes=dict(opts.spectrum_attribute_mode),
+        spectrum_summary=opts.spectrum_summary,
     )
 
-    opts = parser.parse_args(args=args)
 
-    polling = opts.polling
-    loglevel = opts.loglevel.upper()
+def _setup_logging(loglevel):
+    loglevel = loglevel.upper()
     if loglevel != "NO":
         python_loglevel = getattr(logging, loglevel)
         logging.basicConfig(
@@ -827,9 +2059,31 @@ def tango2katcp_main(args=None, start_ioloop=True):
             level=python_loglevel,
         )
 
+
+def tango2katcp_main(args=None, start_ioloop=True):
+    from argparse import ArgumentParser
+    from mkat_tango.translators.utilities import address
+
+    parser = ArgumentParser(description="Launch Tango device -> KATCP translator")
+    parser.add_argument(
+        "--katcp-server-address",
+        type=address,
+        help="HOST:PORT for the device to listen on",
+        required=True,
+    )
+    parser.add_argument(
+        "tango_device_address",
+        type=str,
+        help="Address of the tango device to connect to " "(in tango format)",
+    )
+    _add_translator_arguments(parser)
+
+    opts = parser.parse_args(args=args)
+    _setup_logging(opts.loglevel)
+
     ioloop = tornado.ioloop.IOLoop.current()
     proxy = TangoDevice2KatcpProxy.from_addresses(
-        opts.katcp_server_address, opts.tango_device_address, polling=polling
+        opts.katcp_server_address, opts.tango_device_address, **_translator_kwargs(opts)
     )
     ioloop.add_callback(proxy.start)
     if start_ioloop:
@@ -839,5 +2093,97 @@ def tango2katcp_main(args=None, start_ioloop=True):
             proxy.stop()
 
 
+def tango2katcp_multi_main(args=None, start_ioloop=True):
+    from argparse import ArgumentParser
+    from mkat_tango.translators.utilities import address
+
+    parser = ArgumentParser(
+        description="Launch Tango device -> KATCP translators for several devices "
+        "in one process"
+    )
+    parser.add_argument(
+        "tango_device_addresses",
+        nargs="*",
+        help="Addresses of the tango devices to connect to (in tango format)",
+    )
+    parser.add_argument(
+        "--config",
+        help="JSON file listing the devices to translate, see "
+        "katcp_tango_proxy.read_translated_devices()",
+    )
+    parser.add_argument(
+        "--device-pattern",
+        action="append",
+        default=[],
+        help="Translate the exported devices in the Tango database matching this "
+        "wildcard pattern, e.g. 'sys/weather/*'. May be given more than once",
+    )
+    parser.add_argument(
+        "--katcp-server-address",
+        type=address,
+        help="HOST:PORT for a single KATCP server shared by all the devices, with the "
+        "sensor and request names prefixed per device",
+    )
+    parser.add_argument(
+        "--katcp-host",
+        default="",
+        help="HOST for the per-device KATCP servers to listen on",
+    )
+    parser.add_argument(
+        "--katcp-base-port",
+        type=int,
+        help="Assign consecutive KATCP server ports from this port to the devices "
+        "without a port in the config file, skipping the ports in the config file",
+    )
+    _add_translator_arguments(parser)
+
+    opts = parser.parse_args(args=args)
+    _setup_logging(opts.loglevel)
+
+    devices = [TranslatedDevice(name, None, None) for name in opts.tango_device_addresses]
+    if opts.config:
+        devices.extend(read_translated_devices(opts.config))
+    for pattern in opts.device_pattern:
+        devices.extend(query_translated_devices(pattern))
+    if not devices:
+        parser.error("No Tango devices to translate")
+
+    if opts.katcp_server_address:
+        katcp_host, shared_katcp_port = opts.katcp_server_address
+    else:
+        katcp_host, shared_katcp_port = opts.katcp_host, None
+        if opts.katcp_base_port is not None:
+            configured_ports = set(device.katcp_port for device in devices)
+            ports = (
+                port
+                for port in itertools.count(opts.katcp_base_port)
+                if port not in configured_ports
+            )
+            devices = [
+                device._replace(katcp_port=next(ports))
+                if device.katcp_port is None
+                else device
+                for device in devices
+            ]
+
+    ioloop = tornado.ioloop.IOLoop.current()
+    try:
+        host = TangoDevices2KatcpProxy.from_devices(
+            devices,
+            katcp_host=katcp_host,
+            shared_katcp_port=shared_katcp_port,
+            **_translator_kwargs(opts)
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    host.set_ioloop(ioloop)
+    ioloop.add_callback(host.start)
+    if start_ioloop:
+        try:
+            ioloop.start()
+        except KeyboardInterrupt:
+            host.stop()
+
+
 if __name__ == "__main__":
     tango2katcp_main()
@@ -9,9 +9,11 @@ from future import standard_library
 
 standard_library.install_aliases()
 
-from builtins import object
+from builtins import object, range, zip
+from collections import namedtuple
 import time
 import logging
+import threading
 
 import tango
 
@@ -19,6 +21,81 @@ from tango import AttrQuality
 
 log = logging.getLogger("mkat_tango.translators.tango_inspecting_client")
 
+# Client-side polled readings are reported to sample_event_callback as periodic
+# events, which is what they look like to downstream consumers.
+CLIENT_POLL_EVENT_TYPE = "periodic"
+DEFAULT_CLIENT_POLL_PERIOD = 1000  # in milliseconds
+
+# Fields of tango.AttributeInfoEx / tango.CommandInfo that identify an attribute or
+# command configuration, for detecting configuration changes.
+ATTRIBUTE_CONFIG_FINGERPRINT_FIELDS = (
+    "name",
+    "data_type",
+    "data_format",
+    "writable",
+    "max_dim_x",
+    "max_dim_y",
+    "description",
+    "label",
+    "unit",
+    "min_value",
+    "max_value",
+    "enum_labels",
+)
+COMMAND_INFO_FINGERPRINT_FIELDS = (
+    "cmd_name",
+    "in_type",
+    "out_type",
+    "in_type_desc",
+    "out_type_desc",
+)
+
+InterfaceDelta = namedtuple(
+    "InterfaceDelta",
+    (
+        "added_attributes",
+        "removed_attributes",
+        "changed_attributes",
+        "added_commands",
+        "removed_commands",
+        "changed_commands",
+    ),
+)
+"""Change in a Tango device's interface, as sorted lists of attribute/command names"""
+
+
+def _fingerprint(info, fields):
+    fingerprint = []
+    for field in fields:
+        value = getattr(info, field, None)
+        if field == "enum_labels" and value is not None:
+            # A list or a tango.StdStringVector
+            value = tuple(value)
+        fingerprint.append(value)
+    return tuple(fingerprint)
+
+
+def attribute_config_fingerprint(attribute_config):
+    """Hashable summary of a :class:`tango.AttributeInfoEx` for change detection"""
+    return _fingerprint(attribute_config, ATTRIBUTE_CONFIG_FINGERPRINT_FIELDS)
+
+
+def command_info_fingerprint(command_info):
+    """Hashable summary of a :class:`tango.CommandInfo` for change detection"""
+    return _fingerprint(command_info, COMMAND_INFO_FINGERPRINT_FIELDS)
+
+
+def _dict_delta(old, new, fingerprint):
+    """Added, removed and changed keys between two dicts of Tango info objects"""
+    added = sorted(name for name in new if name not in old)
+    removed = sorted(name for name in old if name not in new)
+    changed = sorted(
+        name
+        for name, info in new.items()
+        if name in old and fingerprint(info) != fingerprint(old[name])
+    )
+    return added, removed, changed
+
 
 class TangoInspectingClient(object):
     """Wrapper around a Tango DeviceProxy that tracks commands/attributes
@@ -30,17 +107,43 @@ class TangoInspectingClient(object):
     ==========
 
     tango_device_proxy : :class:`tango.DeviceProxy` instance.
+    attribute_config_chunk_size : int or None
+        Maximum number of attribute configurations fetched per
+        :meth:`tango.DeviceProxy.get_attribute_config_ex` round trip during
+        inspection. None or 0 fetches all of them in a single call.
+    client_poll_period : int
+        Poll period (in milliseconds) used for client-side polling of attributes
+        that do not specify a periodic event period.
 
     """
 
-    def __init__(self, tango_device_proxy, logger=log):
+    def __init__(
+        self,
+        tango_device_proxy,
+        logger=log,
+        attribute_config_chunk_size=256,
+        client_poll_period=DEFAULT_CLIENT_POLL_PERIOD,
+    ):
         self.tango_dp = tango_device_proxy
         self.device_attributes = {}
         self.device_commands = {}
-        self._event_ids = set()
+        # Event ids of the attribute subscriptions as keys, attribute names as values
+        self._event_ids = {}
+        # Attribute name strings as delivered with events as keys, original
+        # attribute names as values. See _index_event_attr_name().
+        self._event_attr_names = {}
+        # Names of the attributes of which the last event was an error
+        self._stale_attributes = set()
         self._logger = logger
         self.orig_attr_names_map = {}
         self._interface_change_event_id = None
+        self.attribute_config_chunk_size = attribute_config_chunk_size
+        # Wall-clock duration (in seconds) of the last call to inspect()
+        self.inspection_duration = None
+        self.client_poll_period = client_poll_period
+        self._client_poller = ClientAttributePoller(
+            tango_device_proxy, self._client_poll_callback, logger=logger
+        )
 
     def __del__(self):
         try:
@@ -64,17 +167,80 @@ class TangoInspectingClient(object):
         Updates the `device_attributes` and `device_commands` instance attributes
 
         """
+        start_time = time.time()
         self._subscribe_to_event(tango.EventType.INTERFACE_CHANGE_EVENT)
-        self.device_attributes = self.inspect_attributes()
+        # Fetch the attribute list once and reuse it for both maps
+        attribute_names = self.tango_dp.get_attribute_list()
+        self.device_attributes = self.inspect_attributes(attribute_names)
         self.device_commands = self.inspect_commands()
-        self.orig_attr_names_map = self.attr_case_insenstive_patch()
+        self.orig_attr_names_map = self.attr_case_insenstive_patch(attribute_names)
+        self._event_attr_names.clear()
+        self.inspection_duration = time.time() - start_time
+        self._logger.info(
+            "Inspected device %s in %.3f s: %d attributes, %d commands",
+            self.tango_dp.name(),
+            self.inspection_duration,
+            len(self.device_attributes),
+            len(self.device_commands),
+        )
+
+    def load_interface(self, attributes, commands):
+        """Use a previously inspected interface instead of inspecting the device
+
+        Typically an interface restored from an
+        :class:`~mkat_tango.translators.inspection_cache.InspectionCache`. Call
+        :meth:`reinspect` later to bring the interface up to date.
+
+        Parameters
+        ==========
+        attributes : dict
+            Attribute names as keys, attribute configurations as values.
+        commands : dict
+            Command names as keys, command descriptions as values.
+
+        """
+        self.device_attributes = dict(attributes)
+        self.device_commands = dict(commands)
+        self.orig_attr_names_map = self.attr_case_insenstive_patch(attributes)
+        self._event_attr_names.clear()
+
+    def reinspect(self):
+        """Inspect the tango device again, updating the known interface in place
+
+        Subscribes to interface change events if not done yet.
 
-    def attr_case_insenstive_patch(self):
+        Return Value
+        ============
+        delta : :class:`InterfaceDelta`
+            Change relative to the previously known interface.
+
+        """
+        start_time = time.time()
+        if self._interface_change_event_id is None:
+            self._subscribe_to_event(tango.EventType.INTERFACE_CHANGE_EVENT)
+        attribute_names = self.tango_dp.get_attribute_list()
+        attributes_delta = self._update_device_attributes(
+            self.inspect_attributes(attribute_names).values()
+        )
+        commands_delta = self._update_device_commands(self.inspect_commands().values())
+        self.orig_attr_names_map.update(self.attr_case_insenstive_patch(attribute_names))
+        self.inspection_duration = time.time() - start_time
+        return InterfaceDelta(*(attributes_delta + commands_delta))
+
+    def attr_case_insenstive_patch(self, attribute_names=None):
         """ Maps the lowercase-converted attribute names to their original
         attribute names.
         Related to the bug reported on the TANGO forum:
         http://www.tango-controls.org/community/forums/post/1468/
 
+        Parameters
+        ==========
+
+        attribute_names : list of str or None
+            Attribute names to map, as returned by
+            :meth:`tango.DeviceProxy.get_attribute_list`. Queried from the device
+            if None.
+
         Return Value
         ============
 
@@ -83,14 +249,23 @@ class TangoInspectingClient(object):
             name
 
         """
-        return {
-            attr_name.lower(): attr_name
-            for attr_name in self.tango_dp.get_attribute_list()
-        }
+        if attribute_names is None:
+            attribute_names = self.tango_dp.get_attribute_list()
+        return {attr_name.lower(): attr_name for attr_name in attribute_names}
 
-    def inspect_attributes(self):
+    def inspect_attributes(self, attribute_names=None):
         """Return data structure of tango device attributes
 
+        The attribute configurations are fetched in bulk using
+        :meth:`tango.DeviceProxy.get_attribute_config_ex`, in chunks of at most
+        `attribute_config_chunk_size` attributes per round trip.
+
+        Parameters
+        ==========
+
+        attribute_names : list of str or None
+            Attributes to inspect. All the device attributes are inspected if None.
+
         Return Value
         ============
 
@@ -99,10 +274,33 @@ class TangoInspectingClient(object):
             :class: `tango._tango.AttributeInfoEx`, a return value of
             :meth:`tango.DeviceProxy.get_attribute_config` of each attribute.
         """
-        return {
-            attr_name: self.tango_dp.get_attribute_config(attr_name)
-            for attr_name in self.tango_dp.get_attribute_list()
-        }
+        if attribute_names is None:
+            attribute_names = self.tango_dp.get_attribute_list()
+        attribute_names = list(attribute_names)
+        chunk_size = self.attribute_config_chunk_size or len(attribute_names)
+        attributes = {}
+        for start in range(0, len(attribute_names), max(chunk_size, 1)):
+            end = start + chunk_size
+            chunk = attribute_names[start:end]
+            attributes.update(zip(chunk, self._get_attribute_configs(chunk)))
+        return attributes
+
+    def _get_attribute_configs(self, attribute_names):
+        try:
+            return self.tango_dp.get_attribute_config_ex(attribute_names)
+        except tango.DevFailed:
+            # A single bad attribute fails the whole bulk call, so fall back to
+            # fetching the configurations of this chunk one at a time.
+            self._logger.warning(
+                "Bulk attribute config fetch failed for %d attributes, "
+                "retrying individually",
+                len(attribute_names),
+                exc_info=True,
+            )
+            return [
+                self.tango_dp.get_attribute_config(attr_name)
+                for attr_name in attribute_names
+            ]
 
     def inspect_commands(self):
         """Return data structure of tango device commands
@@ -121,20 +319,40 @@ class TangoInspectingClient(object):
         }
 
     def _update_device_commands(self, commands):
-        self.device_commands.clear()
-        for command in commands:
-            self.device_commands[command.cmd_name] = command
+        """Update `device_commands` in place, returning (added, removed, changed)"""
+        new_commands = {command.cmd_name: command for command in commands}
+        added, removed, changed = _dict_delta(
+            self.device_commands, new_commands, command_info_fingerprint
+        )
+        for name in removed:
+            del self.device_commands[name]
+        self.device_commands.update(new_commands)
+        return added, removed, changed
 
     def _update_device_attributes(self, attributes):
-        self.device_attributes.clear()
-        for attribute in attributes:
-            self.device_attributes[attribute.name] = attribute
+        """Update `device_attributes` in place, returning (added, removed, changed)"""
+        new_attributes = {attribute.name: attribute for attribute in attributes}
+        added, removed, changed = _dict_delta(
+            self.device_attributes, new_attributes, attribute_config_fingerprint
+        )
+        # Never leave the dict empty in between, it may be in use by other threads
+        for name in removed:
+            del self.device_attributes[name]
+            self._client_poller.remove_attribute(name)
+        self.device_attributes.update(new_attributes)
+        # Drop index entries of removed attributes, since an attribute could be
+        # added again later with a differently cased name.
+        for event_attr_name, attr_name in list(self._event_attr_names.items()):
+            if attr_name not in self.device_attributes:
+                self._event_attr_names.pop(event_attr_name, None)
+        return added, removed, changed
 
     def interface_change_event_handler(self, event_data):
         """Handles tango device interface change events.
 
         Extracts neccesary data and calls :meth:`interface_change_callback` with
-        said data.
+        said data, and :meth:`interface_delta_callback` with the change relative to
+        the previously known interface if anything changed.
         """
         if event_data.err:
             # Need to catch this, otherwise it is going to clear out the attribute
@@ -145,14 +363,24 @@ class TangoInspectingClient(object):
             return
 
         received_timestamp = event_data.reception_date.totime()
-        self._update_device_attributes(event_data.att_list)
-        self._update_device_commands(event_data.cmd_list)
+        attributes_delta = self._update_device_attributes(event_data.att_list)
+        commands_delta = self._update_device_commands(event_data.cmd_list)
         self.interface_change_callback(
             event_data.device_name,
             received_timestamp,
             self.device_attributes,
             self.device_commands,
         )
+        delta = InterfaceDelta(*(attributes_delta + commands_delta))
+        if any(delta):
+            self.interface_delta_callback(
+                event_data.device_name, received_timestamp, delta
+            )
+        else:
+            self._logger.debug(
+                "Interface change event from %s without any changes",
+                event_data.device_name,
+            )
 
     def attribute_event_handler(self, event_data):
         """Handles tango attribute events.
@@ -163,15 +391,13 @@ class TangoInspectingClient(object):
         """
         # TODO NM 2016-04-06 Call a different callback for non-sample events,
         # i.e. error callbacks etc.
+        try:
+            attr_name = self._event_attr_names[event_data.attr_name]
+        except KeyError:
+            attr_name = self._index_event_attr_name(event_data.attr_name)
+
         if event_data.err:
-            fqdn_attr_name = event_data.attr_name
-            # tango://monctl.devk4.camlab.kat.ac.za:4000/mid_dish_0000/elt/
-            # master/<attribute_name>#dbase=no
-            # We process the FQDN of the attribute to extract just the
-            # attribute name. Also handle the issue with the attribute name being
-            # converted to lowercase in subsequent callbacks.
-            attr_name_ = fqdn_attr_name.split("/")[-1].split("#")[0]
-            attr_name = self.orig_attr_names_map[attr_name_.lower()]
+            self._stale_attributes.add(attr_name)
             received_timestamp = event_data.reception_date.totime()
             quality = AttrQuality.ATTR_INVALID  # Events with errors do not send
             # the attribute value, so regard
@@ -188,23 +414,35 @@ class TangoInspectingClient(object):
 
             return
 
-        event_type = event_data.event
-        received_timestamp = event_data.reception_date.totime()
+        self._stale_attributes.discard(attr_name)
         attr_value = event_data.attr_value
-        name = attr_value.name
-        value = attr_value.value
-        quality = attr_value.quality
-        timestamp = attr_value.time.totime()
-
-        # A work around to remove the suffix "#dbase=no" string when using a
-        # file as a database. Also handle the issue with the attribute name being
-        # converted to lowercase in subsequent callbacks.
-        name_trimmed = name.split("#")[0]
-        attr_name = self.orig_attr_names_map[name_trimmed.lower()]
         self.sample_event_callback(
-            attr_name, received_timestamp, timestamp, value, quality, event_type
+            attr_name,
+            event_data.reception_date.totime(),
+            attr_value.time.totime(),
+            attr_value.value,
+            attr_value.quality,
+            event_data.event,
         )
 
+    def _index_event_attr_name(self, event_attr_name):
+        """Resolve and index the attribute name string delivered with events
+
+        Tango delivers the fully qualified attribute name with every event, e.g.
+        tango://monctl.devk4.camlab.kat.ac.za:4000/mid_dish_0000/elt/
+        master/<attribute_name>#dbase=no, with the attribute name possibly
+        converted to lowercase. The original attribute name is resolved once
+        per distinct string and cached in `_event_attr_names`, so that the
+        event handler only needs a single dict lookup. Since Tango delivers the
+        first change event synchronously from subscribe_event, the index is
+        normally populated while subscribing.
+
+        """
+        attr_name_ = event_attr_name.split("/")[-1].split("#")[0]
+        attr_name = self.orig_attr_names_map[attr_name_.lower()]
+        self._event_attr_names[event_attr_name] = attr_name
+        return attr_name
+
     def interface_change_callback(
         self, device_name, received_timestamp, attributes, commands
     ):
@@ -228,6 +466,24 @@ class TangoInspectingClient(object):
         """
         pass
 
+    def interface_delta_callback(self, device_name, received_timestamp, delta):
+        """Callback called with the change in interface on interface change events.
+
+        NOP implementation. Intended for subclasses to override this method, or
+        for the method to be replaced in instances. Only called if the interface
+        actually changed. The new attribute and command info is available in
+        `device_attributes` and `device_commands`.
+
+        Parameters
+        ----------
+        device_name: str
+        received_timestamp: float
+        delta : :class:`InterfaceDelta`
+            Names of the added, removed and changed (different configuration)
+            attributes and commands.
+        """
+        pass
+
     def sample_event_callback(
         self, name, received_timestamp, timestamp, value, quality, event_type
     ):
@@ -241,6 +497,11 @@ class TangoInspectingClient(object):
         """
         pass
 
+    def _client_poll_callback(self, *args):
+        # Look up sample_event_callback on every call since it is typically
+        # replaced on the instance after the poller has been created.
+        self.sample_event_callback(*args)
+
     def _subscribe_to_event(self, event_type, attribute_name=None, warn_no_polling=True):
 
         dp = self.tango_dp
@@ -257,7 +518,7 @@ class TangoInspectingClient(object):
                     self.attribute_event_handler,
                     stateless=False,
                 )
-                self._event_ids.add(event_id)
+                self._event_ids[event_id] = attribute_name
             subscribed = True
         except tango.DevFailed as exc:
             exc_reasons = {arg.reason for arg in exc.args}
@@ -276,9 +537,28 @@ class TangoInspectingClient(object):
                 raise
         return subscribed
 
-    def setup_attribute_sampling(self, attributes=None, server_polling_fallback=False):
-        """Subscribe to all or some types of Tango attribute events"""
-        if server_polling_fallback:
+    def setup_attribute_sampling(
+        self,
+        attributes=None,
+        server_polling_fallback=False,
+        client_polling_fallback=False,
+    ):
+        """Subscribe to all or some types of Tango attribute events
+
+        Parameters
+        ----------
+        attributes : iterable of str or None
+            Names of the attributes to sample, all device attributes if None.
+        server_polling_fallback : bool
+            Enable polling on the device server for attributes that cannot be
+            subscribed to as they are.
+        client_polling_fallback : bool
+            Poll attributes that cannot be subscribed to as they are on the
+            client side, leaving the polling configuration of the device server
+            unchanged. Takes preference over `server_polling_fallback`.
+
+        """
+        if server_polling_fallback and not client_polling_fallback:
             self._logger.warning(
                 "Sampling may enable polling on device %s", self.tango_dp.name()
             )
@@ -286,19 +566,20 @@ class TangoInspectingClient(object):
         for attr_name in sorted(attributes):
             # order of preference (for efficiency)
             # * change (leave polling unchanged)
+            # * client-side polling (leave server polling unchanged)
             # * change (enable server polling)
             # * periodic (enable server polling)
-            # TODO: add manual polling on client side instead of enabling
-            #       polling on server.
-            #       See gitlab.com/ska-telescope/web-maxiv-tangogql/-/blob/
-            #           e1e4098f/tangogql/aioattribute/attribute.py#L120
 
             subscribed = self._subscribe_to_event(
                 tango.EventType.CHANGE_EVENT,
                 attr_name,
-                warn_no_polling=not server_polling_fallback,
+                warn_no_polling=not (server_polling_fallback or client_polling_fallback),
             )
 
+            if not subscribed and client_polling_fallback:
+                self._setup_client_polling(attr_name)
+                subscribed = True
+
             if not subscribed and server_polling_fallback:
                 self._setup_attribute_polling(attr_name)
                 events = self.device_attributes[attr_name].events
@@ -313,9 +594,26 @@ class TangoInspectingClient(object):
 
             if not subscribed:
                 self._logger.warning("Failed to subscribe to attribute '%s'", attr_name)
-            # TODO: read initial value manually, if couldn't subscribe
-            #       call sample_event_callback with AttrQuality.ATTR_INVALID
-            #       since we are not getting updates.
+
+    def _setup_client_polling(self, attribute_name):
+        poll_period = self.client_poll_period
+        attr_config = self.device_attributes.get(attribute_name)
+        if attr_config is not None:
+            try:
+                period = int(attr_config.events.per_event.period)
+            except ValueError:
+                # Typically "Not specified"
+                pass
+            else:
+                # A zero or negative period would make the poll loop spin
+                if period > 0:
+                    poll_period = period
+        self._client_poller.add_attribute(attribute_name, poll_period)
+        self._logger.info(
+            "Polling attribute '%s' on the client side every %d ms",
+            attribute_name,
+            poll_period,
+        )
 
     def _setup_attribute_polling(self, attribute_name, poll_period=1000):
         retry_time = 0.5  # in seconds
@@ -356,14 +654,51 @@ class TangoInspectingClient(object):
                 return False
         return True
 
+    @property
+    def stale_attributes(self):
+        """Names of the subscribed attributes of which the last event was an error"""
+        return set(self._stale_attributes)
+
+    @property
+    def client_polled_attributes(self):
+        """Names of the attributes polled on the client side"""
+        return self._client_poller.attributes
+
+    def unsubscribe_attributes(self, attribute_names):
+        """Unsubscribe from the events of some attributes
+
+        Typically before setting up sampling for them again with
+        :meth:`setup_attribute_sampling`.
+
+        """
+        attribute_names = set(attribute_names)
+        for attr_name in attribute_names:
+            self._client_poller.remove_attribute(attr_name)
+        for event_id, attr_name in list(self._event_ids.items()):
+            if attr_name not in attribute_names:
+                continue
+            del self._event_ids[event_id]
+            try:
+                self.tango_dp.unsubscribe_event(event_id)
+            except tango.DevFailed:
+                self._logger.debug(
+                    "Could not unsubscribe event %s of attribute %s",
+                    event_id,
+                    attr_name,
+                    exc_info=True,
+                )
+        self._stale_attributes.difference_update(attribute_names)
+
     def clear_attribute_sampling(self):
         """Unsubscribe from all Tango events previously subscribed to
 
         Cleanup for setup_attribute_sampling
 
         """
+        self._client_poller.clear()
+        self._stale_attributes.clear()
         while self._event_ids:
-            event_id = self._event_ids.pop()
+            event_id, _ = self._event_ids.popitem()
             try:
                 self.tango_dp.unsubscribe_event(event_id)
             except tango.DevFailed as exc:
@@ -372,3 +707,133 @@ class TangoInspectingClient(object):
                     self._logger.info("No event with id {} was set up.".format(event_id))
                 else:
                     raise
+
+
+class ClientAttributePoller(object):
+    """Poll Tango attributes on the client side
+
+    Attributes are grouped by poll period. Each group is read with a single
+    :meth:`tango.DeviceProxy.read_attributes` call per period, from a thread
+    dedicated to that group.
+
+    Parameters
+    ==========
+
+    tango_device_proxy : :class:`tango.DeviceProxy` instance.
+    callback : callable
+        Called for every reading with the same parameters as
+        :meth:`TangoInspectingClient.sample_event_callback`.
+
+    """
+
+    def __init__(self, tango_device_proxy, callback, logger=log):
+        self.tango_dp = tango_device_proxy
+        self.callback = callback
+        self._logger = logger
+        self._lock = threading.Lock()
+        # Poll period in milliseconds as keys, set of attribute names as values
+        self._groups = {}
+        # Poll period in milliseconds as keys, threading.Event as values
+        self._stop_events = {}
+
+    @property
+    def attributes(self):
+        """Names of all the attributes currently being polled"""
+        with self._lock:
+            return set().union(*self._groups.values())
+
+    def add_attribute(self, attribute_name, poll_period):
+        """Start polling `attribute_name` every `poll_period` milliseconds"""
+        with self._lock:
+            self._discard(attribute_name, keep_period=poll_period)
+            group = self._groups.get(poll_period)
+            if group is None:
+                group = self._groups[poll_period] = set()
+                stopped = self._stop_events[poll_period] = threading.Event()
+                t = threading.Thread(
+                    target=self._poll_loop,
+                    args=(poll_period, group, stopped),
+                    name="ClientPoller-{}-{}ms".format(self.tango_dp.name(), poll_period),
+                )
+                t.daemon = True
+                t.start()
+            group.add(attribute_name)
+
+    def remove_attribute(self, attribute_name):
+        """Stop polling `attribute_name`, and stop the threads of emptied groups"""
+        with self._lock:
+            self._discard(attribute_name)
+
+    def _discard(self, attribute_name, keep_period=None):
+        """Remove `attribute_name` from all groups but the `keep_period` one
+
+        Stops the threads of the groups that are left empty. Must be called with
+        `_lock` held.
+
+        """
+        for poll_period, group in list(self._groups.items()):
+            if poll_period == keep_period:
+                continue
+            group.discard(attribute_name)
+            if not group:
+                self._stop_events.pop(poll_period).set()
+                del self._groups[poll_period]
+
+    def clear(self):
+        """Stop polling all attributes"""
+        with self._lock:
+            for stopped in self._stop_events.values():
+                stopped.set()
+            self._groups.clear()
+            self._stop_events.clear()
+
+    def _poll_loop(self, poll_period, group, stopped):
+        period = poll_period / 1000.0
+        next_poll_time = time.time()
+        with tango.EnsureOmniThread():
+            while not stopped.is_set():
+                with self._lock:
+                    attr_names = sorted(group)
+                if attr_names:
+                    self._poll(attr_names)
+                next_poll_time += period
+                now = time.time()
+                if next_poll_time < now:
+                    # Fell behind, rather skip the missed ticks than bunch up
+                    next_poll_time = now
+                stopped.wait(next_poll_time - now)
+
+    def _poll(self, attr_names):
+        received_timestamp = time.time()
+        try:
+            readings = self.tango_dp.read_attributes(attr_names)
+        except tango.DevFailed:
+            self._logger.debug(
+                "Client-side poll of %d attributes failed", len(attr_names), exc_info=True
+            )
+            readings = [None] * len(attr_names)
+
+        for attr_name, reading in zip(attr_names, readings):
+            try:
+                if reading is None or reading.has_failed:
+                    self.callback(
+                        attr_name,
+                        received_timestamp,
+                        received_timestamp,
+                        None,
+                        AttrQuality.ATTR_INVALID,
+                        CLIENT_POLL_EVENT_TYPE,
+                    )
+                else:
+                    self.callback(
+                        attr_name,
+                        received_timestamp,
+                        reading.time.totime(),
+                        reading.value,
+                        reading.quality,
+                        CLIENT_POLL_EVENT_TYPE,
+                    )
+            except Exception:
+                self._logger.exception(
+                    "Error handling client-side poll of attribute %s", attr_name
+                )
@@ -13,21 +13,33 @@ from future import standard_library
 
 standard_library.install_aliases()
 
+import itertools
+import json
 import logging
+import os
+import queue
+import threading
+import time
 import weakref
 
-from builtins import object
-from concurrent.futures import Future
+from builtins import next, object, range
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import tango
 import tornado
+import tornado.locks
 
 from katcp import Message, inspecting_client, ioloop_manager
 from katcp.client import BlockingClient
 from katcp.compat import ensure_native_str
 from katcp.core import Sensor
 from mkat_tango import helper_module
-from mkat_tango.translators.utilities import katcpname2tangoname
+from mkat_tango.translators.inspection_cache import KatcpRequestCache
+from mkat_tango.translators.utilities import (
+    SensorAttributeNameMap,
+    katcpname2tangoname,
+)
 from tango import (
     Attr,
     AttrQuality,
@@ -51,6 +63,15 @@ from tango.server import (
 
 MODULE_LOGGER = logging.getLogger(__name__)
 
+# Environment variable naming the directory of the KATCP request cache
+REQUEST_CACHE_DIR_ENV = "MKAT_TANGO_KATCP_REQUEST_CACHE_DIR"
+
+# Most KATCP devices inspected concurrently when building the device class
+MAX_CONCURRENT_REQUEST_INSPECTIONS = 16
+
+_shared_ioloop_manager = None
+_shared_ioloop_manager_lock = threading.Lock()
+
 KATCP_TYPE_TO_TANGO_TYPE = {
     "integer": DevLong64,
     "float": DevDouble,
@@ -96,12 +117,14 @@ def kattype2tangotype_object(katcp_sens_type):
     return tango_type
 
 
-def katcp_sensor2tango_attr(sensor):
+def katcp_sensor2tango_attr(sensor, name_map=None):
     """Convert KATCP type object to corresponding TANGO type object
 
     Parameters
     ----------
     sensor: A katcp.Sensor object
+    name_map : :class:`SensorAttributeNameMap` or None
+        Names the attribute, or :func:`katcpname2tangoname` if None.
 
     Returns
     -------
@@ -110,7 +133,10 @@ def katcp_sensor2tango_attr(sensor):
     """
     tango_type = kattype2tangotype_object(sensor.stype)
     attr_props = UserDefaultAttrProp()  # Used to set the attribute default properties
-    attr_name = katcpname2tangoname(sensor.name)
+    if name_map is None:
+        attr_name = katcpname2tangoname(sensor.name)
+    else:
+        attr_name = name_map.attribute_name(sensor.name)
     attribute = Attr(attr_name, tango_type, AttrWriteType.READ)
     if sensor.stype in ["integer", "float"]:
         if sensor.params:
@@ -123,10 +149,15 @@ def katcp_sensor2tango_attr(sensor):
         # Seems to cause a seg fault if units is empty
         attr_props.set_unit(sensor.units)
     attribute.set_default_properties(attr_props)
+    # Events are pushed by the translator on KATCP sensor updates
+    attribute.set_change_event(True, False)
+    attribute.set_archive_event(True, False)
     return attribute
 
 
-def add_tango_server_attribute_list(tango_dserver, sensors, error_list=None):
+def add_tango_server_attribute_list(
+    tango_dserver, sensors, error_list=None, name_map=None
+):
     """Add in new TANGO attributes.
 
     Parameters
@@ -139,6 +170,8 @@ def add_tango_server_attribute_list(tango_dserver, sensors, error_list=None):
     error_list : list or None
         List of sensors that could not be translated due to an error
         condition. Will append error-sensors to this list.
+    name_map : :class:`SensorAttributeNameMap` or None
+        Names the attributes, or :func:`katcpname2tangoname` if None.
 
     Returns
     -------
@@ -149,7 +182,7 @@ def add_tango_server_attribute_list(tango_dserver, sensors, error_list=None):
     # random order.
     for _, sensor in sorted(sensors.items()):
         try:
-            attribute = katcp_sensor2tango_attr(sensor)
+            attribute = katcp_sensor2tango_attr(sensor, name_map)
             tango_dserver.add_attribute(attribute, tango_dserver.read_attr)
         except Exception:
             MODULE_LOGGER.exception(
@@ -159,7 +192,9 @@ def add_tango_server_attribute_list(tango_dserver, sensors, error_list=None):
                 error_list.append(sensor.name)
 
 
-def remove_tango_server_attribute_list(tango_dserver, sensors, error_list=None):
+def remove_tango_server_attribute_list(
+    tango_dserver, sensors, error_list=None, name_map=None
+):
     """Remove existing TANGO attributes.
 
     Parameters
@@ -173,6 +208,11 @@ def remove_tango_server_attribute_list(tango_dserver, sensors, error_list=None):
         List of sensors that could not be translated due to an error
         condition. Will remove error-sensors to this list if they are removed
         from the KATCP device
+    name_map : :class:`SensorAttributeNameMap` or None
+        Names the attributes, or :func:`katcpname2tangoname` if None. Sensors
+        not in the map have no attribute of their own, e.g. because their
+        attribute name is taken by another sensor, so that nothing is removed
+        for them.
 
     Returns
     -------
@@ -180,19 +220,41 @@ def remove_tango_server_attribute_list(tango_dserver, sensors, error_list=None):
 
     """
     for sensor_name in sensors.keys():
-        attr_name = katcpname2tangoname(sensor_name)
         if error_list is not None:
             try:
                 error_list.remove(sensor_name)
             except ValueError:
                 # OK if this was not an error-sensor.
                 pass
+        if name_map is None:
+            attr_name = katcpname2tangoname(sensor_name)
+        elif sensor_name in name_map:
+            attr_name = name_map.attribute_name(sensor_name)
+        else:
+            continue
         try:
             tango_dserver.remove_attribute(attr_name)
         except DevFailed:
             MODULE_LOGGER.debug("Attribute {} does not exist".format(attr_name))
 
 
+def get_shared_ioloop_manager():
+    """IOLoopManager shared by all the translated devices in the process
+
+    The manager is started on first use, and runs until the process exits.
+
+    """
+    global _shared_ioloop_manager
+    with _shared_ioloop_manager_lock:
+        if _shared_ioloop_manager is None:
+            iolm = ioloop_manager.IOLoopManager()
+            iolm.setDaemon(True)
+            iolm.get_ioloop()
+            iolm.start()
+            _shared_ioloop_manager = iolm
+        return _shared_ioloop_manager
+
+
 def create_command2request_handler(req_name, req_doc):
     """Convert katcp request decription into a tango command handler
 
@@ -212,20 +274,14 @@ def create_command2request_handler(req_name, req_doc):
     if "Parameters" in req_doc:
 
         def cmd_handler(self, request_args):
-            MODULE_LOGGER.info("Executing request {}".format(req_name))
-            reply = self.tango_katcp_proxy.do_request(req_name, request_args)
-            MODULE_LOGGER.info(reply.arguments)
-            return reply.arguments
+            return self.execute_request(req_name, request_args)
 
         cmd_handler.__name__ = katcpname2tangoname(req_name)
         return command(f=cmd_handler, dtype_in=(str,), dtype_out=(str,), doc_in=req_doc)
     else:
 
         def cmd_handler(self):
-            MODULE_LOGGER.info("Executing request {}".format(req_name))
-            reply = self.tango_katcp_proxy.do_request(req_name)
-            MODULE_LOGGER.info(reply.arguments)
-            return reply.arguments
+            return self.execute_request(req_name)
 
         cmd_handler.__name__ = katcpname2tangoname(req_name)
         return command(
@@ -235,6 +291,10 @@ def create_command2request_handler(req_name, req_doc):
 
 class TangoDeviceServerBase(Device):
     instances = weakref.WeakValueDictionary()
+    # KATCP addresses as keys, names of the requests of the KATCP device as values.
+    # Set by get_tango_device_server(), since the class has the commands of all
+    # the KATCP devices of the server.
+    katcp_request_names = {}
 
     katcp_address = device_property(
         dtype=str, doc="katcp address of the device to translate as <host>:<port>"
@@ -244,6 +304,28 @@ class TangoDeviceServerBase(Device):
         default_value=5,
         doc="Timeout (in seconds) for syncing with the KATCP device at startup",
     )
+    katcp_sensor_fetch_concurrency = device_property(
+        dtype=int,
+        default_value=32,
+        doc="Most KATCP sensor descriptions fetched concurrently",
+    )
+    katcp_attribute_batch_size = device_property(
+        dtype=int,
+        default_value=100,
+        doc="Number of attributes added to the device at a time while syncing",
+    )
+    async_requests = device_property(
+        dtype=bool,
+        default_value=False,
+        doc="Translated commands start their KATCP requests and return a request "
+        "id immediately. The results are pushed as LastRequestResult change "
+        "events and are available from the GetRequestResult command.",
+    )
+    max_concurrent_requests = device_property(
+        dtype=int,
+        default_value=4,
+        doc="Most KATCP requests in flight at a time in asynchronous mode",
+    )
 
     def __init__(self, *args, **kwargs):
         self.tango_katcp_proxy = None
@@ -271,6 +353,18 @@ class TangoDeviceServerBase(Device):
     def NumErrorTranslatingSensors(self):
         return len(self.tango_katcp_proxy.untranslated_sensors)
 
+    @attribute(
+        dtype=float,
+        unit="%",
+        doc="Progress of translating the KATCP sensors added by the latest "
+        "change of the KATCP interface",
+        min_value=0,
+        max_value=100,
+        polling_period=1000,
+    )
+    def SensorSyncProgress(self):
+        return self.tango_katcp_proxy.sensor_sync_progress
+
     @attribute(
         dtype=(str,),
         doc="List of KATCP request replies",
@@ -291,18 +385,70 @@ class TangoDeviceServerBase(Device):
     def Informs(self):
         return self.tango_katcp_proxy.informs
 
+    @attribute(
+        dtype=str,
+        doc="JSON encoded result of the latest completed asynchronous KATCP request",
+    )
+    def LastRequestResult(self):
+        return self.tango_katcp_proxy.last_request_result
+
+    @command(
+        dtype_in=str,
+        doc_in="Request id returned by a command in asynchronous mode",
+        dtype_out=str,
+        doc_out="JSON encoded request result, with a status of "
+        "'pending', 'done' or 'error'",
+    )
+    def GetRequestResult(self, request_id):
+        return json.dumps(self.tango_katcp_proxy.get_request_result(request_id))
+
+    def execute_request(self, req_name, request_args=None):
+        """Execute the KATCP request of a translated command
+
+        Returns
+        -------
+        reply : list of str
+            Arguments of the KATCP reply, or just the request id in
+            asynchronous mode.
+
+        """
+        MODULE_LOGGER.info("Executing request {}".format(req_name))
+        request_names = self.katcp_request_names.get(self.katcp_address)
+        if request_names is not None and req_name not in request_names:
+            raise ValueError(
+                "KATCP device {} has no request {!r}".format(self.katcp_address, req_name)
+            )
+        if self.async_requests:
+            return [self.tango_katcp_proxy.start_request(req_name, request_args)]
+        reply = self.tango_katcp_proxy.do_request(req_name, request_args)
+        MODULE_LOGGER.info(reply.arguments)
+        return reply.arguments
+
+    def delete_device(self):
+        if self.tango_katcp_proxy:
+            self.tango_katcp_proxy.stop()
+            self.tango_katcp_proxy = None
+
     def init_device(self):
         if self.tango_katcp_proxy:
-            self.tango_katcp_proxy.ioloop.add_callback(self.tango_katcp_proxy.ioloop.stop)
+            self.tango_katcp_proxy.stop()
 
         Device.init_device(self)
         self.set_state(DevState.ON)
+        # Pushed by the event pusher, along with archive events like all the
+        # translated attributes
+        self.set_change_event("LastRequestResult", True, False)
+        self.set_archive_event("LastRequestResult", True, False)
         name = self.get_name()
         self.instances[name] = self
         katcp_host, katcp_port = self.katcp_address.split(":")
         katcp_port = int(katcp_port)
         self.tango_katcp_proxy = KatcpTango2DeviceProxy.from_katcp_address_tango_device(
-            (katcp_host, katcp_port), self
+            (katcp_host, katcp_port),
+            self,
+            max_sensor_fetches_in_flight=self.katcp_sensor_fetch_concurrency,
+            attribute_batch_size=self.katcp_attribute_batch_size,
+            max_concurrent_requests=self.max_concurrent_requests,
         )
         self.tango_katcp_proxy.start()
         # The conditional statement resolves the tango server error:
@@ -336,38 +482,73 @@ class TangoDeviceServerBase(Device):
 
         """
         name = attr.get_name()
-        sensor_updates = self.tango_katcp_proxy.sensor_observer.updates[name]
-        quality = KATCP_SENSOR_STATUS_TO_TANGO_ATTRIBUTE_QUALITY[sensor_updates["status"]]
-        timestamp = sensor_updates["timestamp"]
-        value = sensor_updates["value"]
-        self.info_stream("Reading attribute {} : {}".format(name, sensor_updates))
-        attr.set_value_date_quality(value, timestamp, quality)
+        reading = self.tango_katcp_proxy.sensor_observer.readings[name]
+        if self.get_logger().is_info_enabled():
+            self.info_stream("Reading attribute {} : {!r}".format(name, reading))
+        attr.set_value_date_quality(reading.value, reading.timestamp, reading.quality)
 
 
 class KatcpTango2DeviceProxy(object):
-    def __init__(self, katcp_inspecting_client, tango_device_server, ioloop):
+    # Most ?sensor-sampling requests in flight at a time, if the KATCP server does
+    # not support setting the sampling strategy of many sensors in one request
+    max_sampling_requests_in_flight = 32
+    # Most sensor names per bulk ?sensor-sampling request
+    bulk_sampling_chunk_size = 1000
+
+    def __init__(
+        self,
+        katcp_inspecting_client,
+        tango_device_server,
+        ioloop,
+        max_sensor_fetches_in_flight=32,
+        attribute_batch_size=100,
+        max_concurrent_requests=4,
+        max_request_results=1000,
+        katcp_request_timeout=5.0,
+    ):
         self.katcp_inspecting_client = katcp_inspecting_client
         self.tango_device_server = tango_device_server
         self.ioloop = ioloop
-        self.sensor_observer = SensorObserver()
+        self.max_sensor_fetches_in_flight = max_sensor_fetches_in_flight
+        self.attribute_batch_size = attribute_batch_size
+        # Added KATCP sensors being translated, and those translated so far
+        self.num_sensors_to_sync = 0
+        self.num_sensors_synced = 0
+        self.event_pusher = AttributeEventPusher(tango_device_server)
+        # Names of the translated sensors, updated on KATCP interface changes
+        self.name_map = SensorAttributeNameMap()
+        self.sensor_observer = SensorObserver(self.event_pusher, self.name_map)
         self.untranslated_sensors = []
         self.replies = []
         self.informs = []
+        # Asynchronous requests
+        self.max_request_results = max_request_results
+        self.katcp_request_timeout = katcp_request_timeout
+        self.last_request_result = ""
+        self._request_limit = tornado.locks.Semaphore(max_concurrent_requests)
+        self._request_ids = itertools.count(1)
+        # Request ids as keys, results as values, oldest first
+        self._request_results = OrderedDict()
+        self._request_results_lock = threading.Lock()
 
     def start(self):
         """Start the translator
 
-        Starts the KATCP inspecting client
+        Starts the attribute event pusher and the KATCP inspecting client
 
         """
+        self.event_pusher.start()
         self.katcp_inspecting_client.set_state_callback(self.katcp_state_callback)
         self.ioloop.add_callback(self.katcp_inspecting_client.connect)
 
     def stop(self, timeout=1.0):
-        """Stop the ioloop and thus the KATCP inspecting client
+        """Stop the KATCP inspecting client and the attribute event pusher
+
+        The ioloop keeps running, since it may be shared with other translators.
 
         """
-        self.ioloop.add_callback(self.ioloop.stop)
+        self.ioloop.add_callback(self.katcp_inspecting_client.stop)
+        self.event_pusher.stop()
 
     def wait_synced(self, timeout=None):
         f = Future()  # Should be a thread-safe future
@@ -427,6 +608,93 @@ class KatcpTango2DeviceProxy(object):
             self.informs.extend(inf.arguments)
         return reply
 
+    def start_request(self, req, request_args=None):
+        """Start a KATCP request without waiting for the reply
+
+        Parameters
+        ----------
+        req : str
+            request name
+        request_args : list
+            request parameters in string format
+
+        Returns
+        -------
+        request_id : str
+            Id for :meth:`get_request_result`.
+
+        """
+        request_id = str(next(self._request_ids))
+        result = {"request_id": request_id, "request": req, "status": "pending"}
+        self._add_request_result(result)
+        self.ioloop.add_callback(self._run_request, result, request_args or [])
+        return request_id
+
+    def get_request_result(self, request_id):
+        """Result of an asynchronous request
+
+        Returns
+        -------
+        result : dict
+            With the "request_id", "request" and "status" of the request. The
+            status is "pending" until the reply is received, "done" with the
+            "reply" and "informs" arguments after that, or "error" with an "error"
+            message if the request could not be made.
+
+        Raises
+        ------
+        KeyError
+            If the request id is unknown, or its result has been discarded.
+
+        """
+        with self._request_results_lock:
+            try:
+                return self._request_results[request_id]
+            except KeyError:
+                raise KeyError("Unknown request id {!r}".format(request_id))
+
+    def _add_request_result(self, result):
+        with self._request_results_lock:
+            self._request_results[result["request_id"]] = result
+            while len(self._request_results) > self.max_request_results:
+                self._request_results.popitem(last=False)
+
+    def _update_request_result(self, result):
+        with self._request_results_lock:
+            # Unless it has been discarded while the request was in flight
+            if result["request_id"] in self._request_results:
+                self._request_results[result["request_id"]] = result
+
+    @tornado.gen.coroutine
+    def _run_request(self, result, request_args):
+        result = dict(result)
+        with (yield self._request_limit.acquire()):
+            try:
+                reply, informs = yield self.katcp_inspecting_client.simple_request(
+                    ensure_native_str(result["request"]),
+                    *request_args,
+                    timeout=self.katcp_request_timeout
+                )
+            except Exception as exc:
+                MODULE_LOGGER.warning("Request %s failed: %s", result["request"], exc)
+                result["status"] = "error"
+                result["error"] = str(exc)
+            else:
+                result["status"] = "done"
+                result["reply"] = [ensure_native_str(arg) for arg in reply.arguments]
+                result["informs"] = [
+                    [ensure_native_str(arg) for arg in inform.arguments]
+                    for inform in informs
+                ]
+        self._update_request_result(result)
+        self.last_request_result = json.dumps(result)
+        self.event_pusher.push(
+            "LastRequestResult",
+            self.last_request_result,
+            time.time(),
+            AttrQuality.ATTR_VALID,
+        )
+
     @tornado.gen.coroutine
     def katcp_state_callback(self, state, model_changes):
         if model_changes:
@@ -435,40 +703,130 @@ class KatcpTango2DeviceProxy(object):
             removed_sensors = sensor_changes.get("removed", set())
             yield self.reconfigure_tango_device_server(removed_sensors, added_sensors)
 
+    @property
+    def sensor_sync_progress(self):
+        """Percentage of the latest added KATCP sensors translated so far"""
+        if not self.num_sensors_to_sync:
+            return 100.0
+        return 100.0 * self.num_sensors_synced / self.num_sensors_to_sync
+
     @tornado.gen.coroutine
     def reconfigure_tango_device_server(self, removed_sens, added_sens):
-        removed_sensors = dict()
-        for sens_name in removed_sens:
-            sensor = yield self.katcp_inspecting_client.future_get_sensor(sens_name)
-            removed_sensors[sens_name] = sensor
+        """Mirror the removed and added KATCP sensors on the Tango device server
+
+        The descriptions of the added sensors are fetched concurrently, with at
+        most `max_sensor_fetches_in_flight` fetches in flight, and their
+        attributes are added to the device in batches of `attribute_batch_size`.
+
+        """
+        # Only the names of the removed sensors are needed
+        removed_sensors = dict.fromkeys(removed_sens)
         remove_tango_server_attribute_list(
-            self.tango_device_server, removed_sensors, self.untranslated_sensors
+            self.tango_device_server,
+            removed_sensors,
+            self.untranslated_sensors,
+            self.name_map,
         )
-
-        added_sensors = dict()
-        for sens_name in added_sens:
-            sensor = yield self.katcp_inspecting_client.future_get_sensor(sens_name)
-            sensor.attach(self.sensor_observer)
-            added_sensors[sens_name] = sensor
-        add_tango_server_attribute_list(
-            self.tango_device_server, added_sensors, self.untranslated_sensors
+        # Sensors left out of the name map were never translated, and their
+        # attribute names are those of other sensors
+        self.sensor_observer.discard(
+            [name for name in removed_sensors if name in self.name_map]
         )
-        self._setup_sensor_sampling()
+        self.name_map.update(added=sorted(added_sens), removed=removed_sensors)
+
+        added_sensor_names = []
+        for sens_name in sorted(added_sens):
+            if sens_name in self.name_map:
+                added_sensor_names.append(sens_name)
+            else:
+                # Its attribute name is taken by another sensor
+                self.untranslated_sensors.append(sens_name)
+        self.num_sensors_to_sync = len(added_sensor_names)
+        self.num_sensors_synced = 0
+        fetch_limit = tornado.locks.Semaphore(self.max_sensor_fetches_in_flight)
+
+        @tornado.gen.coroutine
+        def fetch_sensor(sensor_name):
+            with (yield fetch_limit.acquire()):
+                sensor = yield self.katcp_inspecting_client.future_get_sensor(sensor_name)
+            raise tornado.gen.Return(sensor)
+
+        # Start all the fetches, and translate them in batches as they complete
+        fetches = [fetch_sensor(sens_name) for sens_name in added_sensor_names]
+        batch_size = max(self.attribute_batch_size, 1)
+        for start in range(0, len(added_sensor_names), batch_size):
+            end = start + batch_size
+            batch = zip(added_sensor_names[start:end], fetches[start:end])
+            added_sensors = dict()
+            for sens_name, fetch in batch:
+                try:
+                    sensor = yield fetch
+                except Exception:
+                    sensor = None
+                    MODULE_LOGGER.exception("Error fetching sensor %s", sens_name)
+                if sensor is None:
+                    self.untranslated_sensors.append(sens_name)
+                    continue
+                sensor.attach(self.sensor_observer)
+                added_sensors[sens_name] = sensor
+            add_tango_server_attribute_list(
+                self.tango_device_server,
+                added_sensors,
+                self.untranslated_sensors,
+                self.name_map,
+            )
+            yield self._setup_sensor_sampling(added_sensors)
+            self.num_sensors_synced = min(start + batch_size, len(added_sensor_names))
+
+    @tornado.gen.coroutine
+    def _setup_sensor_sampling(self, sensor_names=None):
+        """Set the event sampling strategy for KATCP sensors
+
+        Uses bulk ?sensor-sampling requests if the KATCP server supports them,
+        otherwise pipelines a request per sensor with at most
+        `max_sampling_requests_in_flight` requests awaiting replies.
+
+        Parameters
+        ----------
+        sensor_names : iterable of str or None
+            Sensors to sample, all the sensors of the KATCP device if None.
+
+        """
+        client = self.katcp_inspecting_client
+        if sensor_names is None:
+            sensor_names = client.sensors
+        sensor_names = sorted(sensor_names)
+        protocol_flags = client.katcp_client.protocol_flags
+        if protocol_flags is not None and protocol_flags.bulk_set_sensor_sampling:
+            chunk_size = self.bulk_sampling_chunk_size
+            for start in range(0, len(sensor_names), chunk_size):
+                end = start + chunk_size
+                yield self._set_sensor_sampling(",".join(sensor_names[start:end]))
+        else:
+            in_flight = tornado.locks.Semaphore(self.max_sampling_requests_in_flight)
+
+            @tornado.gen.coroutine
+            def set_sensor_sampling(sensor_name):
+                with (yield in_flight.acquire()):
+                    yield self._set_sensor_sampling(sensor_name)
+
+            yield [set_sensor_sampling(sensor_name) for sensor_name in sensor_names]
 
     @tornado.gen.coroutine
-    def _setup_sensor_sampling(self):
-        for sensor_name in self.katcp_inspecting_client.sensors:
-            reply, informs = yield self.katcp_inspecting_client.simple_request(
-                "sensor-sampling", sensor_name, "event"
+    def _set_sensor_sampling(self, sensor_names):
+        reply, informs = yield self.katcp_inspecting_client.simple_request(
+            "sensor-sampling", sensor_names, "event"
+        )
+        if not reply.reply_ok():
+            MODULE_LOGGER.debug(
+                "Unexpected failure reply for {} sensor(s). \n"
+                " Informs: {} \n Reply: {}".format(sensor_names, informs, reply)
             )
-            if not reply.reply_ok():
-                MODULE_LOGGER.debug(
-                    "Unexpected failure reply for {} sensor. \n"
-                    + " Informs: {} \n Reply: {}".format(sensor_name, informs, reply)
-                )
 
     @classmethod
-    def from_katcp_address_tango_device(cls, katcp_server_address, tango_device_server):
+    def from_katcp_address_tango_device(
+        cls, katcp_server_address, tango_device_server, **kwargs
+    ):
         """Instatiate KatcpTango2DeviceProxy from network address
 
         Parameters
@@ -478,37 +836,139 @@ class KatcpTango2DeviceProxy(object):
         tango_device_server : tango.Device
             Tango device that has the results of the translated katcp proxy
 
+        Other keyword arguments are passed on to the constructor.
+
         """
         katcp_host, katcp_port = katcp_server_address
-        iolm = ioloop_manager.IOLoopManager()
-        iolm.setDaemon(True)
-        ioloop = iolm.get_ioloop()
-        iolm.start()
+        ioloop = get_shared_ioloop_manager().get_ioloop()
         katcp_inspecting_client = inspecting_client.InspectingClientAsync(
             katcp_host, katcp_port, ioloop=ioloop
         )
-        return cls(katcp_inspecting_client, tango_device_server, ioloop)
+        return cls(katcp_inspecting_client, tango_device_server, ioloop, **kwargs)
+
+
+class AttributeEventPusher(object):
+    """Push change and archive events for translated attributes
+
+    KATCP sensor updates arrive on the KATCP ioloop, which should not block on
+    the Tango device monitor. Updates are queued instead, and pushed as events
+    by a dedicated thread holding the device monitor.
+
+    Parameters
+    ----------
+    tango_device_server : tango.Device
+        Tango device with the attributes translated from KATCP sensors.
+    max_batch_size : int
+        Most queued updates pushed for each acquisition of the device monitor.
+
+    """
+
+    _STOP = object()
+
+    def __init__(self, tango_device_server, max_batch_size=1000):
+        self.tango_device_server = tango_device_server
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="AttributeEventPusher-{}".format(id(self))
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop pushing events once the updates queued so far have been pushed
+
+        Does not wait for the thread to finish since it may need the device monitor
+        held by the caller.
+
+        """
+        self._queue.put(self._STOP)
+
+    def push(self, attr_name, value, timestamp, quality):
+        """Queue change and archive events for an attribute, thread safe"""
+        self._queue.put((attr_name, value, timestamp, quality))
+
+    def _run(self):
+        with tango.EnsureOmniThread():
+            stopping = False
+            while not stopping:
+                updates = [self._queue.get()]
+                while len(updates) < self.max_batch_size:
+                    try:
+                        updates.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if self._STOP in updates:
+                    stopping = True
+                    updates = updates[: updates.index(self._STOP)]
+                self._push_events(updates)
+
+    def _push_events(self, updates):
+        device = self.tango_device_server
+        with tango.AutoTangoMonitor(device):
+            for attr_name, value, timestamp, quality in updates:
+                try:
+                    device.push_change_event(attr_name, value, timestamp, quality)
+                    device.push_archive_event(attr_name, value, timestamp, quality)
+                except DevFailed:
+                    # The attribute may have been removed since the update
+                    MODULE_LOGGER.debug(
+                        "Could not push events for attribute %s",
+                        attr_name,
+                        exc_info=True,
+                    )
+
+
+AttributeReading = namedtuple("AttributeReading", ("value", "timestamp", "quality"))
 
 
 class SensorObserver(object):
     """The observer class attached to KATCP sensor to recieve updates after the
-    sensor strategy is set."""
+    sensor strategy is set.
+
+    The latest reading of each attribute is kept in an immutable
+    :class:`AttributeReading` record that is replaced on every sensor update, so
+    that a concurrent :meth:`TangoDeviceServer.read_attr` sees either the previous
+    or the new reading, never a mix of the two.
 
-    def __init__(self):
-        self.updates = dict()
+    Parameters
+    ----------
+    event_pusher : :class:`AttributeEventPusher` or None
+        Pushes change and archive events for the updated attributes if given.
+    name_map : :class:`SensorAttributeNameMap` or None
+        Names the attributes of the observed sensors.
+
+    """
+
+    def __init__(self, event_pusher=None, name_map=None):
+        # Tango attribute names as keys, AttributeReading as values
+        self.readings = dict()
+        self.event_pusher = event_pusher
+        if name_map is None:
+            name_map = SensorAttributeNameMap()
+        self.name_map = name_map
 
     def update(self, sensor, reading):
-        read_dict = {
-            "timestamp": reading.timestamp,
-            "status": reading.status,
-            "value": reading.value,
-        }
-        if sensor.stype in ["address"]:
+        attr_name = self.name_map.attribute_name(sensor.name)
+        value = reading.value
+        if sensor.stype == "address":
             # Address sensor type contains a Tuple contaning (host, port) and
             # mapped to tango DevString type i.e "host:port"
-            read_dict["value"] = ":".join(str(s) for s in reading.value)
-        self.updates[katcpname2tangoname(sensor.name)] = read_dict
-        MODULE_LOGGER.debug("Received {!r} for attr {!r}".format(sensor, reading))
+            value = ":".join(str(s) for s in value)
+        timestamp = reading.timestamp
+        quality = KATCP_SENSOR_STATUS_TO_TANGO_ATTRIBUTE_QUALITY[reading.status]
+        self.readings[attr_name] = AttributeReading(value, timestamp, quality)
+        if self.event_pusher is not None:
+            self.event_pusher.push(attr_name, value, timestamp, quality)
+        MODULE_LOGGER.debug("Received %r for attr %r", sensor, reading)
+
+    def discard(self, sensor_names):
+        """Forget the readings of removed KATCP sensors"""
+        for sensor_name in sensor_names:
+            self.readings.pop(self.name_map.attribute_name(sensor_name), None)
 
 
 def get_katcp_address(server_name):
@@ -538,13 +998,47 @@ def get_katcp_address(server_name):
     return katcp_address
 
 
-def get_katcp_request_data(katcp_connect_timeout=60.0):
+def get_katcp_addresses(server_name):
+    """Gets the KATCP addresses of all the devices of a Tango device server from
+    the tango-db device properties
+
+    Parameters
+    ----------
+    server_name : str
+        Tango device server name in tango format
+        e.g. 'tango_katcp_proxy/test'
+
+    Returns
+    -------
+    katcp_addresses : dict
+        Tango device names as keys, KATCP addresses as values
+        e.g. {'katcp/basic/1': 'localhost:50000'}
+
+    """
+    db = Database()
+    server_class = db.get_server_class_list(server_name).value_string[0]
+    device_names = db.get_device_name(server_name, server_class).value_string
+    katcp_addresses = {}
+    for device_name in device_names:
+        katcp_address = db.get_device_property(device_name, "katcp_address")
+        katcp_addresses[device_name] = katcp_address["katcp_address"][0]
+    return katcp_addresses
+
+
+def get_katcp_request_data(
+    katcp_connect_timeout=60.0, katcp_address=None, request_cache=None
+):
     """Inspects the KATCP device for requests using a temporary BlockingClient.
 
     Parameters
     ----------
     katcp_connect_timeout: float
         Client connection timeout to a KATCP device
+    katcp_address : str or None
+        Address of the KATCP device as <host>:<port>, looked up in the Tango
+        database for this server if None.
+    request_cache : :class:`KatcpRequestCache` or None
+        The inspected requests are cached for the address if given.
 
 
     Returns
@@ -554,37 +1048,181 @@ def get_katcp_request_data(katcp_connect_timeout=60.0):
         are keys = request_name and values = request_documentation
 
     """
-    server_name = helper_module.get_server_name()
-    katcp_address = get_katcp_address(server_name)
+    if katcp_address is None:
+        server_name = helper_module.get_server_name()
+        katcp_address = get_katcp_address(server_name)
+    client = _start_katcp_client(katcp_address, katcp_connect_timeout)
+    try:
+        version_list = _request_katcp_version_list(client)
+        req_dict = _request_katcp_help(client)
+    finally:
+        client.stop()
+        client.join()
+    if request_cache is not None:
+        request_cache.save(katcp_address, version_list, req_dict)
+    return req_dict
+
+
+def refresh_katcp_request_cache(katcp_address, request_cache, katcp_connect_timeout=60.0):
+    """Update the cached requests of a KATCP device if its ?version-list changed
+
+    Requests added to the KATCP device are only translated into Tango commands
+    once the Tango device server is restarted.
+
+    Returns
+    -------
+    changed : bool
+        True if the cached requests were out of date.
+
+    """
+    cached = request_cache.load(katcp_address)
+    client = _start_katcp_client(katcp_address, katcp_connect_timeout)
+    try:
+        version_list = _request_katcp_version_list(client)
+        if cached is not None and cached[0] == version_list:
+            return False
+        req_dict = _request_katcp_help(client)
+    finally:
+        client.stop()
+        client.join()
+    request_cache.save(katcp_address, version_list, req_dict)
+    if cached is not None and cached[1] != req_dict:
+        MODULE_LOGGER.warning(
+            "The requests of KATCP device %s changed, restart the Tango device "
+            "server to translate them",
+            katcp_address,
+        )
+    return True
+
+
+def _refresh_katcp_request_cache_target(katcp_address, request_cache):
+    try:
+        refresh_katcp_request_cache(katcp_address, request_cache)
+    except Exception:
+        MODULE_LOGGER.exception(
+            "Error refreshing the cached requests of KATCP device %s", katcp_address
+        )
+
+
+def _start_katcp_client(katcp_address, katcp_connect_timeout):
     katcp_host, katcp_port = katcp_address.split(":")
     katcp_port = int(katcp_port)
     client = BlockingClient(katcp_host, katcp_port)
+    client.start()
     try:
-        client.start()
         client.wait_connected(timeout=katcp_connect_timeout)
-        help_m = Message.request("help")
-        reply, informs = client.blocking_request(help_m)
-    finally:
+    except Exception:
         client.stop()
         client.join()
+        raise
+    return client
+
+
+def _request_katcp_version_list(client):
+    reply, informs = client.blocking_request(Message.request("version-list"))
+    return [[ensure_native_str(arg) for arg in inform.arguments] for inform in informs]
+
+
+def _request_katcp_help(client):
+    help_m = Message.request("help")
+    reply, informs = client.blocking_request(help_m)
     req_list = [req.arguments for req in informs]
     req_dict = dict()
     for req in req_list:
-        req_dict[req[0]] = req[1]
+        req_dict[ensure_native_str(req[0])] = ensure_native_str(req[1])
     return req_dict
 
 
-def get_tango_device_server():
+def _get_katcp_requests(katcp_address, request_cache):
+    cached = None
+    if request_cache is not None:
+        cached = request_cache.load(katcp_address)
+    if cached is None:
+        return get_katcp_request_data(
+            katcp_address=katcp_address, request_cache=request_cache
+        )
+    refresh_thread = threading.Thread(
+        target=_refresh_katcp_request_cache_target,
+        args=(katcp_address, request_cache),
+        name="KatcpRequestCacheRefresh",
+    )
+    refresh_thread.daemon = True
+    refresh_thread.start()
+    return cached[1]
+
+
+def _merge_katcp_requests(requests_by_address):
+    """Merge the requests of several KATCP devices for a single device class
+
+    Parameters
+    ----------
+    requests_by_address : dict
+        KATCP addresses as keys, dicts of request names and docs as values.
+
+    Returns
+    -------
+    requests_dict : dict
+        Request names as keys, request docs as values.
+
+    Raises
+    ------
+    ValueError
+        If KATCP devices have requests with the same name but different docs. The
+        commands of a device class have a single signature and doc, so that
+        these devices cannot share a device server.
+
+    """
+    requests_dict = dict()
+    request_addresses = dict()
+    for katcp_address, katcp_requests in requests_by_address.items():
+        for req_name, req_doc in katcp_requests.items():
+            if req_name not in requests_dict:
+                requests_dict[req_name] = req_doc
+                request_addresses[req_name] = katcp_address
+            elif requests_dict[req_name] != req_doc:
+                raise ValueError(
+                    "KATCP devices {} and {} have different requests named {!r}, "
+                    "translate them in separate device servers".format(
+                        request_addresses[req_name], katcp_address, req_name
+                    )
+                )
+    return requests_dict
+
+
+def get_tango_device_server(request_cache=None, katcp_addresses=None):
     """Declares a tango device class that inherits the Device class and then
     adds tango commands.
 
+    Parameters
+    ----------
+    request_cache : :class:`KatcpRequestCache` or None
+        If the requests of the KATCP device are cached, the commands are added
+        without connecting to the KATCP device, and the cache is refreshed in the
+        background.
+    katcp_addresses : list of str or None
+        Addresses of the KATCP devices translated by the devices of the class.
+        The class has a command for each request of any of the KATCP devices,
+        which fails on devices of which the KATCP device lacks the request. If
+        None, the address of the first device of this server is looked up in the
+        Tango database.
+
     Returns
     -------
     TangoDeviceServer : tango.Device
         Tango device that has the results of the translated KATCP server
 
     """
-    requests_dict = get_katcp_request_data()
+    if katcp_addresses is None:
+        server_name = helper_module.get_server_name()
+        katcp_addresses = [get_katcp_address(server_name)]
+    max_workers = max(1, min(len(katcp_addresses), MAX_CONCURRENT_REQUEST_INSPECTIONS))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        all_requests = executor.map(
+            lambda katcp_address: _get_katcp_requests(katcp_address, request_cache),
+            katcp_addresses,
+        )
+        requests_by_address = OrderedDict(zip(katcp_addresses, all_requests))
+    requests_dict = _merge_katcp_requests(requests_by_address)
 
     # Declare a Tango Device class for specifically adding commands prior
     # running the device server
@@ -599,13 +1237,23 @@ def get_tango_device_server():
     # The device __metaclass__ must be in the final class defination and cannot
     # come from the super class. i.e. The double-definitation
     class TangoDeviceServer(TangoDeviceServerBase, TangoDeviceServerCommands):
-        pass
+        katcp_request_names = {
+            katcp_address: frozenset(katcp_requests)
+            for katcp_address, katcp_requests in requests_by_address.items()
+        }
 
     return TangoDeviceServer
 
 
 def main():
-    TangoDeviceServer = get_tango_device_server()
+    request_cache_dir = os.environ.get(REQUEST_CACHE_DIR_ENV)
+    request_cache = None
+    if request_cache_dir:
+        request_cache = KatcpRequestCache(request_cache_dir, logger=MODULE_LOGGER)
+    # Every device of the server translates its own KATCP device
+    server_name = helper_module.get_server_name()
+    katcp_addresses = sorted(set(get_katcp_addresses(server_name).values()))
+    TangoDeviceServer = get_tango_device_server(request_cache, katcp_addresses)
     server_run([TangoDeviceServer])
 
 
@@ -0,0 +1,89 @@
+# test_inspection_cache.py
+# -*- coding: utf8 -*-
+# vim:fileencoding=utf8 ai ts=4 sts=4 et sw=4
+# Copyright 2016 National Research Foundation (South African Radio Astronomy Observatory)
+# BSD license - see LICENSE for details
+
+from __future__ import absolute_import, division, print_function
+from future import standard_library
+
+standard_library.install_aliases()
+
+import logging
+import os
+import shutil
+import tempfile
+
+from mkat_tango.translators import inspection_cache, tango_inspecting_client
+from mkat_tango.translators.tests.test_tango_inspecting_client import TangoSetUpClass
+
+LOGGER = logging.getLogger(__name__)
+
+
+class test_InspectionCache(TangoSetUpClass):
+    def setUp(self):
+        super(test_InspectionCache, self).setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.cache = inspection_cache.InspectionCache(
+            os.path.join(self.cache_dir, "cache"), logger=LOGGER
+        )
+        self.device_name = self.tango_dp.name()
+        self.attributes = self.DUT.inspect_attributes()
+        self.commands = self.DUT.inspect_commands()
+        self.fingerprint = inspection_cache.interface_fingerprint(
+            self.tango_dp.get_attribute_list(), self.tango_dp.get_command_list()
+        )
+
+    def save_cache(self):
+        self.cache.save(
+            self.device_name, self.fingerprint, self.attributes, self.commands
+        )
+
+    def test_save_load(self):
+        self.assertIsNone(self.cache.load(self.device_name, self.fingerprint))
+        self.save_cache()
+        attributes, commands = self.cache.load(self.device_name, self.fingerprint)
+
+        self.assertEqual(sorted(attributes), sorted(self.attributes))
+        self.assertEqual(sorted(commands), sorted(self.commands))
+        # The restored descriptions are indistinguishable for change detection
+        for name, attribute_config in self.attributes.items():
+            self.assertEqual(
+                tango_inspecting_client.attribute_config_fingerprint(attributes[name]),
+                tango_inspecting_client.attribute_config_fingerprint(attribute_config),
+            )
+            self.assertEqual(
+                attributes[name].events.per_event.period,
+                attribute_config.events.per_event.period,
+            )
+        for name, command_info in self.commands.items():
+            self.assertEqual(
+                tango_inspecting_client.command_info_fingerprint(commands[name]),
+                tango_inspecting_client.command_info_fingerprint(command_info),
+            )
+
+    def test_fingerprint_mismatch(self):
+        self.save_cache()
+        fingerprint = inspection_cache.interface_fingerprint(
+            list(self.attributes) + ["NewAttribute"], self.commands
+        )
+        self.assertNotEqual(fingerprint, self.fingerprint)
+        self.assertIsNone(self.cache.load(self.device_name, fingerprint))
+
+    def test_corrupt_cache_file(self):
+        self.save_cache()
+        with open(self.cache.path(self.device_name), "w") as cache_file:
+            cache_file.write("{")
+        self.assertIsNone(self.cache.load(self.device_name, self.fingerprint))
+
+    def test_reinspect_cached_interface(self):
+        self.save_cache()
+        attributes, commands = self.cache.load(self.device_name, self.fingerprint)
+        del attributes["ScalarDevDouble"]
+        self.DUT.load_interface(attributes, commands)
+        delta = self.DUT.reinspect()
+        self.assertEqual(delta.added_attributes, ["ScalarDevDouble"])
+        self.assertEqual(delta.changed_attributes, [])
+        self.assertEqual(delta.removed_attributes, [])
+        self.assertEqual(delta.changed_commands, [])
@@ -9,7 +9,9 @@ from future import standard_library
 
 standard_library.install_aliases()
 
+import base64
 import future
+import json
 import logging
 import mock
 import os
@@ -18,11 +20,13 @@ import socket
 import subprocess
 import tempfile
 import textwrap
+import threading
 import time
 import unittest
 
 from builtins import object, range
 
+import numpy as np
 import pkg_resources
 
 import tango.server
@@ -32,6 +36,7 @@ import tornado.gen
 from tango import (
     Attr,
     AttrDataFormat,
+    AttrQuality,
     DevFailed,
     DeviceProxy,
     DevLong,
@@ -48,6 +53,7 @@ from katcp.testutils import (
 )
 from mkat_tango import testutils
 from mkat_tango.translators import katcp_tango_proxy, utilities
+from mkat_tango.translators.inspection_cache import InfoRecord
 from mkat_tango.translators.tests.test_tango_inspecting_client import (
     ClassCleanupUnittestMixin,
     TangoTestDevice,
@@ -99,6 +105,8 @@ SPECTRUM_ATTR = {
 
 class TangoDevice2KatcpProxy_BaseMixin(ClassCleanupUnittestMixin):
     DUT = None
+    # Extra keyword arguments for TangoDevice2KatcpProxy.from_addresses()
+    translator_kwargs = {}
 
     @classmethod
     def setUpClassWithCleanup(cls):
@@ -116,7 +124,7 @@ class TangoDevice2KatcpProxy_BaseMixin(ClassCleanupUnittestMixin):
     def setUp(self):
         super(TangoDevice2KatcpProxy_BaseMixin, self).setUp()
         self.DUT = katcp_tango_proxy.TangoDevice2KatcpProxy.from_addresses(
-            ("", 0), self.tango_device_address, polling=True
+            ("", 0), self.tango_device_address, polling=True, **self.translator_kwargs
         )
         if hasattr(self, "io_loop"):
             self.DUT.set_ioloop(self.io_loop)
@@ -418,7 +426,9 @@ class test_TangoDevice2KatcpProxy(TangoDevice2KatcpProxy_BaseMixin, unittest.Tes
 
             # Check that attribute sampling was recalled for the new attribute
             sec.assert_called_with(
-                ["ScalarDevEncoded", "test_attr"], server_polling_fallback=True
+                ["test_attr"],
+                server_polling_fallback=True,
+                client_polling_fallback=False,
             )
 
             # Remove the attribute.
@@ -426,6 +436,405 @@ class test_TangoDevice2KatcpProxy(TangoDevice2KatcpProxy_BaseMixin, unittest.Tes
             time.sleep(0.5)
 
 
+class test_TangoDevice2KatcpProxyUpdateQueue(
+    TangoDevice2KatcpProxy_BaseMixin, unittest.TestCase
+):
+    translator_kwargs = dict(update_queue_size=100, coalesce_updates=True)
+
+    def test_queued_sensor_updates(self):
+        observer = SensorObserver()
+        sensor = self.katcp_server.get_sensor("ScalarDevEnum")
+        sensor.attach(observer)
+        self.addCleanup(sensor.detach, observer)
+        self.tango_device_proxy.ScalarDevEnum = 2
+        time.sleep(1)
+        self.assertEqual(sensor.value(), "RESERVE")
+        self.assertGreaterEqual(len(observer.updates), 1)
+
+        # The queue statistics are reported as translator sensors, which
+        # are not removed on interface changes
+        self.assertEqual(
+            self.katcp_server.get_sensor("translator.update-queue-dropped").value(), 0
+        )
+        self.assertGreater(
+            self.katcp_server.get_sensor("translator.update-latency").value(), 0
+        )
+        self.DUT.update_katcp_server_sensor_list(
+            self.DUT.inspecting_client.device_attributes
+        )
+        self.assertIn(
+            "translator.update-queue-depth", self.katcp_server.get_sensor_list()
+        )
+
+
+class test_SensorUpdateQueue(unittest.TestCase):
+    def drained_updates(self, queue):
+        handler = queue.handler = mock.Mock()
+        queue.drain()
+        return [(call[0][0], call[0][3]) for call in handler.call_args_list]
+
+    def put(self, queue, name, value):
+        queue.put(name, 1.0, 1.0, value, AttrQuality.ATTR_VALID, "change")
+
+    def test_drop_oldest(self):
+        queue = katcp_tango_proxy.SensorUpdateQueue(None, 2)
+        for name, value in [("a", 1), ("b", 1), ("a", 2)]:
+            self.put(queue, name, value)
+        self.assertEqual((queue.dropped, queue.coalesced), (1, 0))
+        self.assertEqual(self.drained_updates(queue), [("b", 1), ("a", 2)])
+
+    def test_coalesce(self):
+        queue = katcp_tango_proxy.SensorUpdateQueue(None, 3, coalesce=True)
+        for name, value in [("a", 1), ("a", 2), ("b", 1), ("a", 3), ("c", 1), ("b", 2)]:
+            self.put(queue, name, value)
+        # The queue only fills up after ("b", 1). Then ("a", 3) replaces the
+        # latest queued update of "a", ("c", 1) drops the oldest update, and
+        # ("b", 2) replaces the queued update of "b".
+        self.assertEqual((queue.dropped, queue.coalesced), (1, 2))
+        self.assertEqual(self.drained_updates(queue), [("a", 3), ("b", 2), ("c", 1)])
+        # Updates are not coalesced with drained ones
+        self.put(queue, "a", 4)
+        self.assertEqual(self.drained_updates(queue), [("a", 4)])
+
+
+class test_AttributeSamplingSetupWorker(unittest.TestCase):
+    def test_pending_attributes_merged(self):
+        inspecting_client = mock.Mock()
+        inspecting_client.device_attributes = {
+            "attr{}".format(i): mock.Mock() for i in range(10)
+        }
+        first_setup_started = threading.Event()
+        release_first_setup = threading.Event()
+        setup_chunks = []
+
+        def setup_attribute_sampling(attributes, **kwargs):
+            setup_chunks.append(list(attributes))
+            first_setup_started.set()
+            release_first_setup.wait(5)
+
+        inspecting_client.setup_attribute_sampling.side_effect = setup_attribute_sampling
+        DUT = katcp_tango_proxy.TangoDevice2KatcpProxy(
+            mock.Mock(), inspecting_client, sampling_setup_chunk_size=2
+        )
+        DUT._setup_attribute_sampling_via_thread(["attr0"])
+        self.assertTrue(first_setup_started.wait(5))
+        # Interface changes while the first setup is still in progress
+        DUT._setup_attribute_sampling_via_thread(["attr1", "attr2"])
+        DUT._setup_attribute_sampling_via_thread(["attr3", "removed_attr"])
+        self.assertFalse(DUT._attribute_sampling_setup_allowed.is_set())
+        release_first_setup.set()
+        self.assertTrue(DUT._attribute_sampling_setup_allowed.wait(5))
+        # The chunks were set up in parallel by the executor
+        executor = DUT._sampling_setup_executor
+        self.assertIsNotNone(executor)
+        DUT.stop()
+
+        self.assertEqual(setup_chunks[0], ["attr0"])
+        self.assertEqual(sorted(setup_chunks[1:]), [["attr1", "attr2"], ["attr3"]])
+        # Its worker threads are shut down with the translator
+        with self.assertRaises(RuntimeError):
+            executor.submit(lambda: None)
+
+
+class test_ExponentialBackoff(unittest.TestCase):
+    def test_delays(self):
+        delays = katcp_tango_proxy.exponential_backoff(1.0, 10.0, jitter=0.5)
+        upper_limits = [1.0, 2.0, 4.0, 8.0, 10.0, 10.0]
+        for upper_limit in upper_limits:
+            delay = next(delays)
+            self.assertLessEqual(delay, upper_limit)
+            self.assertGreaterEqual(delay, 0.5 * upper_limit)
+
+
+class test_ConnectionSupervisor(unittest.TestCase):
+    def setUp(self):
+        self.device_running = threading.Event()
+        self.device_running.set()
+        patcher = mock.patch.object(
+            katcp_tango_proxy,
+            "is_tango_device_running",
+            side_effect=lambda *args, **kwargs: self.device_running.is_set(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.inspecting_client = mock.Mock()
+        self.inspecting_client.tango_dp.name.return_value = "test/supervised/1"
+        self.inspecting_client.stale_attributes = set()
+        self.inspecting_client.client_polled_attributes = set(["polled_attr"])
+        self.DUT = katcp_tango_proxy.TangoDevice2KatcpProxy(
+            katcp_tango_proxy.TangoProxyDeviceServer("127.0.0.1", 0),
+            self.inspecting_client,
+            connection_check_period=0.01,
+            reconnect_delay=0.01,
+            max_reconnect_delay=0.01,
+        )
+        for name in ["lost_attr", "subscribed_attr", "polled_attr"]:
+            sensor = Sensor.float(name)
+            sensor.set_value(1.0, Sensor.NOMINAL)
+            self.DUT.katcp_server.add_sensor(sensor)
+            self.DUT._attribute_sensors[name] = katcp_tango_proxy.AttributeSensors(
+                AttrDataFormat.SCALAR, [sensor], None, []
+            )
+        for method_name in [
+            "_setup_device_interface",
+            "_reinspect_target",
+            "_setup_attribute_sampling_via_thread",
+        ]:
+            patcher = mock.patch.object(self.DUT, method_name, return_value=None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        start_thread_with_cleanup(self, self.DUT, start_timeout=1)
+        self.client = BlockingTestClient(self, *self.DUT.katcp_server.bind_address)
+        start_thread_with_cleanup(self, self.client, start_timeout=1)
+        self.client.wait_protocol(timeout=1)
+
+    def wait_for(self, condition, timeout=5):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(condition())
+
+    def sensor_statuses(self):
+        return set(sensor.status() for sensor in self.DUT.katcp_server.get_sensors())
+
+    def test_device_outage(self):
+        self.device_running.clear()
+        self.wait_for(lambda: self.sensor_statuses() == set([Sensor.UNKNOWN]))
+        # The KATCP server keeps serving while the device is down
+        reply, informs = self.client.blocking_request(Message.request("watchdog"))
+        self.assertTrue(reply.reply_ok())
+        self.client.assert_request_succeeds("sensor-value", "subscribed_attr")
+        # Only the subscription that delivered an error event is lost
+        self.inspecting_client.stale_attributes = set(["lost_attr", "polled_attr"])
+        self.device_running.set()
+        setup_sampling = self.DUT._setup_attribute_sampling_via_thread
+        self.wait_for(lambda: setup_sampling.called)
+        setup_sampling.assert_called_once_with(set(["lost_attr"]))
+        self.inspecting_client.unsubscribe_attributes.assert_called_once_with(
+            set(["lost_attr"])
+        )
+        self.DUT._reinspect_target.assert_called_once_with()
+
+    def test_short_outage_keeps_subscriptions(self):
+        self.device_running.clear()
+        self.wait_for(lambda: self.sensor_statuses() == set([Sensor.UNKNOWN]))
+        self.device_running.set()
+        self.wait_for(lambda: self.DUT._reinspect_target.called)
+        self.assertFalse(self.DUT._setup_attribute_sampling_via_thread.called)
+        self.assertFalse(self.inspecting_client.unsubscribe_attributes.called)
+
+    def test_serves_during_startup_on_ioloop(self):
+        server = katcp_tango_proxy.TangoProxyDeviceServer("127.0.0.1", 0)
+        start_thread_with_cleanup(self, server, start_timeout=1)
+        DUT = katcp_tango_proxy.TangoDevice2KatcpProxy(
+            server, self.inspecting_client, manage_server=False
+        )
+        setup_allowed = threading.Event()
+        self.addCleanup(setup_allowed.set)
+        patcher = mock.patch.object(
+            DUT, "_setup_device_interface", side_effect=lambda: setup_allowed.wait()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        server.ioloop.add_callback(DUT.start)
+        self.addCleanup(DUT.stop)
+        self.wait_for(lambda: DUT._setup_device_interface.called)
+        # The device is inspected in the executor, not on the IOLoop
+        client = BlockingTestClient(self, *server.bind_address)
+        start_thread_with_cleanup(self, client, start_timeout=1)
+        client.wait_protocol(timeout=1)
+        reply, informs = client.blocking_request(Message.request("watchdog"), timeout=1)
+        self.assertTrue(reply.reply_ok())
+        setup_allowed.set()
+
+    def test_stop_shuts_down_executor(self):
+        executor = self.DUT._tango_executor
+        self.DUT.stop()
+        self.assertIsNone(self.DUT._tango_executor)
+        with self.assertRaises(RuntimeError):
+            executor.submit(lambda: None)
+
+
+class test_SensorTranslationCaches(unittest.TestCase):
+    def attribute_config(self, **fields):
+        config = dict(
+            name="Bandpass",
+            data_type=tango.CmdArgType.DevDouble,
+            data_format=AttrDataFormat.SPECTRUM,
+            max_dim_x=4,
+            description="Bandpass",
+            unit="dB",
+            min_value="-100",
+            max_value="Not specified",
+            enum_labels=[],
+        )
+        config.update(fields)
+        return InfoRecord(**config)
+
+    def test_spectrum_sensors_from_template(self):
+        sensors = katcp_tango_proxy.tango_attr_descr2katcp_sensors(
+            self.attribute_config(), name_prefix="dig"
+        )
+        self.assertEqual(
+            [sensor.name for sensor in sensors],
+            ["dig.Bandpass.0", "dig.Bandpass.1", "dig.Bandpass.2", "dig.Bandpass.3"],
+        )
+        for sensor in sensors:
+            self.assertEqual(sensor.params[0], -100.0)
+            self.assertEqual(sensor.units, "dB")
+
+    def test_template_cached_by_config(self):
+        template = katcp_tango_proxy.attribute_sensor_template(self.attribute_config())
+        self.assertIs(
+            katcp_tango_proxy.attribute_sensor_template(self.attribute_config()),
+            template,
+        )
+        changed_template = katcp_tango_proxy.attribute_sensor_template(
+            self.attribute_config(min_value="-50")
+        )
+        self.assertEqual(changed_template.params[0], -50.0)
+
+    def test_kattype_objects(self):
+        kattype = katcp_tango_proxy.tango_type2kattype_object(
+            tango.CmdArgType.DevVarLongArray
+        )
+        other_kattype = katcp_tango_proxy.tango_type2kattype_object(
+            tango.CmdArgType.DevVarLongArray
+        )
+        self.assertIsNot(kattype, other_kattype)
+        self.assertTrue(kattype._multiple)
+        self.assertEqual(
+            (kattype._min, kattype._max), (other_kattype._min, other_kattype._max)
+        )
+        self.assertIsNone(katcp_tango_proxy.tango_type2kattype_object(DevVoid))
+
+
+class test_SpectrumTranslationModes(unittest.TestCase):
+    def attribute_config(self, **fields):
+        config = dict(
+            name="Bandpass",
+            data_type=tango.CmdArgType.DevDouble,
+            data_format=AttrDataFormat.SPECTRUM,
+            max_dim_x=4,
+            description="Bandpass",
+            unit="dB",
+            min_value="Not specified",
+            max_value="Not specified",
+            enum_labels=[],
+        )
+        config.update(fields)
+        return InfoRecord(**config)
+
+    def test_single_sensor_spectrum(self):
+        config = self.attribute_config()
+        for spectrum_mode in ("string", "binary"):
+            sensors = katcp_tango_proxy.tango_attr_descr2katcp_sensors(
+                config, spectrum_mode=spectrum_mode
+            )
+            self.assertEqual([sensor.name for sensor in sensors], ["Bandpass"])
+            self.assertEqual(sensors[0].type, "string")
+        with self.assertRaises(ValueError):
+            katcp_tango_proxy.tango_attr_descr2katcp_sensors(
+                config, spectrum_mode="unknown"
+            )
+
+    def test_spectrum_encoders(self):
+        value = np.array([1.5, -2.0, 3.25])
+        config = self.attribute_config()
+        self.assertIsNone(katcp_tango_proxy.spectrum_encoder(config, "elements"))
+        encode = katcp_tango_proxy.spectrum_encoder(config, "string")
+        self.assertEqual(json.loads(encode(value)), [1.5, -2.0, 3.25])
+        encode = katcp_tango_proxy.spectrum_encoder(config, "binary")
+        decoded = np.frombuffer(base64.b64decode(encode(value)), dtype="<f8")
+        np.testing.assert_array_equal(decoded, value)
+        # Strings have no binary encoding
+        config = self.attribute_config(data_type=tango.CmdArgType.DevString)
+        encode = katcp_tango_proxy.spectrum_encoder(config, "binary")
+        self.assertEqual(json.loads(encode(("a", "b"))), ["a", "b"])
+
+    def test_summary_sensor_names(self):
+        self.assertEqual(
+            katcp_tango_proxy.attribute_sensor_names(
+                self.attribute_config(),
+                name_prefix="dig",
+                spectrum_mode="string",
+                spectrum_summary=True,
+            ),
+            ["dig.Bandpass", "dig.Bandpass.min", "dig.Bandpass.max", "dig.Bandpass.mean"],
+        )
+        config = self.attribute_config(data_type=tango.CmdArgType.DevString)
+        self.assertEqual(
+            katcp_tango_proxy.tango_attr_descr2katcp_summary_sensors(config), []
+        )
+
+    def test_sensor_updates(self):
+        katcp_server = mock.Mock()
+        katcp_server.get_sensor_list.return_value = []
+        DUT = katcp_tango_proxy.TangoDevice2KatcpProxy(
+            katcp_server,
+            mock.Mock(),
+            spectrum_modes={"bandpass": "binary"},
+            spectrum_summary=True,
+        )
+        DUT._setup_new_attributes = mock.Mock()
+        DUT.update_katcp_server_sensor_list(
+            {
+                "Bandpass": self.attribute_config(),
+                "Gains": self.attribute_config(name="Gains", max_dim_x=2),
+            }
+        )
+        added_sensors = {
+            call[0][0].name: call[0][0]
+            for call in katcp_server.add_sensor.call_args_list
+        }
+        self.assertEqual(
+            sorted(added_sensors),
+            [
+                "Bandpass",
+                "Bandpass.max",
+                "Bandpass.mean",
+                "Bandpass.min",
+                "Gains.0",
+                "Gains.1",
+                "Gains.max",
+                "Gains.mean",
+                "Gains.min",
+            ],
+        )
+
+        value = np.array([1.0, 2.0, 6.0, 3.0])
+        DUT._update_sensor_values(
+            "Bandpass", time.time(), 1234.0, value, AttrQuality.ATTR_WARNING, "change"
+        )
+        bandpass = added_sensors["Bandpass"]
+        self.assertEqual(bandpass.status(), Sensor.WARN)
+        self.assertEqual(
+            base64.b64decode(bandpass.value()), value.astype("<f8").tobytes()
+        )
+        self.assertEqual(added_sensors["Bandpass.min"].value(), 1.0)
+        self.assertEqual(added_sensors["Bandpass.max"].value(), 6.0)
+        self.assertEqual(added_sensors["Bandpass.mean"].value(), 3.0)
+
+        # Only the sensors of the changed attribute are replaced
+        katcp_server.reset_mock()
+        katcp_server.get_sensor_list.return_value = list(added_sensors)
+        DUT.update_katcp_server_sensor_list(
+            {
+                "Bandpass": self.attribute_config(),
+                "Gains": self.attribute_config(name="Gains", max_dim_x=3),
+            }
+        )
+        self.assertEqual(
+            sorted(call[0][0] for call in katcp_server.remove_sensor.call_args_list),
+            ["Gains.0", "Gains.1", "Gains.max", "Gains.mean", "Gains.min"],
+        )
+        self.assertEqual(
+            sorted(call[0][0].name for call in katcp_server.add_sensor.call_args_list),
+            ["Gains.0", "Gains.1", "Gains.2", "Gains.max", "Gains.mean", "Gains.min"],
+        )
+        DUT._setup_new_attributes.assert_called_with(["Gains"])
+
+
 class test_TangoDevice2KatcpProxyAsync(
     TangoDevice2KatcpProxy_BaseMixin, tornado.testing.AsyncTestCase
 ):
@@ -757,6 +1166,127 @@ class test_TangoDevice2KatcpProxyMultipleDevices(
         self.assertIn(expected_doc_out, request.__doc__)
 
 
+class test_TangoDevices2KatcpProxySharedServer(
+    ClassCleanupUnittestMixin, unittest.TestCase
+):
+    @classmethod
+    def setUpClassWithCleanup(cls):
+        cls.devices_info = (
+            {"class": SimpleDevice1, "devices": [{"name": "test/simple/1"}]},
+            {"class": SimpleDevice2, "devices": [{"name": "test/simple/2"}]},
+        )
+        cls.tango_context = MultiDeviceTestContext(cls.devices_info)
+        start_thread_with_cleanup(cls, cls.tango_context)
+
+    def setUp(self):
+        super(test_TangoDevices2KatcpProxySharedServer, self).setUp()
+        devices = [
+            katcp_tango_proxy.TranslatedDevice(
+                self.tango_context.get_device_access(device_name), None, None
+            )
+            for device_name in ("test/simple/1", "test/simple/2")
+        ]
+        self.DUT = katcp_tango_proxy.TangoDevices2KatcpProxy.from_devices(
+            devices, shared_katcp_port=0, polling=True
+        )
+        start_thread_with_cleanup(self, self.DUT, start_timeout=1)
+        katcp_server = self.DUT.translators[0].katcp_server
+        # The translators are started in the background
+        deadline = time.time() + 5
+        while not {"test-simple-1.attr1", "test-simple-2.attr2"}.issubset(
+            katcp_server.get_sensor_list()
+        ):
+            self.assertLess(time.time(), deadline, "Translators did not start")
+            time.sleep(0.05)
+        host, port = katcp_server.bind_address
+        self.client = BlockingTestClient(self, host, port)
+        start_thread_with_cleanup(self, self.client, start_timeout=1)
+        self.client.wait_protocol(timeout=1)
+
+    def test_default_name_prefix(self):
+        self.assertEqual(
+            katcp_tango_proxy.default_name_prefix(
+                "tango://host:1234/test/simple_dev/1#dbase=no"
+            ),
+            "test-simple-dev-1",
+        )
+
+    def test_shared_server_requests(self):
+        requests = {
+            "test-simple-1-cmd1": b"test:reply1",
+            "test-simple-2-cmd2a": b"test:reply2a",
+            "test-simple-2-cmd2b": b"test:reply2b",
+        }
+        for request, expected_value in requests.items():
+            reply, _ = self.client.blocking_request(Message.request(request, "test"))
+            self.assertEqual(reply.arguments[1], expected_value)
+
+    def test_shared_server_sensor_readings(self):
+        sensors = {"test-simple-1.attr1": 123, "test-simple-2.attr2": 456}
+        for sensor, expected_value in sensors.items():
+            self.assertEqual(self.client.get_sensor_value(sensor, int), expected_value)
+
+
+class test_TangoDevices2KatcpProxyConfig(unittest.TestCase):
+    def test_undefined_device(self):
+        devices = [katcp_tango_proxy.TranslatedDevice("test/undefined/1", 5000, None)]
+        with mock.patch.object(
+            katcp_tango_proxy.tango, "DeviceProxy", side_effect=DevFailed
+        ) as device_proxy:
+            with self.assertRaises(ValueError):
+                katcp_tango_proxy.TangoDevices2KatcpProxy.from_devices(devices)
+        # Failed at once instead of retrying
+        self.assertEqual(device_proxy.call_count, 1)
+
+    def test_duplicate_ports(self):
+        devices = [
+            katcp_tango_proxy.TranslatedDevice("test/weather/1", 5000, None),
+            katcp_tango_proxy.TranslatedDevice("test/weather/2", 5000, None),
+        ]
+        with mock.patch.object(katcp_tango_proxy.tango, "DeviceProxy"):
+            with self.assertRaises(ValueError):
+                katcp_tango_proxy.TangoDevices2KatcpProxy.from_devices(devices)
+
+    def test_base_port_skips_configured_ports(self):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        config_filename = os.path.join(tempdir, "devices.json")
+        with open(config_filename, "w") as config_file:
+            json.dump(
+                dict(
+                    devices=[
+                        dict(device_name="test/weather/2", katcp_port=5001),
+                        "test/weather/3",
+                    ]
+                ),
+                config_file,
+            )
+        with mock.patch.object(
+            katcp_tango_proxy.TangoDevices2KatcpProxy, "from_devices"
+        ) as from_devices:
+            katcp_tango_proxy.tango2katcp_multi_main(
+                [
+                    "test/weather/1",
+                    "--config",
+                    config_filename,
+                    "--katcp-base-port",
+                    "5000",
+                    "--loglevel",
+                    "NO",
+                ],
+                start_ioloop=False,
+            )
+        devices = from_devices.call_args[0][0]
+        self.assertEqual(
+            [(device.device_name, device.katcp_port) for device in devices],
+            [
+                ("test/weather/1", 5000),
+                ("test/weather/2", 5001),
+                ("test/weather/3", 5002),
+            ],
+        )
+
+
 def cleanup_tempdir(*mkdtemp_args, **mkdtemp_kwargs):
     """Return filname of a new tempfile.
 
@@ -329,6 +329,23 @@ class test_TangoInspectingClient(TangoSetUpClass):
         attributes_data = self.DUT.inspect_attributes()
         self._test_attributes(attributes_data)
 
+    def test_inspect_attributes_in_chunks(self):
+        attribute_list = self.tango_dp.get_attribute_list()
+        with mock.patch.object(self.DUT, "attribute_config_chunk_size", 3):
+            with mock.patch.object(
+                self.tango_dp,
+                "get_attribute_config_ex",
+                wraps=self.tango_dp.get_attribute_config_ex,
+            ) as get_config:
+                attributes_data = self.DUT.inspect_attributes()
+        self._test_attributes(attributes_data)
+        # One bulk round trip per chunk of 3 attributes
+        self.assertEqual(get_config.call_count, (len(attribute_list) + 2) // 3)
+
+    def test_inspection_duration(self):
+        self.DUT.inspect()
+        self.assertGreater(self.DUT.inspection_duration, 0)
+
     def _test_commands(self, commands_data):
         # Check that the standard Tango commands are there
         for cmd in self.test_device.standard_commands:
@@ -520,6 +537,94 @@ class test_TangoInspectingClient(TangoSetUpClass):
         time.sleep(0.5)
         self.assertNotIn(dynamic_scalar_events_attr, self.tango_dp.get_attribute_list())
 
+    def test_attribute_event_name_index(self):
+        self.DUT.inspect()
+        event_attr_name = "tango://{}/scalardevdouble#dbase=no".format(
+            self.tango_dp.name()
+        )
+        event_data = mock.Mock(err=False, attr_name=event_attr_name, event="change")
+        event_data.reception_date.totime.return_value = 1234.5
+        event_data.attr_value.time.totime.return_value = 1234.0
+        event_data.attr_value.value = 3.1415
+        event_data.attr_value.quality = AttrQuality.ATTR_VALID
+        with mock.patch.object(self.DUT, "sample_event_callback") as sec:
+            self.DUT.attribute_event_handler(event_data)
+            self.DUT.attribute_event_handler(event_data)
+            event_data.err = True
+            self.DUT.attribute_event_handler(event_data)
+
+        self.assertEqual(
+            self.DUT._event_attr_names[event_attr_name], "ScalarDevDouble"
+        )
+        self.assertEqual(sec.call_count, 3)
+        sec.assert_any_call(
+            "ScalarDevDouble", 1234.5, 1234.0, 3.1415, AttrQuality.ATTR_VALID, "change"
+        )
+        self.assertEqual(sec.call_args[0][0], "ScalarDevDouble")
+        self.assertEqual(sec.call_args[0][4], AttrQuality.ATTR_INVALID)
+
+    def test_interface_delta(self):
+        self.DUT.inspect()
+        attributes = list(self.DUT.device_attributes.values())
+        commands = list(self.DUT.device_commands.values())
+        removed_attribute = attributes.pop()
+        fields = tango_inspecting_client.ATTRIBUTE_CONFIG_FINGERPRINT_FIELDS
+        changed_attribute = mock.Mock(
+            **{field: getattr(attributes[0], field) for field in fields}
+        )
+        changed_attribute.configure_mock(
+            name=attributes[0].name, description="A new description"
+        )
+        attributes[0] = changed_attribute
+        added_attribute = mock.Mock(
+            **{field: getattr(attributes[1], field) for field in fields}
+        )
+        added_attribute.configure_mock(name="NewAttribute")
+        attributes.append(added_attribute)
+        removed_command = commands.pop()
+
+        event_data = mock.Mock(
+            err=False,
+            device_name=self.tango_dp.name(),
+            att_list=attributes,
+            cmd_list=commands,
+        )
+        event_data.reception_date.totime.return_value = 1234.5
+        with mock.patch.object(self.DUT, "interface_delta_callback") as idc:
+            self.DUT.interface_change_event_handler(event_data)
+            # The same interface again does not make a delta
+            self.DUT.interface_change_event_handler(event_data)
+
+        idc.assert_called_once_with(
+            self.tango_dp.name(),
+            1234.5,
+            tango_inspecting_client.InterfaceDelta(
+                added_attributes=["NewAttribute"],
+                removed_attributes=[removed_attribute.name],
+                changed_attributes=[changed_attribute.name],
+                added_commands=[],
+                removed_commands=[removed_command.cmd_name],
+                changed_commands=[],
+            ),
+        )
+        self.assertIs(self.DUT.device_attributes["NewAttribute"], added_attribute)
+        self.assertNotIn(removed_command.cmd_name, self.DUT.device_commands)
+
+    def test_interface_delta_enum_attribute(self):
+        self.DUT.inspect()
+        self.assertIn("ScalarDevEnum", self.DUT.device_attributes)
+        # Freshly queried configs have new tango.StdStringVector enum labels
+        event_data = mock.Mock(
+            err=False,
+            device_name=self.tango_dp.name(),
+            att_list=self.tango_dp.attribute_list_query_ex(),
+            cmd_list=list(self.DUT.device_commands.values()),
+        )
+        event_data.reception_date.totime.return_value = 1234.5
+        with mock.patch.object(self.DUT, "interface_delta_callback") as idc:
+            self.DUT.interface_change_event_handler(event_data)
+        idc.assert_not_called()
+
     def test_interface_change_subscription(self):
         self.assertNotEquals(
             self.DUT._interface_change_event_id,
@@ -586,3 +691,93 @@ class test_TangoInspectingClientStandard(TangoSetUpClass):
     # NM 2016-04-13 TODO Test for when dynamic attributes are added/removed It seems this
     # is only implemented in tango 9, so we can't really do this properly till we
     # upgrade. https://sourceforge.net/p/tango-cs/feature-requests/90/?limit=25
+
+
+class test_TangoInspectingClientClientPolling(TangoSetUpClass):
+    def test_client_polling_fallback(self):
+        # State and Status are not polled, and have no events that can be
+        # subscribed to without enabling polling on the server.
+        client_polled_attributes = ("State", "Status")
+        is_polled = self.tango_dp.is_attribute_polled
+        recorded_samples = {attr: [] for attr in client_polled_attributes}
+        self.DUT.inspect()
+
+        def record_sample(attr, *x):
+            if attr in client_polled_attributes:
+                recorded_samples[attr].append(x)
+
+        self.DUT.sample_event_callback = record_sample
+        self.DUT.client_poll_period = 100
+        self.addCleanup(self.DUT.clear_attribute_sampling)
+        self.DUT.setup_attribute_sampling(
+            client_polled_attributes,
+            server_polling_fallback=True,
+            client_polling_fallback=True,
+        )
+        time.sleep(1)
+        self.DUT.clear_attribute_sampling()
+
+        self.assertEqual(
+            self.DUT._client_poller.attributes, set(), "Client-side polling not stopped"
+        )
+        for attr in client_polled_attributes:
+            # Client-side polling takes preference over server polling
+            self.assertEqual(is_polled(attr), False)
+            self.assertGreater(len(recorded_samples[attr]), 5)
+            for _, _, _, quality, event_type in recorded_samples[attr]:
+                self.assertEqual(quality, AttrQuality.ATTR_VALID)
+                self.assertEqual(event_type, "periodic")
+        self.assertEqual(recorded_samples["Status"][-1][2], self.tango_dp.status())
+
+    def test_client_polling_stopped_for_removed_attributes(self):
+        self.DUT.inspect()
+        self.DUT.sample_event_callback = mock.Mock()
+        self.addCleanup(self.DUT.clear_attribute_sampling)
+        self.DUT.setup_attribute_sampling(
+            ("State", "Status"), client_polling_fallback=True
+        )
+        self.assertEqual(self.DUT.client_polled_attributes, set(["State", "Status"]))
+        self.DUT.unsubscribe_attributes(["Status"])
+        self.assertEqual(self.DUT.client_polled_attributes, set(["State"]))
+        # State is removed by an interface change
+        attributes = [
+            config
+            for name, config in self.DUT.device_attributes.items()
+            if name != "State"
+        ]
+        self.DUT._update_device_attributes(attributes)
+        self.assertEqual(self.DUT.client_polled_attributes, set())
+
+    def test_client_poll_period_fallback(self):
+        self.DUT.inspect()
+        self.DUT.client_poll_period = 123
+        for period in ("0", "-100", "Not specified"):
+            attr_config = mock.Mock()
+            attr_config.events.per_event.period = period
+            self.DUT.device_attributes["State"] = attr_config
+            with mock.patch.object(self.DUT._client_poller, "add_attribute") as add:
+                self.DUT._setup_client_polling("State")
+            add.assert_called_once_with("State", 123)
+
+
+class test_ClientAttributePoller(unittest.TestCase):
+    def setUp(self):
+        self.tango_dp = mock.Mock()
+        self.tango_dp.name.return_value = "test/polled/1"
+        self.tango_dp.read_attributes.return_value = []
+        self.DUT = tango_inspecting_client.ClientAttributePoller(
+            self.tango_dp, mock.Mock()
+        )
+        self.addCleanup(self.DUT.clear)
+
+    def test_emptied_group_stopped_when_attribute_moved(self):
+        self.DUT.add_attribute("State", 100)
+        self.DUT.add_attribute("Status", 100)
+        stopped = self.DUT._stop_events[100]
+        self.DUT.add_attribute("State", 200)
+        self.assertFalse(stopped.is_set())
+        self.DUT.add_attribute("Status", 200)
+        self.assertTrue(stopped.is_set())
+        self.assertEqual(list(self.DUT._groups), [200])
+        self.assertEqual(list(self.DUT._stop_events), [200])
+        self.assertEqual(self.DUT.attributes, set(["State", "Status"]))
@@ -11,12 +11,17 @@ from future import standard_library
 
 standard_library.install_aliases()
 
+import json
 import logging
+import shutil
+import tempfile
 import time
 import unittest
 
 import mock
 import tango
+import tornado.gen
+import tornado.ioloop
 
 from katcp import DeviceServer, Message, Sensor
 from katcp.compat import ensure_native_str
@@ -25,17 +30,24 @@ from katcp.ioloop_manager import IOLoopThreadWrapper
 from katcp.testutils import start_thread_with_cleanup
 from mkat_tango.translators.katcp_tango_proxy import is_tango_device_running
 from mkat_tango.translators.tango_katcp_proxy import (
+    KatcpTango2DeviceProxy,
+    SensorObserver,
     TangoDeviceServerBase,
     add_tango_server_attribute_list,
     create_command2request_handler,
+    get_katcp_addresses,
     get_katcp_request_data,
+    get_shared_ioloop_manager,
     get_tango_device_server,
+    refresh_katcp_request_cache,
     remove_tango_server_attribute_list,
 )
+from mkat_tango.translators.inspection_cache import KatcpRequestCache
 from mkat_tango.translators.tests.test_tango_inspecting_client import (
     ClassCleanupUnittestMixin,
 )
 from mkat_tango.translators.utilities import (
+    SensorAttributeNameMap,
     katcpname2tangoname,
     tangoname2katcpname,
 )
@@ -98,9 +110,11 @@ default_attributes = {
     "ErrorTranslatingSensors",
     "Replies",
     "Informs",
+    "SensorSyncProgress",
+    "LastRequestResult",
 }
 
-default_commands = {"Init", "Status", "State"}
+default_commands = {"Init", "Status", "State", "GetRequestResult"}
 
 server_host = ""
 server_port = 0
@@ -655,6 +669,275 @@ class test_KatcpTango2DeviceProxy(_test_KatcpTango2DeviceProxy):
 
             self.assertAlmostEqual(attribute_value, sensor_value, places=6)
 
+    def test_sensor_change_events(self):
+        """Testing if KATCP sensor updates are pushed as Tango change events"""
+        sensor = self.katcp_server.get_sensor("actual-azim")
+        attribute_name = katcpname2tangoname(sensor.name)
+        received_values = []
+
+        def event_callback(event):
+            if not event.err:
+                received_values.append(event.attr_value.value)
+
+        event_id = self.tango_dp.subscribe_event(
+            attribute_name, tango.EventType.CHANGE_EVENT, event_callback
+        )
+        self.addCleanup(self.tango_dp.unsubscribe_event, event_id)
+        sensor.set_value(12.5)
+        stoptime = time.time() + 1
+        while 12.5 not in received_values and time.time() < stoptime:
+            time.sleep(0.025)
+        self.assertIn(12.5, received_values)
+
+
+class test_SensorSamplingSetup(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+        self.max_in_flight = 0
+        self.in_flight = 0
+        self.proxy = KatcpTango2DeviceProxy(mock.Mock(), mock.Mock(), mock.Mock())
+        self.proxy.katcp_inspecting_client.simple_request = self._simple_request
+        self.proxy.katcp_inspecting_client.sensors = ["sens-b", "sens-a", "sens-c"]
+        self.ioloop = tornado.ioloop.IOLoop()
+        self.addCleanup(self.ioloop.close)
+
+    @tornado.gen.coroutine
+    def _simple_request(self, *args):
+        self.requests.append(args)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        yield tornado.gen.moment
+        self.in_flight -= 1
+        reply = Message.reply(args[0], "ok")
+        raise tornado.gen.Return((reply, []))
+
+    def _set_bulk_sampling_support(self, supported):
+        client = self.proxy.katcp_inspecting_client.katcp_client
+        client.protocol_flags.bulk_set_sensor_sampling = supported
+
+    def test_bulk_sampling_setup(self):
+        """One request sets the sampling of all sensors if the server supports it"""
+        self._set_bulk_sampling_support(True)
+        self.ioloop.run_sync(self.proxy._setup_sensor_sampling)
+        self.assertEqual(
+            self.requests, [("sensor-sampling", "sens-a,sens-b,sens-c", "event")]
+        )
+
+    def test_pipelined_sampling_setup(self):
+        """A request per sensor, with limited requests in flight, otherwise"""
+        self._set_bulk_sampling_support(False)
+        self.proxy.max_sampling_requests_in_flight = 2
+        self.ioloop.run_sync(self.proxy._setup_sensor_sampling)
+        self.assertEqual(
+            sorted(self.requests),
+            [
+                ("sensor-sampling", "sens-a", "event"),
+                ("sensor-sampling", "sens-b", "event"),
+                ("sensor-sampling", "sens-c", "event"),
+            ],
+        )
+        self.assertEqual(self.max_in_flight, 2)
+
+    def test_sampling_setup_of_added_sensors_only(self):
+        self._set_bulk_sampling_support(True)
+        self.ioloop.run_sync(lambda: self.proxy._setup_sensor_sampling(["sens-d"]))
+        self.assertEqual(self.requests, [("sensor-sampling", "sens-d", "event")])
+
+
+class test_ParallelSensorFetch(unittest.TestCase):
+    def setUp(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.sensors = {
+            "sens-{:02d}".format(i): Sensor.integer("sens-{:02d}".format(i), "", "")
+            for i in range(10)
+        }
+        self.tango_device_server = mock.Mock()
+        self.proxy = KatcpTango2DeviceProxy(
+            mock.Mock(),
+            self.tango_device_server,
+            mock.Mock(),
+            max_sensor_fetches_in_flight=3,
+            attribute_batch_size=4,
+        )
+        self.proxy.katcp_inspecting_client.future_get_sensor = self._future_get_sensor
+        self.proxy._setup_sensor_sampling = mock.Mock(
+            side_effect=lambda sensor_names: tornado.gen.moment
+        )
+        self.ioloop = tornado.ioloop.IOLoop()
+        self.addCleanup(self.ioloop.close)
+
+    @tornado.gen.coroutine
+    def _future_get_sensor(self, sensor_name):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        yield tornado.gen.moment
+        self.in_flight -= 1
+        raise tornado.gen.Return(self.sensors.get(sensor_name))
+
+    def test_added_sensors(self):
+        added_sensor_names = set(self.sensors) | {"no-such-sensor"}
+        self.ioloop.run_sync(
+            lambda: self.proxy.reconfigure_tango_device_server(set(), added_sensor_names)
+        )
+        self.assertEqual(self.max_in_flight, 3)
+        self.assertEqual(self.tango_device_server.add_attribute.call_count, 10)
+        # Attributes are added, and sampled, in batches of 4 sensors. The missing
+        # sensor sorts into the first batch.
+        sampling_calls = self.proxy._setup_sensor_sampling.call_args_list
+        self.assertEqual([len(args[0]) for args, _ in sampling_calls], [3, 4, 3])
+        self.assertEqual(self.proxy.untranslated_sensors, ["no-such-sensor"])
+        self.assertEqual(self.proxy.sensor_sync_progress, 100.0)
+
+    def test_removed_sensors_not_fetched(self):
+        self.proxy.name_map.update(added=["sens-01"])
+        self.proxy.katcp_inspecting_client.future_get_sensor = mock.Mock()
+        self.ioloop.run_sync(
+            lambda: self.proxy.reconfigure_tango_device_server({"sens-01"}, set())
+        )
+        self.proxy.katcp_inspecting_client.future_get_sensor.assert_not_called()
+        self.tango_device_server.remove_attribute.assert_called_once_with("sens_01")
+
+    def test_removed_colliding_sensor(self):
+        self.sensors = {
+            name: Sensor.integer(name, "", "") for name in ["acs-temp", "acs.temp"]
+        }
+        self.ioloop.run_sync(
+            lambda: self.proxy.reconfigure_tango_device_server(set(), set(self.sensors))
+        )
+        # The first sensor in sorted order takes the attribute
+        self.assertEqual(self.proxy.untranslated_sensors, ["acs.temp"])
+        self.proxy.sensor_observer.readings["acs_temp"] = mock.sentinel.reading
+        self.ioloop.run_sync(
+            lambda: self.proxy.reconfigure_tango_device_server({"acs.temp"}, set())
+        )
+        # The attribute of the other sensor is kept
+        self.tango_device_server.remove_attribute.assert_not_called()
+        readings = self.proxy.sensor_observer.readings
+        self.assertIs(readings["acs_temp"], mock.sentinel.reading)
+        self.assertEqual(self.proxy.name_map.sensor_name("acs_temp"), "acs-temp")
+        self.assertEqual(self.proxy.untranslated_sensors, [])
+
+
+class test_AsynchronousRequests(unittest.TestCase):
+    def setUp(self):
+        self.ioloop = tornado.ioloop.IOLoop()
+        self.addCleanup(self.ioloop.close)
+        self.proxy = KatcpTango2DeviceProxy(
+            mock.Mock(),
+            mock.Mock(),
+            self.ioloop,
+            max_concurrent_requests=1,
+            max_request_results=2,
+        )
+        self.proxy.event_pusher = mock.Mock()
+        self.proxy.katcp_inspecting_client.simple_request = self._simple_request
+
+    @tornado.gen.coroutine
+    def _simple_request(self, request, *args, **kwargs):
+        yield tornado.gen.moment
+        if request == "broken":
+            raise RuntimeError("Connection lost")
+        reply = Message.reply(request, "ok", *args)
+        raise tornado.gen.Return((reply, [Message.inform(request, "info")]))
+
+    @tornado.gen.coroutine
+    def _until_done(self, request_id):
+        while self.proxy.get_request_result(request_id)["status"] == "pending":
+            yield tornado.gen.moment
+
+    def test_request_result(self):
+        request_id = self.proxy.start_request("add", ["1", "2"])
+        self.assertEqual(self.proxy.get_request_result(request_id)["status"], "pending")
+        self.ioloop.run_sync(lambda: self._until_done(request_id))
+        result = self.proxy.get_request_result(request_id)
+        self.assertEqual(result["status"], "done")
+        self.assertEqual(result["reply"], ["ok", "1", "2"])
+        self.assertEqual(result["informs"], [["info"]])
+        self.assertEqual(json.loads(self.proxy.last_request_result), result)
+        self.proxy.event_pusher.push.assert_called_once_with(
+            "LastRequestResult",
+            self.proxy.last_request_result,
+            mock.ANY,
+            tango.AttrQuality.ATTR_VALID,
+        )
+
+    def test_request_error(self):
+        request_id = self.proxy.start_request("broken")
+        self.ioloop.run_sync(lambda: self._until_done(request_id))
+        result = self.proxy.get_request_result(request_id)
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["error"], "Connection lost")
+
+    def test_old_results_discarded(self):
+        request_ids = [self.proxy.start_request("time") for _ in range(3)]
+        self.ioloop.run_sync(lambda: self._until_done(request_ids[-1]))
+        with self.assertRaises(KeyError):
+            self.proxy.get_request_result(request_ids[0])
+        self.assertEqual(self.proxy.get_request_result(request_ids[1])["status"], "done")
+
+
+class test_SensorAttributeNameMap(unittest.TestCase):
+    def test_lookups(self):
+        name_map = SensorAttributeNameMap(["acs.temperature-01", "actual-azim"])
+        self.assertEqual(name_map.attribute_name("actual-azim"), "actual_azim")
+        self.assertEqual(name_map.sensor_name("acs_temperature_01"), "acs.temperature-01")
+        # Names not in the map follow the naming rules
+        self.assertEqual(name_map.attribute_name("gps-nmea"), "gps_nmea")
+        self.assertEqual(name_map.sensor_name("gps_nmea"), "gps-nmea")
+        self.assertNotIn("gps-nmea", name_map)
+
+    def test_update(self):
+        name_map = SensorAttributeNameMap(["actual-azim"])
+        name_map.update(added=["requested-azim"], removed=["actual-azim"])
+        self.assertNotIn("actual-azim", name_map)
+        self.assertEqual(name_map.sensor_name("requested_azim"), "requested-azim")
+        self.assertEqual(len(name_map), 1)
+
+    def test_collisions(self):
+        name_map = SensorAttributeNameMap(["acs.temp"])
+        name_map.update(added=["acs-temp"])
+        self.assertNotIn("acs-temp", name_map)
+        self.assertEqual(name_map.sensor_name("acs_temp"), "acs.temp")
+        # Translators have separate maps
+        other_name_map = SensorAttributeNameMap(["acs-temp"])
+        self.assertEqual(other_name_map.sensor_name("acs_temp"), "acs-temp")
+
+
+class test_SensorObserver(unittest.TestCase):
+    def setUp(self):
+        self.event_pusher = mock.Mock()
+        self.observer = SensorObserver(self.event_pusher)
+
+    def test_readings_replaced(self):
+        sensor = Sensor.float("actual-azim", "Actual azimuth position", "deg")
+        sensor.attach(self.observer)
+        sensor.set_value(1.5, Sensor.WARN, 1000.0)
+        previous_reading = self.observer.readings["actual_azim"]
+        sensor.set_value(2.5, Sensor.NOMINAL, 1001.0)
+        # A reader holding the previous reading still sees it in full
+        self.assertEqual(previous_reading, (1.5, 1000.0, tango.AttrQuality.ATTR_WARNING))
+        reading = self.observer.readings["actual_azim"]
+        self.assertEqual(reading.value, 2.5)
+        self.assertEqual(reading.timestamp, 1001.0)
+        self.assertEqual(reading.quality, tango.AttrQuality.ATTR_VALID)
+        self.event_pusher.push.assert_called_with(
+            "actual_azim", 2.5, 1001.0, tango.AttrQuality.ATTR_VALID
+        )
+
+    def test_address_readings(self):
+        sensor = Sensor.address("ntp-lru", "NTP server IP address", "")
+        sensor.attach(self.observer)
+        sensor.set_value(("localhost", 5000))
+        self.assertEqual(self.observer.readings["ntp_lru"].value, "localhost:5000")
+
+    def test_discard(self):
+        sensor = Sensor.integer("track-stack-size", "Samples in the stack", "")
+        sensor.attach(self.observer)
+        sensor.set_value(3)
+        self.observer.discard([sensor.name])
+        self.assertNotIn("track_stack_size", self.observer.readings)
+
 
 class test_KatcpTango2DeviceProxyValidSensorsOnly(_test_KatcpTango2DeviceProxy):
     KatcpTestDeviceClass = KatcpTestDeviceValidSensorsOnly
@@ -699,6 +982,12 @@ class test_KatcpTango2DeviceProxyCommands(_test_KatcpTango2DeviceProxyCommands):
             "The command list and the request list do not match",
         )
 
+    def test_request_result_events(self):
+        """Testing that the request results are pushed as change and archive events"""
+        attribute = self.instance.get_device_attr().get_attr_by_name("LastRequestResult")
+        self.assertTrue(attribute.is_change_event())
+        self.assertTrue(attribute.is_archive_event())
+
     def _test_command2request_handler(self, req_name, req_doc, with_parameters=False):
         """Testing the tango command handler with/without request parameters.
 
@@ -780,3 +1069,124 @@ class test_KatcpTango2DeviceProxyCommands(_test_KatcpTango2DeviceProxyCommands):
         ) as mock_time:
             mock_time.time.return_value = expected_result
             self._test_command(req, expected_result)
+
+
+class test_KatcpRequestCache(unittest.TestCase):
+    def setUp(self):
+        self.katcp_server = KatcpTestDevice(server_host, server_port)
+        start_thread_with_cleanup(self, self.katcp_server)
+        self.katcp_address = "{}:{}".format(*self.katcp_server.bind_address)
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        self.request_cache = KatcpRequestCache(cache_dir)
+
+    def test_requests_cached(self):
+        req_dict = get_katcp_request_data(
+            katcp_address=self.katcp_address, request_cache=self.request_cache
+        )
+        self.assertIn("add", req_dict)
+        version_list, cached_req_dict = self.request_cache.load(self.katcp_address)
+        self.assertEqual(cached_req_dict, req_dict)
+        self.assertIn("katcp-device", [version[0] for version in version_list])
+        self.assertFalse(
+            refresh_katcp_request_cache(self.katcp_address, self.request_cache)
+        )
+
+    def test_refresh_out_of_date_cache(self):
+        self.request_cache.save(
+            self.katcp_address, [["katcp-device", "0.1"]], {"old-request": "Gone"}
+        )
+        self.assertTrue(
+            refresh_katcp_request_cache(self.katcp_address, self.request_cache)
+        )
+        _, req_dict = self.request_cache.load(self.katcp_address)
+        self.assertNotIn("old-request", req_dict)
+        self.assertIn("time", req_dict)
+
+    def test_device_server_from_cached_requests(self):
+        # Nothing listens at the cached address
+        katcp_address = "127.0.0.1:1"
+        self.request_cache.save(
+            katcp_address, [], {"cached-request": "A request without parameters"}
+        )
+        with mock.patch(
+            "mkat_tango.translators.tango_katcp_proxy.get_katcp_address"
+        ) as mock_get_katcp_address, mock.patch(
+            "mkat_tango.translators.tango_katcp_proxy."
+            "_refresh_katcp_request_cache_target"
+        ) as mock_refresh:
+            mock_get_katcp_address.return_value = katcp_address
+            TangoDeviceServer = get_tango_device_server(self.request_cache)
+        self.assertTrue(hasattr(TangoDeviceServer, "cached_request"))
+        mock_refresh.assert_called_once_with(katcp_address, self.request_cache)
+
+
+class test_MultipleKatcpDevices(unittest.TestCase):
+    def test_get_katcp_addresses(self):
+        with mock.patch(
+            "mkat_tango.translators.tango_katcp_proxy.Database"
+        ) as mock_database:
+            db = mock_database.return_value
+            db.get_server_class_list.return_value.value_string = ["TangoDeviceServer"]
+            db.get_device_name.return_value.value_string = ["katcp/dig/1", "katcp/dig/2"]
+            db.get_device_property.side_effect = lambda device_name, prop: {
+                prop: ["localhost:700" + device_name[-1]]
+            }
+            katcp_addresses = get_katcp_addresses("katcpdevice2tango/dig")
+        self.assertEqual(
+            katcp_addresses,
+            {"katcp/dig/1": "localhost:7001", "katcp/dig/2": "localhost:7002"},
+        )
+
+    def test_device_server_commands_from_all_devices(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        request_cache = KatcpRequestCache(cache_dir)
+        request_cache.save("127.0.0.1:1", [], {"capture-start": "Start capture"})
+        request_cache.save("127.0.0.1:2", [], {"capture-stop": "Stop capture"})
+        with mock.patch(
+            "mkat_tango.translators.tango_katcp_proxy."
+            "_refresh_katcp_request_cache_target"
+        ):
+            TangoDeviceServer = get_tango_device_server(
+                request_cache, ["127.0.0.1:1", "127.0.0.1:2"]
+            )
+        self.assertTrue(hasattr(TangoDeviceServer, "capture_start"))
+        self.assertTrue(hasattr(TangoDeviceServer, "capture_stop"))
+        # Devices only make the requests of their own KATCP device
+        device = mock.Mock(spec=TangoDeviceServer)
+        device.katcp_address = "127.0.0.1:1"
+        device.katcp_request_names = TangoDeviceServer.katcp_request_names
+        device.async_requests = False
+        device.tango_katcp_proxy = mock.Mock()
+        device.tango_katcp_proxy.do_request.return_value = Message.reply(
+            "capture-start", "ok"
+        )
+        self.assertEqual(
+            TangoDeviceServer.execute_request(device, "capture-start"), [b"ok"]
+        )
+        with self.assertRaises(ValueError):
+            TangoDeviceServer.execute_request(device, "capture-stop")
+        device.tango_katcp_proxy.do_request.assert_called_once_with(
+            "capture-start", None
+        )
+
+    def test_conflicting_requests(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        request_cache = KatcpRequestCache(cache_dir)
+        request_cache.save("127.0.0.1:1", [], {"capture-start": "Start capture"})
+        request_cache.save(
+            "127.0.0.1:2",
+            [],
+            {"capture-start": "Start capture\n\nParameters\n----------\nstream : str"},
+        )
+        with mock.patch(
+            "mkat_tango.translators.tango_katcp_proxy."
+            "_refresh_katcp_request_cache_target"
+        ):
+            with self.assertRaises(ValueError):
+                get_tango_device_server(request_cache, ["127.0.0.1:1", "127.0.0.1:2"])
+
+    def test_shared_ioloop_manager(self):
+        self.assertIs(get_shared_ioloop_manager(), get_shared_ioloop_manager())
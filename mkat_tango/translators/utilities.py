@@ -12,8 +12,14 @@ from future import standard_library
 
 standard_library.install_aliases()
 
+import logging
+
+from builtins import object
+
 from katcp.compat import ensure_native_str
 
+MODULE_LOGGER = logging.getLogger(__name__)
+
 SENSOR_ATTRIBUTE_NAMES = {}
 
 
@@ -38,11 +44,15 @@ def katcpname2tangoname(sensor_name):
     """
     # TODO (KM) 13-06-2016 : Need to find a way to deal with sensor names with dots.
     sensor_name = ensure_native_str(sensor_name)
-    attribute_name = sensor_name.replace("-", "_").replace(".", "_")
+    attribute_name = _sensor_name_to_attribute_name(sensor_name)
     SENSOR_ATTRIBUTE_NAMES[attribute_name] = sensor_name
     return attribute_name
 
 
+def _sensor_name_to_attribute_name(sensor_name):
+    return sensor_name.replace("-", "_").replace(".", "_")
+
+
 def tangoname2katcpname(attribute_name):
     """
     Removes the underscore(s) in the attribute name and replaces them with
@@ -69,6 +79,83 @@ def tangoname2katcpname(attribute_name):
         return sensor_name
 
 
+class SensorAttributeNameMap(object):
+    """Bidirectional map between the KATCP sensor names and Tango attribute names
+    of one translator
+
+    The map is updated when the interface of the translated device changes, and
+    lookups do not modify it. Unlike :func:`katcpname2tangoname` and
+    :func:`tangoname2katcpname`, names of other translators never collide with
+    the names in the map.
+
+    Parameters
+    ----------
+    sensor_names : iterable of str
+        Initial KATCP sensor names.
+    logger : :class:`logging.Logger`
+
+    """
+
+    def __init__(self, sensor_names=(), logger=MODULE_LOGGER):
+        self._logger = logger
+        # Sensor names as keys, attribute names as values, and the reverse
+        self._attribute_names = {}
+        self._sensor_names = {}
+        self.update(added=sensor_names)
+
+    def __len__(self):
+        return len(self._attribute_names)
+
+    def __contains__(self, sensor_name):
+        return sensor_name in self._attribute_names
+
+    def update(self, added=(), removed=()):
+        """Add and remove KATCP sensor names, e.g. after an interface change"""
+        for sensor_name in removed:
+            attribute_name = self._attribute_names.pop(sensor_name, None)
+            if attribute_name is not None:
+                del self._sensor_names[attribute_name]
+        for sensor_name in added:
+            sensor_name = ensure_native_str(sensor_name)
+            attribute_name = _sensor_name_to_attribute_name(sensor_name)
+            other_sensor_name = self._sensor_names.get(attribute_name, sensor_name)
+            if other_sensor_name != sensor_name:
+                self._logger.warning(
+                    "Sensors %s and %s both map to attribute %s, ignoring %s",
+                    other_sensor_name,
+                    sensor_name,
+                    attribute_name,
+                    sensor_name,
+                )
+                continue
+            self._attribute_names[sensor_name] = attribute_name
+            self._sensor_names[attribute_name] = sensor_name
+
+    def attribute_name(self, sensor_name):
+        """Tango attribute name of a KATCP sensor
+
+        Sensors not in the map are named by the same rule as
+        :func:`katcpname2tangoname`.
+
+        """
+        try:
+            return self._attribute_names[sensor_name]
+        except KeyError:
+            return _sensor_name_to_attribute_name(ensure_native_str(sensor_name))
+
+    def sensor_name(self, attribute_name):
+        """KATCP sensor name of a Tango attribute
+
+        Attributes not in the map are named by replacing underscores with dashes,
+        like :func:`tangoname2katcpname`.
+
+        """
+        try:
+            return self._sensor_names[attribute_name]
+        except KeyError:
+            return attribute_name.replace("_", "-")
+
+
 def address(host_port):
     """Convert a HOST:PORT argument to a (host, port) tuple.
     Paramaters
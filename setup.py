@@ -43,12 +43,20 @@ setup(
     entry_points={
         "console_scripts": [
             "mkat-tango-weather-DS = mkat_tango.simulators.weather:weather_main",
+            ("mkat-tango-weather-fleet-DS = "
+             "mkat_tango.simulators.weather:weather_fleet_main"),
             "mkat-tango-AP-DS = mkat_tango.simulators.mkat_ap_tango:main",
+            ("mkat-tango-load-generator-DS = "
+             "mkat_tango.simulators.load_generator:load_generator_main"),
             ("mkat-tango-tangodevice2katcp = "
              "mkat_tango.translators.katcp_tango_proxy:tango2katcp_main"),
+            ("mkat-tango-tangodevices2katcp = "
+             "mkat_tango.translators.katcp_tango_proxy:tango2katcp_multi_main"),
             ("mkat-tango-katcpdevice2tango-DS = "
              "mkat_tango.translators.tango_katcp_proxy:main"),
             "mkat-tango-tango_launcher = mkat_tango.translators.tango_launcher:main",
+            ("mkat-tango-translator-benchmark = "
+             "mkat_tango.benchmarks.translator_benchmark:main"),
         ]
     },
 )